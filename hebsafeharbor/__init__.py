@@ -1,4 +1,5 @@
 from hebsafeharbor.common.document import Doc
 from hebsafeharbor.manager import HebSafeHarbor
+from hebsafeharbor.parallel_manager import ParallelHebSafeHarbor
 
-__all__ = ["Doc", "HebSafeHarbor"]
+__all__ = ["Doc", "HebSafeHarbor", "ParallelHebSafeHarbor"]
@@ -2,6 +2,7 @@ from typing import Dict
 
 from presidio_anonymizer.operators import OperatorType, Operator
 
+from hebsafeharbor.anonymizer.setting import COUNTRY_MASK
 from hebsafeharbor.common.country_utils import COUNTRY_DICT
 
 class CountryAnonymizerOperator(Operator):
@@ -19,10 +20,7 @@ class CountryAnonymizerOperator(Operator):
         :return: the anonymized text of the entity
         """
 
-        if text in COUNTRY_DICT.keys():
-            return COUNTRY_DICT[text]
-        else:
-            return "<מדינה_>"
+        return COUNTRY_DICT.get(text, COUNTRY_MASK)
 
     def validate(self, params: Dict = None) -> None:
         """
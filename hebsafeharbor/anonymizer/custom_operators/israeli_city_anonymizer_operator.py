@@ -1,9 +1,34 @@
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping
 
 from presidio_anonymizer.operators import OperatorType, Operator
 
+from hebsafeharbor.anonymizer.setting import CITY_MASK
 from hebsafeharbor.common.city_utils import ABOVE_THRESHOLD_CITIES_LIST, BELOW_THRESHOLD_CITIES_LIST, \
-    ABBREVIATIONS_LIST, AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST
+    ABBREVIATIONS_LIST, AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST, AMBIGOUS_BELOW_THRESHOLD_CITIES_LIST
+from hebsafeharbor.common.prepositions import LOCATION_PREPOSITIONS
+
+
+def build_city_masking_policy() -> Mapping[str, bool]:
+    """
+    Builds the masking decision of each known surface form of a city. The cities with population above 2000 (including
+    the ambiguous ones) and the abbreviations are kept, while the cities below the threshold are masked. The recognized
+    city entities include their attached prepositions (e.g. "בחיפה"), and these forms are masked as well - only the
+    exact forms in the lists are kept.
+
+    :return: immutable mapping of surface form to whether it should be masked (unknown forms should be masked)
+    """
+    cities = ABOVE_THRESHOLD_CITIES_LIST + AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST + ABBREVIATIONS_LIST + \
+        BELOW_THRESHOLD_CITIES_LIST + AMBIGOUS_BELOW_THRESHOLD_CITIES_LIST
+    policy = {preposition + city: True for preposition in LOCATION_PREPOSITIONS for city in cities}
+    policy.update({city: True for city in BELOW_THRESHOLD_CITIES_LIST + AMBIGOUS_BELOW_THRESHOLD_CITIES_LIST})
+    # the kept forms are added last, so they take precedence over a prefixed form of another city with the same text
+    policy.update({city: False for city in
+                   ABOVE_THRESHOLD_CITIES_LIST + AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST + ABBREVIATIONS_LIST})
+    return MappingProxyType(policy)
+
+
+CITY_MASKING_POLICY = build_city_masking_policy()
 
 
 class IsraeliCityAnonymizerOperator(Operator):
@@ -21,16 +46,9 @@ class IsraeliCityAnonymizerOperator(Operator):
         :return: the anonymized text of the entity
         """
 
-        if text in ABOVE_THRESHOLD_CITIES_LIST:
-            return text
-        elif text in AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST:
-            return text
-        elif text in ABBREVIATIONS_LIST:
-            return text
-        elif text in BELOW_THRESHOLD_CITIES_LIST:
-            return "<מיקום_>"
-        else:
-            return "<מיקום_>"
+        if CITY_MASKING_POLICY.get(text, True):
+            return CITY_MASK
+        return text
 
     def validate(self, params: Dict = None) -> None:
         """
@@ -0,0 +1,240 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.core.text_replace_builder import TextReplaceBuilder
+from presidio_anonymizer.entities import EngineResult, OperatorConfig, OperatorResult
+from presidio_anonymizer.operators import Operator
+from presidio_anonymizer.operators.replace import Replace
+
+
+class OperatorPlan:
+    """
+    The operators that anonymize each entity type. The operators are created and validated once, when the plan is
+    built, instead of being looked up (and validated) for every anonymized entity.
+    """
+
+    def __init__(self, entity_type_to_operator: Dict[str, Operator], default_operator: Optional[Operator] = None):
+        """
+        Initializes OperatorPlan
+
+        :param entity_type_to_operator: mapping of entity type to the operator that anonymizes it
+        :param default_operator: the operator of the entity types that are not in the mapping. Presidio's default
+        operator (replacing the entity by its type) is used if not given
+        """
+        self.entity_type_to_operator = dict(entity_type_to_operator)
+        self.default_operator = default_operator if default_operator is not None else Replace()
+        for operator in list(self.entity_type_to_operator.values()) + [self.default_operator]:
+            operator.validate(params={})
+
+    def get_operator(self, entity_type: str) -> Operator:
+        """
+        Returns the operator of the entity type
+
+        :param entity_type: the entity type
+        :return: the operator that anonymizes the entity type
+        """
+        return self.entity_type_to_operator.get(entity_type, self.default_operator)
+
+
+class HebAnonymizerEngine(AnonymizerEngine):
+    """
+    Wrapper class for AnonymizerEngine (@Presidio) which anonymizes the entities using an OperatorPlan that is built
+    once, instead of operator configurations that are passed on each call. The results are identical to the results of
+    AnonymizerEngine.anonymize with the equivalent operator configurations.
+    """
+
+    def __init__(self, operator_plan: OperatorPlan):
+        """
+        Initializes HebAnonymizerEngine
+
+        :param operator_plan: the operators that anonymize each entity type
+        """
+        super().__init__()
+        self.operator_plan = operator_plan
+
+    def anonymize(self, text: str, analyzer_results: List[RecognizerResult],
+                  operators: Optional[Dict[str, OperatorConfig]] = None) -> EngineResult:
+        """
+        Anonymizes the entities in the text. Behaves exactly like AnonymizerEngine.anonymize, except that the operator
+        plan is used if no operator configurations are given
+
+        :param text: the text to anonymize
+        :param analyzer_results: the entities to anonymize
+        :param operators: operator configurations per entity type (overrides the operator plan)
+        :return: the anonymized text and the anonymized entities
+        """
+        if operators is not None:
+            return super().anonymize(text, analyzer_results, operators)
+
+        return self._operate_with_plan(text, HebAnonymizerEngine._remove_conflicts(analyzer_results))
+
+    def anonymize_many(self, texts: List[str],
+                       batch_analyzer_results: List[List[RecognizerResult]]) -> List[EngineResult]:
+        """
+        Anonymizes the entities in a batch of texts using the operator plan
+
+        :param texts: the texts to anonymize
+        :param batch_analyzer_results: the entities to anonymize per text (in the order of the given texts)
+        :return: the anonymized text and the anonymized entities per text
+        """
+        remove_conflicts = HebAnonymizerEngine._remove_conflicts
+        operate = self._operate_with_plan
+        return [operate(text, remove_conflicts(analyzer_results)) for text, analyzer_results in
+                zip(texts, batch_analyzer_results)]
+
+    @staticmethod
+    def _remove_conflicts(analyzer_results: List[RecognizerResult]) -> List[RecognizerResult]:
+        """
+        Removes the entities that conflict with other entities, the same way AnonymizerEngine.anonymize does - an entity
+        is removed if it is contained in another entity, or if another entity has the same offsets and a score which is
+        not lower. An entity that was removed is not compared with the following entities
+
+        :param analyzer_results: the entities to anonymize
+        :return: the entities with no conflicts, in their original order
+        """
+        kept_entities = []
+        other_entities = list(analyzer_results)
+        for entity in analyzer_results:
+            other_entities.remove(entity)
+            if not any(entity.has_conflict(other_entity) for other_entity in other_entities):
+                other_entities.append(entity)
+                kept_entities.append(entity)
+        return kept_entities
+
+    def _operate_with_plan(self, text: str, analyzer_results: List[RecognizerResult]) -> EngineResult:
+        """
+        Replaces the entities in the text by the output of their operators, from the last entity to the first (the same
+        as EngineBase._operate does for the operator configurations)
+
+        :param text: the text to anonymize
+        :param analyzer_results: the entities to anonymize, with no conflicts
+        :return: the anonymized text and the anonymized entities
+        """
+        text_replace_builder = TextReplaceBuilder(original_text=text)
+        engine_result = EngineResult()
+        for entity in sorted(analyzer_results, reverse=True):
+            text_to_operate_on = text_replace_builder.get_text_in_position(entity.start, entity.end)
+            operator = self.operator_plan.get_operator(entity.entity_type)
+            changed_text = operator.operate(params={"entity_type": entity.entity_type}, text=text_to_operate_on)
+            index_from_end = text_replace_builder.replace_text_get_insertion_index(changed_text, entity.start,
+                                                                                   entity.end)
+            # the indices are counted from the end of the text until all the entities are replaced
+            engine_result.add_item(
+                OperatorResult(0, index_from_end, entity.entity_type, changed_text, operator.operator_name()))
+
+        engine_result.set_text(text_replace_builder.output_text)
+        engine_result.normalize_item_indexes()
+        return engine_result
+
+
+class SinglePassAnonymizerEngine(HebAnonymizerEngine):
+    """
+    HebAnonymizerEngine which builds the anonymized text in a single left to right pass (joining the unchanged parts of
+    the text and the outputs of the operators) instead of replacing the entities one by one from the end of the text.
+    The pass is used when the entities are disjoint (as they are after the entity splitting), in which case none of them
+    conflicts with another and the output is identical to the output of HebAnonymizerEngine. Otherwise, the entities
+    are anonymized by HebAnonymizerEngine.
+    """
+
+    def anonymize(self, text: str, analyzer_results: List[RecognizerResult],
+                  operators: Optional[Dict[str, OperatorConfig]] = None) -> EngineResult:
+        """
+        Anonymizes the entities in the text (see HebAnonymizerEngine.anonymize)
+
+        :param text: the text to anonymize
+        :param analyzer_results: the entities to anonymize
+        :param operators: operator configurations per entity type (overrides the operator plan)
+        :return: the anonymized text and the anonymized entities
+        """
+        if operators is None:
+            disjoint_entities = SinglePassAnonymizerEngine._get_disjoint_entities(text, analyzer_results)
+            if disjoint_entities is not None:
+                return self._operate_single_pass(text, disjoint_entities)
+        return super().anonymize(text, analyzer_results, operators)
+
+    def anonymize_many(self, texts: List[str],
+                       batch_analyzer_results: List[List[RecognizerResult]]) -> List[EngineResult]:
+        """
+        Anonymizes the entities in a batch of texts using the operator plan
+
+        :param texts: the texts to anonymize
+        :param batch_analyzer_results: the entities to anonymize per text (in the order of the given texts)
+        :return: the anonymized text and the anonymized entities per text
+        """
+        anonymize = self.anonymize
+        return [anonymize(text, analyzer_results) for text, analyzer_results in zip(texts, batch_analyzer_results)]
+
+    @staticmethod
+    def _get_disjoint_entities(text: str,
+                               analyzer_results: List[RecognizerResult]) -> Optional[List[RecognizerResult]]:
+        """
+        Returns the entities that AnonymizerEngine keeps after removing the conflicts, if the non-empty entities are
+        disjoint. In this case only empty entities can conflict with other entities - an empty entity is removed if it
+        is contained in (or adjacent to) a non-empty entity, and otherwise its anonymized text is inserted at its offset
+
+        :param text: the text to anonymize
+        :param analyzer_results: the entities to anonymize
+        :return: the entities sorted by their offsets, or None if the non-empty entities are not disjoint (or an entity
+        is not within the text, or there are several empty entities at the same offset)
+        """
+        if not text:
+            return None
+        entities = sorted(analyzer_results, key=lambda entity: (entity.start, entity.end))
+        non_empty_starts = []
+        non_empty_ends = []
+        empty_entities = []
+        for entity in entities:
+            if entity.start < 0 or entity.end < entity.start:
+                return None
+            if entity.start == entity.end:
+                if empty_entities and empty_entities[-1].start == entity.start:
+                    return None
+                empty_entities.append(entity)
+            else:
+                if non_empty_ends and entity.start < non_empty_ends[-1]:
+                    return None
+                non_empty_starts.append(entity.start)
+                non_empty_ends.append(entity.end)
+        if (non_empty_ends and non_empty_ends[-1] > len(text)) or (
+                empty_entities and empty_entities[-1].start > len(text)):
+            return None
+        if not empty_entities:
+            return entities
+
+        containing_entities = [bisect_right(non_empty_starts, entity.start) - 1 for entity in empty_entities]
+        removed_entities = {id(entity) for entity, index in zip(empty_entities, containing_entities) if
+                            index >= 0 and non_empty_ends[index] >= entity.start}
+        return [entity for entity in entities if id(entity) not in removed_entities]
+
+    def _operate_single_pass(self, text: str, entities: List[RecognizerResult]) -> EngineResult:
+        """
+        Builds the anonymized text out of the unchanged parts of the text and the outputs of the operators
+
+        :param text: the text to anonymize
+        :param entities: the sorted disjoint entities to anonymize
+        :return: the anonymized text and the anonymized entities (ordered from the last to the first, as in
+        EngineBase._operate)
+        """
+        get_operator = self.operator_plan.get_operator
+        parts = []
+        items = []
+        last_end = 0
+        output_length = 0
+        for entity in entities:
+            unchanged_text = text[last_end:entity.start]
+            operator = get_operator(entity.entity_type)
+            changed_text = operator.operate(params={"entity_type": entity.entity_type},
+                                            text=text[entity.start:entity.end])
+            parts.append(unchanged_text)
+            parts.append(changed_text)
+            output_length += len(unchanged_text)
+            items.append(OperatorResult(output_length, output_length + len(changed_text), entity.entity_type,
+                                        changed_text, operator.operator_name()))
+            output_length += len(changed_text)
+            last_end = entity.end
+        parts.append(text[last_end:])
+
+        items.reverse()
+        return EngineResult(text="".join(parts), items=items)
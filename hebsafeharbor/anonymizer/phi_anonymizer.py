@@ -1,10 +1,12 @@
-from typing import List
+import os
+from typing import List, Optional
 
-from presidio_anonymizer import AnonymizerEngine
-from presidio_anonymizer.entities import OperatorConfig
 from presidio_anonymizer.operators import Operator
 
 from hebsafeharbor import Doc
+from hebsafeharbor.common.timings import time_stage
+from hebsafeharbor.anonymizer.heb_anonymizer_engine import HebAnonymizerEngine, OperatorPlan, \
+    SinglePassAnonymizerEngine
 from hebsafeharbor.anonymizer.custom_operators.birth_date_anonymizer_operator import BirthDateAnonymizerOperator
 from hebsafeharbor.anonymizer.custom_operators.country_anonymizer_operator import CountryAnonymizerOperator
 from hebsafeharbor.anonymizer.custom_operators.hebrew_replace_anonymizer_operator import ReplaceInHebrew
@@ -12,18 +14,36 @@ from hebsafeharbor.anonymizer.custom_operators.israeli_city_anonymizer_operator
 from hebsafeharbor.anonymizer.custom_operators.medical_date_anonymizer_operator import MedicalDateAnonymizerOperator
 
 
+# the anonymization engines that PhiAnonymizer can use. Both produce identical outputs: "presidio" replaces the entities
+# one by one as the AnonymizerEngine (@Presidio) does, "single_pass" builds the anonymized text in one pass
+ANONYMIZER_BACKENDS = {
+    "presidio": HebAnonymizerEngine,
+    "single_pass": SinglePassAnonymizerEngine,
+}
+ANONYMIZER_BACKEND_ENV_VAR = "HSH_ANONYMIZER_BACKEND"
+DEFAULT_ANONYMIZER_BACKEND = "presidio"
+
+
 class PhiAnonymizer:
     """
     This class is responsible on the anonymization process. It anonymizes the entities using the AnonymizerEngine
     (@Presidio)
     """
 
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         """
         Initializes the PhiAnonymizer which is composed of Presidio anonymizer and a list of custom operators*
+
+        :param backend: the name of the anonymization engine, one of ANONYMIZER_BACKENDS (HSH_ANONYMIZER_BACKEND or
+        DEFAULT_ANONYMIZER_BACKEND if None)
         """
-        self.anonymizer = AnonymizerEngine()
+        backend = backend if backend is not None else os.environ.get(ANONYMIZER_BACKEND_ENV_VAR,
+                                                                     DEFAULT_ANONYMIZER_BACKEND)
+        if backend not in ANONYMIZER_BACKENDS:
+            raise ValueError(f"Unknown anonymizer backend {backend}, expected one of {list(ANONYMIZER_BACKENDS)}")
         self.operators = self.init_custom_operators()
+        # the operator of each entity type is resolved once and reused for all the documents
+        self.anonymizer = ANONYMIZER_BACKENDS[backend](self.init_operator_plan())
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -33,57 +53,51 @@ class PhiAnonymizer:
         recognized earlier by the identifier
         :return: an updated Doc object that contains the anonymized text (the text itself and the anonymized entities)
         """
-        # the call to the anonymizer in the long term (custom operator is part of presidio package)
-        # anonymized_results = self.anonymizer.anonymize(text=doc.text, analyzer_results=doc.consolidated_results)
-
-        # the call to the anonymizer in the short term (custom operator as lambda function)
-        anonymized_results = self.anonymizer.anonymize(
-            text=doc.text,
-            analyzer_results=doc.granular_analyzer_results,
-            operators={
-                "PERS": OperatorConfig(self.operators[0].operator_name(),
-                                       {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "PER": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "LOC": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "GPE": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "ORG": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "FAC": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "CREDIT_CARD": OperatorConfig(self.operators[0].operator_name(),
-                                              {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "ISRAELI_ID_NUMBER": OperatorConfig(self.operators[0].operator_name(),
-                                                    {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "ID": OperatorConfig(self.operators[0].operator_name(),
-                                     {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "EMAIL_ADDRESS": OperatorConfig(self.operators[0].operator_name(),
-                                                {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "IP_ADDRESS": OperatorConfig(self.operators[0].operator_name(),
-                                             {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "URL": OperatorConfig(self.operators[0].operator_name(),
-                                      {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "PHONE_NUMBER": OperatorConfig(self.operators[0].operator_name(),
-                                               {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "DATE": OperatorConfig(self.operators[0].operator_name(),
-                                       {"lambda": lambda x, y: self.operators[0].operate(x, y)}),
-                "BIRTH_DATE": OperatorConfig(self.operators[1].operator_name(),
-                                             {"lambda": lambda x: self.operators[1].operate(x)}),
-                "MEDICAL_DATE": OperatorConfig(self.operators[2].operator_name(),
-                                               {"lambda": lambda x: self.operators[2].operate(x)}),
-                "COUNTRY": OperatorConfig(self.operators[3].operator_name(),
-                                          {"lambda": lambda x: self.operators[3].operate(x)}),
-                "CITY": OperatorConfig(self.operators[4].operator_name(),
-                                       {"lambda": lambda x: self.operators[4].operate(x)}),
-            },
-        )
-        anonymized_results.items.sort(key=lambda res: res.start)
+        with time_stage(doc.timings, "anonymizer"):
+            anonymized_results = self.anonymizer.anonymize(text=doc.text,
+                                                           analyzer_results=doc.granular_analyzer_results)
+            anonymized_results.items.sort(key=lambda res: res.start)
         doc.anonymized_text = anonymized_results
 
         return doc
 
+    def anonymize_many(self, docs: List[Doc]) -> List[Doc]:
+        """
+        This method anonymizes the entities of a batch of documents (see __call__)
+
+        :param docs: Doc objects which hold the input texts for PHI reduction and the entities which were previously
+        recognized by the identifier
+        :return: the updated Doc objects (in the same order) that contain the anonymized texts
+        """
+        if any(doc.timings is not None for doc in docs):
+            # the documents are anonymized one by one so the time of each document is recorded
+            return [self(doc) for doc in docs]
+        batch_anonymized_results = self.anonymizer.anonymize_many(
+            [doc.text for doc in docs], [doc.granular_analyzer_results for doc in docs])
+        for doc, anonymized_results in zip(docs, batch_anonymized_results):
+            anonymized_results.items.sort(key=lambda res: res.start)
+            doc.anonymized_text = anonymized_results
+        return docs
+
+    def init_operator_plan(self) -> OperatorPlan:
+        """
+        Creates the plan of the operators that anonymize each entity type (the entity types which are not in the plan
+        are replaced by their type)
+        :return: the operator plan
+        """
+        replace_in_hebrew, birth_date_operator, medical_date_operator, country_operator, city_operator = \
+            self.operators
+        entity_type_to_operator = {entity_type: replace_in_hebrew for entity_type in
+                                   ["PERS", "PER", "LOC", "GPE", "ORG", "FAC", "CREDIT_CARD", "ISRAELI_ID_NUMBER", "ID",
+                                    "EMAIL_ADDRESS", "IP_ADDRESS", "URL", "PHONE_NUMBER", "DATE"]}
+        entity_type_to_operator.update({
+            "BIRTH_DATE": birth_date_operator,
+            "MEDICAL_DATE": medical_date_operator,
+            "COUNTRY": country_operator,
+            "CITY": city_operator,
+        })
+        return OperatorPlan(entity_type_to_operator)
+
     def init_custom_operators(self) -> List[Operator]:
         """
         Creates the instances of custom operators to use during the anonymization process
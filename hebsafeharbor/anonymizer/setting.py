@@ -2,4 +2,6 @@
 
 DAY_MASK = "<יום_>"
 MONTH_MASK = "<חודש_>"
-YEAR_MASK = "<שנה_>"
\ No newline at end of file
+YEAR_MASK = "<שנה_>"
+CITY_MASK = "<מיקום_>"
+COUNTRY_MASK = "<מדינה_>"
\ No newline at end of file
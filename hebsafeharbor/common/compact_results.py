@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from presidio_analyzer import RecognizerResult, AnalysisExplanation
+from presidio_anonymizer.entities import EngineResult, OperatorResult
+
+from hebsafeharbor.common.document import Doc
+
+# (recognizer, original_score, score, pattern_name, pattern, validation_result, textual_explanation,
+# score_context_improvement, supportive_context_word)
+ExplanationTuple = Tuple[str, float, float, Optional[str], Optional[str], Optional[float], Optional[str], float, str]
+# (entity_type, start, end, score, analysis explanation, recognition metadata)
+SpanTuple = Tuple[str, int, int, float, Optional[ExplanationTuple], Optional[Dict[str, Any]]]
+# (start, end, entity_type, masked text, operator name)
+MaskTuple = Tuple[int, int, str, str, str]
+# the spans of each entities list on Doc followed by the anonymized text and its items
+CompactResults = Tuple[List[SpanTuple], List[SpanTuple], List[SpanTuple], List[SpanTuple], Optional[str],
+                       List[MaskTuple]]
+
+
+def pack_results(doc: Doc) -> CompactResults:
+    """
+    Packs the results stored in the given Doc into plain tuples which are cheap to pickle and store. The original text
+    is not part of the packed results.
+
+    :param doc: a Doc object after identification and anonymization
+    :return: the compact results of the document
+    """
+    anonymized_text = doc.anonymized_text.text if doc.anonymized_text else None
+    mask_items = [(item.start, item.end, item.entity_type, item.text, item.operator) for item in
+                  doc.anonymized_text.items] if doc.anonymized_text else []
+    return (pack_entities(doc.analyzer_results), pack_entities(doc.smoothed_entities),
+            pack_entities(doc.consolidated_results), pack_entities(doc.granular_analyzer_results),
+            anonymized_text, mask_items)
+
+
+def unpack_results(doc: Doc, results: CompactResults) -> Doc:
+    """
+    Fills the given Doc object with the packed results
+
+    :param doc: a Doc object which holds the input text
+    :param results: the compact results of the document (as created by pack_results)
+    :return: the updated Doc object
+    """
+    analyzer_results, smoothed_entities, consolidated_results, granular_analyzer_results, anonymized_text, \
+        mask_items = results
+    doc.analyzer_results = unpack_entities(analyzer_results)
+    doc.smoothed_entities = unpack_entities(smoothed_entities)
+    doc.consolidated_results = unpack_entities(consolidated_results)
+    doc.granular_analyzer_results = unpack_entities(granular_analyzer_results)
+    if anonymized_text is not None:
+        doc.anonymized_text = EngineResult(text=anonymized_text,
+                                           items=[OperatorResult(*mask_item) for mask_item in mask_items])
+    return doc
+
+
+def pack_entities(entities: List[RecognizerResult]) -> List[SpanTuple]:
+    """
+    Packs recognized entities into span tuples
+
+    :param entities: list of recognized entities
+    :return: list of span tuples
+    """
+    return [(entity.entity_type, entity.start, entity.end, entity.score,
+             pack_explanation(entity.analysis_explanation), copy_metadata(entity.recognition_metadata)) for entity in
+            entities]
+
+
+def unpack_entities(spans: List[SpanTuple]) -> List[RecognizerResult]:
+    """
+    Creates recognized entities out of span tuples
+
+    :param spans: list of span tuples
+    :return: list of recognized entities
+    """
+    return [RecognizerResult(entity_type, start, end, score, analysis_explanation=unpack_explanation(explanation),
+                             recognition_metadata=copy_metadata(recognition_metadata)) for
+            entity_type, start, end, score, explanation, recognition_metadata in spans]
+
+
+def pack_explanation(explanation: Optional[AnalysisExplanation]) -> Optional[ExplanationTuple]:
+    """
+    Packs the analysis explanation of an entity into a tuple
+
+    :param explanation: the analysis explanation (or None)
+    :return: the explanation tuple, or None if there is no explanation
+    """
+    if explanation is None:
+        return None
+    return (explanation.recognizer, explanation.original_score, explanation.score, explanation.pattern_name,
+            explanation.pattern, explanation.validation_result, explanation.textual_explanation,
+            explanation.score_context_improvement, explanation.supportive_context_word)
+
+
+def unpack_explanation(explanation: Optional[ExplanationTuple]) -> Optional[AnalysisExplanation]:
+    """
+    Creates an analysis explanation out of an explanation tuple
+
+    :param explanation: the explanation tuple (as created by pack_explanation) or None
+    :return: the analysis explanation, or None if there is no explanation
+    """
+    if explanation is None:
+        return None
+    recognizer, original_score, score, pattern_name, pattern, validation_result, textual_explanation, \
+        score_context_improvement, supportive_context_word = explanation
+    analysis_explanation = AnalysisExplanation(recognizer, original_score, pattern_name=pattern_name, pattern=pattern,
+                                               validation_result=validation_result,
+                                               textual_explanation=textual_explanation)
+    analysis_explanation.score = score
+    analysis_explanation.score_context_improvement = score_context_improvement
+    analysis_explanation.supportive_context_word = supportive_context_word
+    return analysis_explanation
+
+
+def copy_metadata(recognition_metadata: Any) -> Any:
+    """
+    Copies the recognition metadata of an entity, so the packed and the unpacked entities never share it
+
+    :param recognition_metadata: the recognition metadata (usually a dictionary with the recognizer name)
+    :return: a copy of the dictionary, or the metadata itself if it is not a dictionary
+    """
+    return dict(recognition_metadata) if isinstance(recognition_metadata, dict) else recognition_metadata
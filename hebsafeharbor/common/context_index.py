@@ -0,0 +1,85 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from hebsafeharbor.common.terms_recognizer import SharedTermsRecognizer, TermsRecognizer
+
+
+class ContextIndex:
+    """
+    The context phrases found in a single document. For each context vocabulary it holds the sorted end offsets of its
+    phrases, so checking whether a phrase of a vocabulary precedes an offset takes O(log n).
+    """
+
+    def __init__(self, vocabulary_to_end_offsets: Dict[str, List[int]]):
+        """
+        Initializes ContextIndex
+        :param vocabulary_to_end_offsets: mapping of vocabulary name to the sorted end offsets (the offset of the last
+        character) of its phrases in the document
+        """
+        self.vocabulary_to_end_offsets = vocabulary_to_end_offsets
+
+    def has_phrase_before(self, vocabulary_name: str, offset: int, window_size: int) -> bool:
+        """
+        Checks whether a phrase of the vocabulary ends before the given offset and within the window size, i.e. its end
+        offset is smaller than the given offset by at most window_size
+        :param vocabulary_name: the name of the context vocabulary
+        :param offset: the offset to look before (usually the start offset of an entity)
+        :param window_size: context size limit
+        :return: True if such a phrase exists and False otherwise
+        """
+        end_offsets = self.vocabulary_to_end_offsets[vocabulary_name]
+        # the closest phrase that ends before the offset is the last one before the insertion point of the offset
+        index = bisect_left(end_offsets, offset)
+        return index > 0 and offset - end_offsets[index - 1] <= window_size
+
+
+class ContextIndexer:
+    """
+    Holds the context vocabularies of the identification components (e.g. the context phrases of the conflict
+    resolution and the entity splitters) and builds the ContextIndex of a document in a single pass over all of them.
+    The components share one indexer, so the context index of each document is computed once.
+    """
+
+    def __init__(self):
+        """
+        Initializes ContextIndexer (with no vocabularies)
+        """
+        self.terms_recognizer = SharedTermsRecognizer()
+        self._vocabularies: Dict[str, Tuple[Tuple[str, ...], FrozenSet[str]]] = {}
+        # the context index of the last indexed text (per thread) - all the components query the same document
+        self._last_index = threading.local()
+
+    def add_vocabulary(self, vocabulary_name: str, phrase_list: List[str],
+                       prefixes: Optional[List[str]] = None) -> None:
+        """
+        Adds a context vocabulary to the indexer. Adding the same vocabulary again (e.g. by two instances of the same
+        component) has no effect.
+        :param vocabulary_name: unique name of the vocabulary
+        :param phrase_list: list of context phrases
+        :param prefixes: one letter prefixes (e.g. prepositions) that are allowed to be attached to the phrases
+        """
+        vocabulary = (tuple(phrase_list), TermsRecognizer.compile_prefixes(prefixes))
+        if vocabulary_name in self._vocabularies:
+            if self._vocabularies[vocabulary_name] != vocabulary:
+                raise ValueError(f"Context vocabulary {vocabulary_name} was already added with different phrases")
+            return
+        self._vocabularies[vocabulary_name] = vocabulary
+        self.terms_recognizer.add_lexicon(vocabulary_name, phrase_list, prefixes=prefixes)
+
+    def __call__(self, text: str) -> ContextIndex:
+        """
+        Builds the context index of the text (the index of the last text is reused)
+        :param text: text
+        :return: the context index of the text
+        """
+        vocabulary_to_offsets = self.terms_recognizer.scan(text)
+        last_index = getattr(self._last_index, "value", None)
+        if last_index is not None and last_index[0] is vocabulary_to_offsets:
+            return last_index[1]
+
+        context_index = ContextIndex(
+            {vocabulary_name: sorted(offset + length - 1 for offset, length in offsets) for vocabulary_name, offsets in
+             vocabulary_to_offsets.items()})
+        self._last_index.value = (vocabulary_to_offsets, context_index)
+        return context_index
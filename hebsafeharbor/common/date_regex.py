@@ -23,6 +23,9 @@ en_full_months_list = ['january', 'february', 'march', 'april', 'may', 'june', '
                        'november', 'december']
 en_month_re = '|'.join(en_abbrv_months_list + en_full_months_list)
 EN_DATE_REGEX = rf"\b(?P<month>(?i){en_month_re})(?:\s|,\s)(?P<day>{num_days_re})(?:st|th|rd|nd)?(?:\s|,\s)?(?P<year>\d\d|\d\d\d\d)?\b"
+# EN_DATE_REGEX without its inline flag, for the date parser which compiles the patterns with re.IGNORECASE (the re module
+# of python 3.11 rejects inline flags which are not at the start of the pattern)
+EN_DATE_PARSER_REGEX = EN_DATE_REGEX.replace("(?i)", "")
 
 # Dates with no punctuations (ddmmyyyy,mmddyyyy...)
 EN_DMY_REGEX = rf"\b{preposition_re}?(?:-|:)?(?P<day>[0-2][1-9]|3[0-1]|[1-2]0])(?P<month>1[1-2]|0[1-9])(?P<year>\d\d\d\d)\b"
@@ -1,5 +1,5 @@
 import re
-from typing import List, Tuple, Optional, Union
+from typing import List, Tuple, Optional, Union, FrozenSet, Set
 from hebsafeharbor.common.date_regex import (HEB_FULL_DATE_REGEX,
                                              HEB_MONTH_YEAR_REGEX,
                                              HEB_DAY_MONTH_REGEX,
@@ -7,11 +7,49 @@ from hebsafeharbor.common.date_regex import (HEB_FULL_DATE_REGEX,
                                              EN_DMY_REGEX,
                                              EN_MDY_REGEX,
                                              EN_YMD_REGEX,
-                                             EN_DATE_REGEX,
+                                             EN_DATE_PARSER_REGEX,
                                              SPLIT_BY_SPACE_REGEX)
 
 MIN_DATE_LENGTH = 6
 
+# the character classes that the date patterns require
+DIGIT = "DIGIT"
+HEBREW_LETTER = "HEBREW_LETTER"
+HEBREW_PUNCTUATION = "HEBREW_PUNCTUATION"
+LATIN_LETTER = "LATIN_LETTER"
+DATE_SEPARATOR = "DATE_SEPARATOR"
+CHAR_CLASS_TO_PATTERN = {
+    DIGIT: re.compile(r"\d"),
+    HEBREW_LETTER: re.compile(r"[א-ת]"),
+    # geresh and gershayim, which appear in the Hebrew days and years
+    HEBREW_PUNCTUATION: re.compile(r"[׳״]"),
+    # every English month name contains a letter which has no non ASCII case insensitive equivalent (unlike i, s and
+    # k), so a text without ASCII letters never matches them
+    LATIN_LETTER: re.compile(r"[a-zA-Z]"),
+    DATE_SEPARATOR: re.compile(r"[./-]")
+}
+
+# the date patterns in their order of precedence, each along with the character classes that a text must contain to
+# match it
+DATE_PATTERNS = [(HEB_FULL_DATE_REGEX, {HEBREW_LETTER, HEBREW_PUNCTUATION}),
+                 (HEB_MONTH_YEAR_REGEX, {HEBREW_LETTER, HEBREW_PUNCTUATION}),
+                 (HEB_DAY_MONTH_REGEX, {HEBREW_LETTER, HEBREW_PUNCTUATION}),
+                 (LATIN_DATE_REGEX, {HEBREW_LETTER}),
+                 (EN_DMY_REGEX, {DIGIT}),
+                 (EN_MDY_REGEX, {DIGIT}),
+                 (EN_YMD_REGEX, {DIGIT}),
+                 (EN_DATE_PARSER_REGEX, {LATIN_LETTER, DIGIT}),
+                 (SPLIT_BY_SPACE_REGEX, {DIGIT, DATE_SEPARATOR})]
+NUMERICAL_DATE_PATTERN = re.compile(r"(\d+)(?:[/.-/s])(\d+)(?:(?:[/.-/s])(\d+))?")
+SHORT_DATE_SEPARATOR_PATTERN = re.compile(r"[./-]")
+
+DAYS_OF_WEEK = frozenset(['sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday'])
+HEBREW_DAYS_OF_WEEK = ["שבת", "שישי", "חמישי", "רביעי", "שלישי", "שני", "ראשון"]
+HEBREW_DAY_OF_WEEK_PATTERN = re.compile(rf"(?:[ב,ה,ל,מה])?{'|'.join(HEBREW_DAYS_OF_WEEK)}")
+SEASONS = frozenset(["summer", "fall", "winter", "spring"])
+HEBREW_SEASONS = ["אביב", "סתיו", "חורף", "קיץ"]
+HEBREW_SEASON_PATTERN = re.compile(rf"([ב,ה,ל,מה])?({'|'.join(HEBREW_SEASONS)})")
+
 
 class DateMentionComponent:
     """
@@ -80,12 +118,11 @@ def set_date_mention_component(matched: re.Match, ind: Union[int, str]) -> Optio
     :return: a DateMentionComponent instance
     '''
     if type(ind) == int:
-        date_instance = DateMentionComponent(matched.group(ind), matched.span(ind)[0],
-                                             matched.span(ind)[1]) if ind > 0 else None
+        date_instance = DateMentionComponent(matched.group(ind), *matched.span(ind)) if ind > 0 else None
 
     else:
-        date_instance = DateMentionComponent(matched.group(ind), matched.span(ind)[0],
-                                             matched.span(ind)[1]) if ind in matched.groupdict() else None
+        date_instance = DateMentionComponent(matched.group(ind), *matched.span(ind)) if ind in matched.re.groupindex \
+            else None
 
     return date_instance
 
@@ -101,49 +138,98 @@ def set_date_mention_from_pattern_group_names(matched: re.Match) -> DateMention:
     return DateMention(day=day, month=month, year=year, text=matched.string)
 
 
-def extract_date_components(text: str) -> DateMention:
+class DateParser:
     """
-    Extracts the different date components out of the give recognized entity text
-
-    :param text: the recognized entity text
-    :return: a DateContainer object which contains the extracted date components (text and location) - day, month and
-    year - along with the separator.
+    A precompiled parser of the date components. The characters of the text are scanned once to find the character
+    classes it contains (e.g. Hebrew letters or digits), and only the date patterns that can match these classes are
+    searched, in their order of precedence. Hence, the result is identical to searching all the patterns one by one.
     """
 
-    # if there are less than 6 characters, it is probably not a date (just a mistake in recognition such as season,
-    # scale of pain 3/10, etc.)
-    if len(text) < MIN_DATE_LENGTH:
+    def __init__(self, patterns: List[Tuple[str, Set[str]]] = None, flags: int = re.IGNORECASE):
+        """
+        Initializes the DateParser
+
+        :param patterns: the date patterns in their order of precedence, each along with the character classes that a
+        text must contain to match it (DATE_PATTERNS if None)
+        :param flags: the flags of the date patterns
+        """
+        patterns = patterns if patterns is not None else DATE_PATTERNS
+        self.patterns = []
+        for pattern, char_classes in patterns:
+            compiled_pattern = re.compile(pattern, flags)
+            # the date components that the pattern captures
+            components = [component for component in ["day", "month", "year"] if
+                          component in compiled_pattern.groupindex]
+            self.patterns.append((compiled_pattern, frozenset(char_classes), components))
+
+    def __call__(self, text: str) -> DateMention:
+        """
+        Extracts the different date components out of the give recognized entity text
+
+        :param text: the recognized entity text
+        :return: a DateMention object which contains the extracted date components (text and location) - day, month and
+        year
+        """
+
+        # if there are less than 6 characters, it is probably not a date (just a mistake in recognition such as season,
+        # scale of pain 3/10, etc.)
+        if len(text) < MIN_DATE_LENGTH:
+            return DateMention()
+
+        char_classes = DateParser.get_char_classes(text)
+        matched, components = self.find_pattern(text, char_classes)
+        if matched:
+            # the same as set_date_mention_from_pattern_group_names, without looking up the groups of the match
+            return DateMention(**{component: DateMentionComponent(matched.group(component), *matched.span(component))
+                                  for component in components}, text=text)
+
+        # check if it's a numerical date (dd.mm.yyyy, mm-dd-yy etc.)
+        if DIGIT in char_classes:
+            num_date = extract_numerical_date_components(text)
+            if num_date:
+                return num_date
+
         return DateMention()
 
-    # Go over the different date patterns and search for a match
-    pattern_list = [HEB_FULL_DATE_REGEX, HEB_MONTH_YEAR_REGEX, HEB_DAY_MONTH_REGEX,
-                    LATIN_DATE_REGEX, EN_DMY_REGEX, EN_MDY_REGEX, EN_YMD_REGEX,
-                    EN_DATE_REGEX, SPLIT_BY_SPACE_REGEX]
+    def find_pattern(self, text: str, char_classes: FrozenSet[str]) -> Tuple[Optional[re.Match], List[str]]:
+        """
+        Searches the date patterns that can match the text and returns the match of the first matching pattern
 
-    matched = find_pattern(text, pattern_list)
-    if matched:
-        return set_date_mention_from_pattern_group_names(matched)
+        :param text: the original text
+        :param char_classes: the character classes of the text
+        :return: the match of the first matching pattern along with the date components it captures, or None and an
+        empty list if none of the patterns matched the given text
+        """
+        for pattern, required_char_classes, components in self.patterns:
+            if required_char_classes <= char_classes:
+                matched = pattern.search(text)
+                if matched:
+                    return matched, components
+        return None, []
+
+    @staticmethod
+    def get_char_classes(text: str) -> FrozenSet[str]:
+        """
+        Finds the character classes that appear in the text
 
-    # check if it's a numerical date (dd.mm.yyyy, mm-dd-yy etc.)
-    num_date = extract_numerical_date_components(text)
-    if num_date:
-        return num_date
+        :param text: the original text
+        :return: the character classes of the text
+        """
+        return frozenset(char_class for char_class, pattern in CHAR_CLASS_TO_PATTERN.items() if pattern.search(text))
 
-    return DateMention()
 
+DATE_PARSER = DateParser()
 
-def find_pattern(text: str, patterns: List[str]) -> Optional[re.Match]:
-    '''Receives text and a list of patterns and returns the matching pattern. 
-    If none of the patterns match, return None
-    :param text: the original text
-    :param patterns: a list of patterns
-    :return a matching pattern or None if none of the patterns matched the given text
-    '''
-    for pattern in patterns:
-        matched = re.search(pattern, text, re.IGNORECASE)
-        if matched:
-            return matched
-    return None
+
+def extract_date_components(text: str) -> DateMention:
+    """
+    Extracts the different date components out of the give recognized entity text
+
+    :param text: the recognized entity text
+    :return: a DateContainer object which contains the extracted date components (text and location) - day, month and
+    year - along with the separator.
+    """
+    return DATE_PARSER(text)
 
 
 def extract_numerical_date_components(text: str) -> Optional[DateMention]:
@@ -153,8 +239,7 @@ def extract_numerical_date_components(text: str) -> Optional[DateMention]:
        :return if a pattern was found, returns DateMention, otherwise returns None
     '''
     # Numerical dates
-    num_pattern = r"(\d+)(?:[/.-/s])(\d+)(?:(?:[/.-/s])(\d+))?"
-    matched = re.search(num_pattern, text)
+    matched = NUMERICAL_DATE_PATTERN.search(text)
     if matched:
         if not matched.group(3):  # date with only two components <month>[/.-]<year> or <year>[/.-]<month>
             day = None
@@ -208,7 +293,7 @@ def is_short_date(txt: str) -> bool:
     :param txt: a string
     :return True if txt can represent a partial date and False otherwise
     '''
-    if len(re.split(r"[./-]", txt)) == 2:
+    if len(SHORT_DATE_SEPARATOR_PATTERN.split(txt)) == 2:
         return True
     return False
 
@@ -219,9 +304,7 @@ def is_day_of_week(txt: str) -> bool:
     :param txt: string
     :return True id txt is one of the days of the week and False otherwise
     '''
-    dow_list = ['sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
-    heb_dow_list = ["שבת", "שישי", "חמישי", "רביעי", "שלישי", "שני", "ראשון"]
-    if (txt.lower() in dow_list) or (re.search(rf"(?:[ב,ה,ל,מה])?{'|'.join(heb_dow_list)}", txt.lower())):
+    if (txt.lower() in DAYS_OF_WEEK) or (HEBREW_DAY_OF_WEEK_PATTERN.search(txt.lower())):
         return True
     return False
 
@@ -231,8 +314,6 @@ def is_season(txt: str) -> bool:
     :param txt: string
     "return True if text is a season and False otherwise
     '''
-    season_list = ["summer", "fall", "winter", "spring"]
-    heb_season_list = ["אביב", "סתיו", "חורף", "קיץ"]
-    if (txt.lower() in season_list) or (re.match(rf"([ב,ה,ל,מה])?({'|'.join(heb_season_list)})", txt.lower())):
+    if (txt.lower() in SEASONS) or (HEBREW_SEASON_PATTERN.match(txt.lower())):
         return True
     return False
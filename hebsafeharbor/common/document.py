@@ -1,9 +1,11 @@
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from presidio_analyzer import RecognizerResult
 from presidio_anonymizer.entities import EngineResult
 
+from hebsafeharbor.common.timings import Timings
+
 
 class Doc:
     """
@@ -34,3 +36,6 @@ class Doc:
         self.consolidated_results: List[RecognizerResult] = []
         self.granular_analyzer_results: List[RecognizerResult] = []
         self.anonymized_text: EngineResult = []
+        self.error: Optional[str] = None
+        # the wall and CPU time of each stage of the process, None if the timings are not collected
+        self.timings: Optional[Timings] = None
@@ -0,0 +1,82 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Tuple
+
+
+class IntervalIndex:
+    """
+    Index of spans over the offsets of a text. Each offset belongs to the last added span that covers it (as if every
+    span assigned itself to all of its offsets in a mapping of offset to span), so the index is kept as sorted disjoint
+    segments of offsets that belong to the same span. Its memory and the time of its queries depend on the number of
+    spans rather than on their lengths.
+    """
+
+    def __init__(self, spans: Iterable[Tuple[int, int, Any]]):
+        """
+        Initializes IntervalIndex
+        :param spans: (start, end, value) tuples, the end offset is exclusive. Where spans overlap, the later span wins.
+        """
+        spans = [(start, end, order, value) for order, (start, end, value) in enumerate(spans) if start < end]
+        spans.sort(key=lambda span: span[0])
+        boundaries = sorted(set(offset for span in spans for offset in span[:2]))
+
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._values: List[Any] = []
+        # the spans that cover the current segment, the last added span is at the top of the heap
+        active_spans = []
+        last_order = None
+        span_index = 0
+        for start, end in zip(boundaries, boundaries[1:]):
+            while span_index < len(spans) and spans[span_index][0] <= start:
+                _, span_end, order, value = spans[span_index]
+                heapq.heappush(active_spans, (-order, span_end, value))
+                span_index += 1
+            while active_spans and active_spans[0][1] <= start:
+                heapq.heappop(active_spans)
+            if not active_spans:
+                last_order = None
+                continue
+            order, _, value = active_spans[0]
+            if order == last_order and self._ends[-1] == start:
+                # the segment continues the previous segment of the same span
+                self._ends[-1] = end
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+                self._values.append(value)
+            last_order = order
+
+    def __len__(self) -> int:
+        """
+        :return: the number of disjoint segments in the index
+        """
+        return len(self._starts)
+
+    def get_values_in_span(self, start: int, end: int) -> List[Any]:
+        """
+        Returns the values of the spans that own at least one offset within the given span boundaries
+        :param start: span's start offset
+        :param end: span's end offset (exclusive)
+        :return: the values, ordered by their offsets (a value can appear more than once)
+        """
+        return [self._values[index] for index in self._get_segments_in_span(start, end)]
+
+    def get_overlap_length(self, start: int, end: int) -> int:
+        """
+        Counts the offsets within the given span boundaries that are covered by any of the spans
+        :param start: span's start offset
+        :param end: span's end offset (exclusive)
+        :return: number of covered offsets
+        """
+        return sum(min(self._ends[index], end) - max(self._starts[index], start) for index in
+                   self._get_segments_in_span(start, end))
+
+    def _get_segments_in_span(self, start: int, end: int) -> range:
+        """
+        :return: the indices of the segments that overlap the given span boundaries
+        """
+        if start >= end:
+            return range(0)
+        # the segments are disjoint, so both their starts and ends are sorted
+        return range(bisect_right(self._ends, start), bisect_left(self._starts, end))
@@ -1,47 +1,207 @@
-import re
-from typing import List, Tuple, Optional
+import threading
+from typing import List, Tuple, Optional, FrozenSet, Dict
 import ahocorasick
 
 
 class TermsRecognizer:
 
-    def __init__(self, phrase_list: List[str]):
+    def __init__(self, phrase_list: List[str], prefixes: Optional[List[str]] = None):
         """
         Initializes TermsRecognizer
         :param phrase_list: list of terms to recognize
+        :param prefixes: one letter prefixes (e.g. prepositions) that are allowed to be attached to the terms. Used when
+        no prefixes are given to __call__
         """
         self._automaton = ahocorasick.Automaton(ahocorasick.STORE_LENGTH)
         for phrase in phrase_list:
             self._automaton.add_word(phrase)
         self._automaton.make_automaton()
+        self._prefixes = TermsRecognizer.compile_prefixes(prefixes)
 
     def __call__(self, text: str, prefixes: Optional[List[str]] = None) -> List[Tuple[int, int]]:
         """
-        This method searches for terms in text
+        This method searches for terms in text. A term is recognized only if it is not part of a longer word, i.e. it is
+        surrounded by non-word characters (or the text boundaries). A term can also be preceded by one of the prefixes,
+        in which case the prefix must be preceded by a non-word character (or the text beginning).
         :param text: text
+        :param prefixes: one letter prefixes that are allowed to be attached to the terms (the prefixes given on
+        initialization if None)
         :return: List of starting offsets of matches and their length
         """
+        allowed_prefixes = self._prefixes if prefixes is None else TermsRecognizer.compile_prefixes(prefixes)
         offsets = []
         for end_index_short, length in self._automaton.iter(text):
+            if length == 1:
+                continue
             offset = end_index_short - length + 1
-            if length == 1 or offset < 0 or offset >= len(text):
-                pass
-            else:
-                if prefixes:
-                    prefixes_pattern_raw = "|".join(prefixes)
-                    prefixes_pattern = r"\W(" + prefixes_pattern_raw + ")"
-                    start_cond = offset == 0 or re.match(r"\W", text[offset - 1]) or re.match(prefixes_pattern, text[
-                                                                                                                offset - 2:offset]) or (
-                                             offset == 1 and re.match(prefixes_pattern_raw, text[offset - 1]))
-                else:
-                    start_cond = offset == 0 or re.match(r"\W", text[offset - 1])
-                is_phrase = start_cond \
-                            and (offset + length == len(text)
-                                 or re.match(r"\W", text[offset + length]))
-                if is_phrase:
-                    offsets.append((offset, length))
+            if TermsRecognizer.is_term(text, offset, offset + length, allowed_prefixes):
+                offsets.append((offset, length))
 
         # drop duplicates
         offsets = list(set(offsets))
 
         return offsets
+
+    @staticmethod
+    def is_term(text: str, offset: int, end_offset: int, allowed_prefixes: FrozenSet[str]) -> bool:
+        """
+        Checks whether a match of a term in the text is not part of a longer word
+        :param text: text
+        :param offset: the start offset of the match
+        :param end_offset: the end offset of the match
+        :param allowed_prefixes: one letter prefixes that are allowed to be attached to the term
+        :return: True if the match is a term and False otherwise
+        """
+        # word characters are exactly the characters matched by \w - alphanumeric characters and underscore
+        if offset > 0:
+            previous_char = text[offset - 1]
+            if previous_char.isalnum() or previous_char == "_":
+                # the term is glued to a word, it is accepted only if this word is an allowed prefix
+                if previous_char not in allowed_prefixes:
+                    return False
+                if offset > 1:
+                    prefix_previous_char = text[offset - 2]
+                    if prefix_previous_char.isalnum() or prefix_previous_char == "_":
+                        return False
+        if end_offset < len(text):
+            next_char = text[end_offset]
+            if next_char.isalnum() or next_char == "_":
+                return False
+        return True
+
+    @staticmethod
+    def compile_prefixes(prefixes: Optional[List[str]]) -> FrozenSet[str]:
+        """
+        Creates the set of characters that are allowed to be attached to the beginning of a term. Since a prefix is
+        a single character that precedes the term, longer prefixes can never be matched and are ignored.
+        :param prefixes: list of prefixes
+        :return: set of one letter prefixes
+        """
+        if not prefixes:
+            return frozenset()
+        return frozenset(prefix for prefix in prefixes if len(prefix) == 1)
+
+
+class SharedTermsRecognizer:
+    """
+    Recognizes the terms of several lexicons in a single pass over the text. The phrases of all the lexicons are stored
+    in one automaton where each phrase holds the names of the lexicons it belongs to, and the matches are split between
+    the lexicons. The offsets of each lexicon are identical to the offsets returned by a TermsRecognizer of that lexicon.
+    """
+
+    def __init__(self):
+        """
+        Initializes SharedTermsRecognizer (with no lexicons)
+        """
+        self._lexicon_to_prefixes: Dict[str, FrozenSet[str]] = {}
+        self._phrase_to_lexicons: Dict[str, List[str]] = {}
+        self._automaton = None
+        self._build_lock = threading.Lock()
+        # the matches of the last scanned text (per thread) - all the lexicons are usually queried on the same text
+        self._last_scan = threading.local()
+
+    def add_lexicon(self, lexicon_name: str, phrase_list: List[str],
+                    prefixes: Optional[List[str]] = None) -> "LexiconTermsRecognizer":
+        """
+        Adds a lexicon to the shared automaton
+        :param lexicon_name: unique name of the lexicon
+        :param phrase_list: list of terms to recognize
+        :param prefixes: one letter prefixes (e.g. prepositions) that are allowed to be attached to the terms
+        :return: a terms recognizer of the lexicon which uses the shared automaton
+        """
+        if lexicon_name in self._lexicon_to_prefixes:
+            raise ValueError(f"Lexicon {lexicon_name} was already added")
+        with self._build_lock:
+            self._lexicon_to_prefixes[lexicon_name] = TermsRecognizer.compile_prefixes(prefixes)
+            for phrase in phrase_list:
+                lexicons = self._phrase_to_lexicons.setdefault(phrase, [])
+                if lexicon_name not in lexicons:
+                    lexicons.append(lexicon_name)
+            # the automaton is (re)built on the next scan
+            self._automaton = None
+        return LexiconTermsRecognizer(self, lexicon_name)
+
+    def __call__(self, text: str, lexicon_name: str) -> List[Tuple[int, int]]:
+        """
+        This method searches for the terms of a lexicon in text
+        :param text: text
+        :param lexicon_name: the name of the lexicon
+        :return: List of starting offsets of matches and their length
+        """
+        return self.scan(text)[lexicon_name]
+
+    def scan(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        This method searches for the terms of all the lexicons in text (the results of the last text are reused)
+        :param text: text
+        :return: mapping of lexicon name to the starting offsets of its matches and their length
+        """
+        last_scan = getattr(self._last_scan, "value", None)
+        if last_scan is not None and last_scan[0] == text and last_scan[1] is self._automaton:
+            return last_scan[2]
+
+        automaton = self._get_automaton()
+        lexicon_to_offsets = {lexicon_name: [] for lexicon_name in self._lexicon_to_prefixes}
+        for end_index_short, (length, prefixes_groups) in automaton.iter(text):
+            offset = end_index_short - length + 1
+            for allowed_prefixes, lexicon_names in prefixes_groups:
+                if TermsRecognizer.is_term(text, offset, offset + length, allowed_prefixes):
+                    for lexicon_name in lexicon_names:
+                        lexicon_to_offsets[lexicon_name].append((offset, length))
+
+        # drop duplicates
+        lexicon_to_offsets = {lexicon_name: list(set(offsets)) for lexicon_name, offsets in lexicon_to_offsets.items()}
+
+        self._last_scan.value = (text, automaton, lexicon_to_offsets)
+        return lexicon_to_offsets
+
+    def _get_automaton(self) -> ahocorasick.Automaton:
+        """
+        Returns the shared automaton, builds it if needed
+        :return: automaton which stores the length of each phrase and the names of the lexicons it belongs to, grouped
+        by their allowed prefixes (the boundaries of a match are checked once per group)
+        """
+        automaton = self._automaton
+        if automaton is not None:
+            return automaton
+        with self._build_lock:
+            if self._automaton is None:
+                automaton = ahocorasick.Automaton(ahocorasick.STORE_ANY)
+                for phrase, lexicon_names in self._phrase_to_lexicons.items():
+                    # one letter matches are never recognized as terms
+                    if len(phrase) == 1:
+                        continue
+                    prefixes_to_lexicons = {}
+                    for lexicon_name in lexicon_names:
+                        prefixes_to_lexicons.setdefault(self._lexicon_to_prefixes[lexicon_name], []).append(
+                            lexicon_name)
+                    prefixes_groups = tuple((allowed_prefixes, tuple(names)) for allowed_prefixes, names in
+                                            prefixes_to_lexicons.items())
+                    automaton.add_word(phrase, (len(phrase), prefixes_groups))
+                automaton.make_automaton()
+                self._automaton = automaton
+            return self._automaton
+
+
+class LexiconTermsRecognizer:
+    """
+    A terms recognizer of a single lexicon which is stored in a SharedTermsRecognizer
+    """
+
+    def __init__(self, shared_terms_recognizer: SharedTermsRecognizer, lexicon_name: str):
+        """
+        Initializes LexiconTermsRecognizer
+        :param shared_terms_recognizer: the shared terms recognizer which holds the lexicon
+        :param lexicon_name: the name of the lexicon
+        """
+        self.shared_terms_recognizer = shared_terms_recognizer
+        self.lexicon_name = lexicon_name
+
+    def __call__(self, text: str) -> List[Tuple[int, int]]:
+        """
+        This method searches for the terms of the lexicon in text
+        :param text: text
+        :return: List of starting offsets of matches and their length
+        """
+        return self.shared_terms_recognizer(text, self.lexicon_name)
+
@@ -0,0 +1,90 @@
+import re
+from typing import List, NamedTuple, Optional, Pattern, Tuple
+
+PARAGRAPH_BOUNDARY_PATTERN = re.compile(r"\n\s*")
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"[.!?;]\s+")
+WORD_BOUNDARY_PATTERN = re.compile(r"\s+")
+# the preferred boundaries of a core, from the most preferred (paragraphs) to the least preferred (words)
+CORE_BOUNDARY_PATTERNS = [PARAGRAPH_BOUNDARY_PATTERN, SENTENCE_BOUNDARY_PATTERN, WORD_BOUNDARY_PATTERN]
+
+
+class TextWindow(NamedTuple):
+    """
+    A window of a long text. The cores of the windows are consecutive and cover the whole text, and each window extends
+    its core with some context from both sides (so consecutive windows overlap).
+    """
+    start: int
+    end: int
+    core_start: int
+    core_end: int
+
+
+def find_boundary(text: str, min_offset: int, max_offset: int, last: bool = True,
+                  patterns: Optional[List[Pattern]] = None) -> Optional[int]:
+    """
+    Finds a boundary (the end of a match of a boundary pattern) in the given range of the text
+
+    :param text: the text
+    :param min_offset: the minimal offset of the boundary
+    :param max_offset: the maximal offset of the boundary
+    :param last: whether to return the last boundary in the range (or the first)
+    :param patterns: the boundary patterns, from the most preferred to the least preferred - the boundary is of the
+    most preferred pattern that has a match in the range (CORE_BOUNDARY_PATTERNS if None)
+    :return: the offset of the boundary, or None if the range contains no boundary
+    """
+    patterns = patterns if patterns is not None else CORE_BOUNDARY_PATTERNS
+    for pattern in patterns:
+        boundaries = [match.end() for match in pattern.finditer(text, max(min_offset - 1, 0), max_offset) if
+                      match.end() >= min_offset]
+        if boundaries:
+            return boundaries[-1] if last else boundaries[0]
+    return None
+
+
+def split_to_windows(text: str, window_size: int, window_stride: int) -> List[TextWindow]:
+    """
+    Splits the text into overlapping windows. The text is split into cores of at most window_stride characters, and
+    each core is extended with up to (window_size - window_stride) / 2 characters of context from each side. The cores
+    end at paragraph, sentence or word boundaries (in this order of preference) and the windows end at word boundaries,
+    when possible.
+
+    :param text: the text to split
+    :param window_size: the maximal length of a window (in characters)
+    :param window_stride: the maximal length of a core (in characters), not greater than window_size
+    :return: the windows of the text, a single window if the text is not longer than window_size
+    """
+    if len(text) <= window_size:
+        return [TextWindow(0, len(text), 0, len(text))]
+
+    core_starts = [0]
+    while len(text) - core_starts[-1] > window_stride:
+        core_start = core_starts[-1]
+        core_end = find_boundary(text, core_start + window_stride // 2 + 1, core_start + window_stride)
+        core_starts.append(core_end if core_end is not None else core_start + window_stride)
+
+    context_size = (window_size - window_stride) // 2
+    windows = []
+    for core_start, core_end in zip(core_starts, core_starts[1:] + [len(text)]):
+        # the context of the window is extended to the farthest word boundary within the context size
+        start = max(core_start - context_size, 0)
+        boundary = find_boundary(text, start, core_start - 1, last=False, patterns=[WORD_BOUNDARY_PATTERN])
+        start = boundary if boundary is not None and start > 0 else start
+        end = min(core_end + context_size, len(text))
+        boundary = find_boundary(text, core_end + 1, end, patterns=[WORD_BOUNDARY_PATTERN])
+        end = boundary if boundary is not None and end < len(text) else end
+        windows.append(TextWindow(start, end, core_start, core_end))
+    return windows
+
+
+def split_to_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Splits the text into consecutive segments that end at paragraph or sentence boundaries. The segments cover the whole
+    text, and each segment includes the whitespace that follows its sentence.
+
+    :param text: the text to split
+    :return: the (start, end) offsets of the segments
+    """
+    boundaries = {match.end() for pattern in [PARAGRAPH_BOUNDARY_PATTERN, SENTENCE_BOUNDARY_PATTERN] for match in
+                  pattern.finditer(text)}
+    starts = [0] + sorted(boundary for boundary in boundaries if 0 < boundary < len(text))
+    return list(zip(starts, starts[1:] + [len(text)]))
@@ -0,0 +1,91 @@
+import time
+from typing import Dict, Optional
+
+# wall and CPU time (in seconds) of each stage, and of each item of the stages that are made of several items (for
+# example, {"nlp": {"wall": 0.2, "cpu": 0.3}, "recognizers": {"EmailRecognizer": {"wall": 0.001, "cpu": 0.001}}})
+Timings = Dict[str, Dict]
+
+
+class _NoTimer:
+    """
+    A context manager that does nothing, used when the timings are not collected
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _StageTimer:
+    """
+    A context manager that adds the wall and CPU time of its block to the timings
+    """
+
+    def __init__(self, timings: Timings, stage: str, item: Optional[str]):
+        self.timings = timings
+        self.stage = stage
+        self.item = item
+
+    def __enter__(self):
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        add_time(self.timings, time.perf_counter() - self.start_wall, time.process_time() - self.start_cpu,
+                 self.stage, self.item)
+        return False
+
+
+def time_stage(timings: Optional[Timings], stage: str, item: Optional[str] = None):
+    """
+    Returns a context manager that adds the wall and CPU time of its block to the timings of the given stage (or of the
+    given item of the stage). The CPU time is of the whole process, so it includes the threads of the NLP model.
+
+    :param timings: the timings of a document, or None if the timings are not collected
+    :param stage: the name of the stage
+    :param item: the name of the item of the stage (for example, the name of a recognizer), None to time the stage itself
+    :return: a context manager which times its block, it does nothing if timings is None
+    """
+    if timings is None:
+        return _NO_TIMER
+    return _StageTimer(timings, stage, item)
+
+
+def add_time(timings: Timings, wall: float, cpu: float, stage: str, item: Optional[str] = None) -> None:
+    """
+    Adds wall and CPU time to the timings of the given stage (or of the given item of the stage)
+
+    :param timings: the timings of a document
+    :param wall: the wall time (in seconds)
+    :param cpu: the CPU time (in seconds)
+    :param stage: the name of the stage
+    :param item: the name of the item of the stage, None to add the time to the stage itself
+    """
+    entry = timings.setdefault(stage, {})
+    if item is not None:
+        entry = entry.setdefault(item, {})
+    entry["wall"] = entry.get("wall", 0.0) + wall
+    entry["cpu"] = entry.get("cpu", 0.0) + cpu
+
+
+def merge_timings(target: Timings, source: Timings) -> Timings:
+    """
+    Adds the times of the source timings to the target timings
+
+    :param target: the timings to update
+    :param source: the timings to add
+    :return: the updated target timings
+    """
+    for stage, entry in source.items():
+        if "wall" in entry:
+            add_time(target, entry["wall"], entry["cpu"], stage)
+        else:
+            for item, item_entry in entry.items():
+                add_time(target, item_entry["wall"], item_entry["cpu"], stage, item)
+    return target
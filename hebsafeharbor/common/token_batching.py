@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+
+def estimate_num_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text by its number of whitespace separated tokens
+
+    :param text: the text
+    :return: the estimated number of tokens
+    """
+    return len(text.split())
+
+
+def plan_token_batches(lengths: List[int], max_batch_tokens: int, max_batch_size: Optional[int] = None) -> List[
+    List[int]]:
+    """
+    Groups texts into batches whose padded size (the number of texts times the length of the longest text of the batch)
+    does not exceed the token budget. The texts are sorted by their length (from the longest to the shortest), so each
+    batch holds texts of similar lengths and little of it is padding. A text that is longer than the budget forms a batch
+    of its own.
+
+    :param lengths: the lengths (in tokens) of the texts
+    :param max_batch_tokens: the maximal padded size (in tokens) of a batch, 0 disables the budget, and the texts are
+    batched in their original order
+    :param max_batch_size: the maximal number of texts in a batch (unlimited if None)
+    :return: the batches, each batch is a list of indices of texts
+    """
+    if not max_batch_tokens:
+        batch_size = max_batch_size or max(len(lengths), 1)
+        return [list(range(start, min(start + batch_size, len(lengths)))) for start in
+                range(0, len(lengths), batch_size)]
+
+    batches = []
+    batch, batch_max_length = [], 0
+    for index in sorted(range(len(lengths)), key=lambda text_index: lengths[text_index], reverse=True):
+        # the texts are sorted by decreasing length, so the first text of a batch is its longest one
+        if batch and ((len(batch) + 1) * batch_max_length > max_batch_tokens or len(batch) == max_batch_size):
+            batches.append(batch)
+            batch = []
+        if not batch:
+            batch_max_length = lengths[index]
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
@@ -1,5 +1,6 @@
 from .consolidation.consolidator import NerConsolidator
 from .heb_nlp_engine import HebSpacyNlpEngine
+from .heb_analyzer_engine import HebAnalyzerEngine
 from .phi_identifier import PhiIdentifier
 
-__all__ = ["HebSpacyNlpEngine", "PhiIdentifier", "NerConsolidator"]
+__all__ = ["HebSpacyNlpEngine", "HebAnalyzerEngine", "PhiIdentifier", "NerConsolidator"]
@@ -1,9 +1,10 @@
-import copy
-from typing import List
+from typing import List, Optional, Tuple
 
 from presidio_analyzer import RecognizerResult
 
+from hebsafeharbor.common.context_index import ContextIndexer
 from hebsafeharbor.common.document import Doc
+from hebsafeharbor.common.timings import time_stage
 from hebsafeharbor.identifier.consolidation.conflict_handler import ExactMatch, SameCategory, SameBoundaries, Mixed
 from hebsafeharbor.identifier.consolidation.consolidation_config import ENTITY_TYPE_TO_CATEGORY, ConflictCase
 from hebsafeharbor.identifier.consolidation.filter_entities import FilterEntities
@@ -20,10 +21,16 @@ class NerConsolidator:
     entities without overlaps. It applies custom policy for prioritizing the results of the different signals.
     """
 
-    def __init__(self):
+    def __init__(self, context_indexer: Optional[ContextIndexer] = None):
+        """
+        Initializes NerConsolidator
+
+        :param context_indexer: the context indexer shared by the context based components (a new one if None)
+        """
+        context_indexer = context_indexer if context_indexer else ContextIndexer()
         self.filter_entities = FilterEntities()
         self.prefer_longest_entity_resolver = PreferLongestEntity()
-        self.context_based_resolver = ContextBasedResolver()
+        self.context_based_resolver = ContextBasedResolver(context_indexer=context_indexer)
         self.category_majority_resolver = CategoryMajorityResolver()
         self.conflict_handlers = {
             ConflictCase.EXACT_MATCH: ExactMatch(),
@@ -33,7 +40,8 @@ class NerConsolidator:
                                                          self.category_majority_resolver),
             ConflictCase.MIXED: Mixed(self.prefer_longest_entity_resolver)
         }
-        self.postprocess_consolidators = [CityCountryPostConsolidator(), MedicalPostConsolidator()]
+        self.postprocess_consolidators = [CityCountryPostConsolidator(),
+                                          MedicalPostConsolidator(context_indexer=context_indexer)]
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -41,11 +49,18 @@ class NerConsolidator:
         :return: an updated Doc object that contains the consolidated entities (a set of entities with no overlaps)
         """
 
-        recognized_entities = copy.deepcopy(doc.smoothed_entities)
+        # the entities are shared with the smoothed entities, the post consolidators replace the entities they adjust
+        # with updated copies
+        recognized_entities = list(doc.smoothed_entities)
         filtered_entities = self.filter_entities(recognized_entities, doc)
-        group = NerConsolidator.get_next_overlapped_entities_group(filtered_entities, 0)
+        # the filtered entities are sorted by their offsets, so each group is found by a forward scan from the start of
+        # the previous group (the groups are found in a single pass over the entities)
+        filtered_entities_starts = [entity.start for entity in filtered_entities]
+        group_start_index, group_end_index = NerConsolidator.find_next_overlapped_entities_group(
+            filtered_entities_starts, filtered_entities, 0)
         consolidated_entities = []
-        while len(group) > 0:
+        while group_start_index < group_end_index:
+            group = filtered_entities[group_start_index:group_end_index]
             selected_entity = self.consolidate_entities(group, doc)
             if selected_entity is None:
                 # only one entity in group and it doesn't satisfy the minimal conditions
@@ -53,7 +68,8 @@ class NerConsolidator:
             else:
                 consolidated_entities += selected_entity
                 last_entity = selected_entity[-1]
-            group = NerConsolidator.get_next_overlapped_entities_group(filtered_entities, last_entity.end)
+            group_start_index, group_end_index = NerConsolidator.find_next_overlapped_entities_group(
+                filtered_entities_starts, filtered_entities, last_entity.end, group_start_index)
 
         # trigger the custom entity consolidators
         for custom_consolidator in self.postprocess_consolidators:
@@ -61,34 +77,57 @@ class NerConsolidator:
                 lambda entity: entity.entity_type in custom_consolidator.supported_entity_types,
                 recognized_entities)
             if custom_entities:
-                consolidated_entities = custom_consolidator(consolidated_entities, list(custom_entities), doc)
+                with time_stage(doc.timings, "post_consolidators", type(custom_consolidator).__name__):
+                    consolidated_entities = custom_consolidator(consolidated_entities, list(custom_entities), doc)
 
         doc.consolidated_results = consolidated_entities
         return doc
 
     @staticmethod
-    def get_next_overlapped_entities_group(entities: List[RecognizerResult], start_offset: int) -> List[
-        RecognizerResult]:
+    def get_next_overlapped_entities_group(entities: List[RecognizerResult], start_offset: int,
+                                           entities_starts: Optional[List[int]] = None) -> List[RecognizerResult]:
         """
         Helper function for getting the next group of overlapped entities
 
         :param entities: recognized entities
         :param start_offset: the offset to start the search from
+        :param entities_starts: the start offsets of the given entities. If given, the entities must be sorted by their
+        start offset (otherwise they are sorted by this function)
         :return: the next subgroup of overlapped entities (the returned list will be empty if no entities left)
         """
-        group = []
-        not_yet_handled_entities = list(filter(lambda entity: entity.start >= start_offset, entities))
-        if len(not_yet_handled_entities) == 0:
-            return group
-        not_yet_handled_entities = sorted(not_yet_handled_entities, key=lambda entity: entity.start)
-        group.append(not_yet_handled_entities[0])
-        min_group_offset, max_group_offset = group[0].start, group[0].end
-        for entity in not_yet_handled_entities[1:]:
-            if min_group_offset <= entity.start < max_group_offset:
-                group.append(entity)
-            else:
-                return group
-        return group
+        if entities_starts is None:
+            entities = sorted(entities, key=lambda entity: entity.start)
+            entities_starts = [entity.start for entity in entities]
+        group_start_index, group_end_index = NerConsolidator.find_next_overlapped_entities_group(entities_starts,
+                                                                                                entities, start_offset)
+        return entities[group_start_index:group_end_index]
+
+    @staticmethod
+    def find_next_overlapped_entities_group(entities_starts: List[int], entities: List[RecognizerResult],
+                                            start_offset: int, start_index: int = 0) -> Tuple[int, int]:
+        """
+        Helper function for finding the indices of the next group of overlapped entities, by a forward scan from the
+        given index
+
+        :param entities_starts: the start offsets of the entities
+        :param entities: recognized entities, sorted by their start offset
+        :param start_offset: the offset to start the search from
+        :param start_index: the index to start the search from, no entity before it starts at start_offset or after it
+        (for example, the start index of the previous group, since the start offsets of the groups are increasing)
+        :return: the start and end indices of the next subgroup of overlapped entities (the indices are equal if no
+        entities left)
+        """
+        num_entities = len(entities)
+        group_start_index = start_index
+        while group_start_index < num_entities and entities_starts[group_start_index] < start_offset:
+            group_start_index += 1
+        if group_start_index == num_entities:
+            return num_entities, num_entities
+        max_group_offset = entities[group_start_index].end
+        group_end_index = group_start_index + 1
+        while group_end_index < num_entities and entities_starts[group_end_index] < max_group_offset:
+            group_end_index += 1
+        return group_start_index, group_end_index
 
     @staticmethod
     def keep_single_entity(entity: RecognizerResult, doc: Doc) -> bool:
@@ -1,11 +1,11 @@
 from abc import abstractmethod, ABC
 from collections import Counter
-from typing import List
+from typing import List, Optional
 
 from presidio_analyzer import RecognizerResult
 
 from hebsafeharbor import Doc
-from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+from hebsafeharbor.common.context_index import ContextIndexer
 from hebsafeharbor.identifier.consolidation.consolidation_config import CATEGORY_TO_CONTEXT_PHRASES, ENTITY_TYPE_TO_CATEGORY
 
 
@@ -44,16 +44,17 @@ class PreferLongestEntity(OverlapResolver):
 
 class ContextBasedResolver(OverlapResolver):
 
-    def __init__(self, window_size=5):
+    def __init__(self, window_size=5, context_indexer: Optional[ContextIndexer] = None):
         """
-        Initializes ContextBasedResolver by creating the TermsRecognizer(s) for each of the categories
+        Initializes ContextBasedResolver by adding the context phrases of each of the categories to the context indexer
 
         :param window_size: context size limit (one side)
+        :param context_indexer: the context indexer shared with the other components (a new one if None)
         """
         self.window_size = window_size
-        self.category_to_recognizer = {}
+        self.context_indexer = context_indexer if context_indexer else ContextIndexer()
         for category, context_phrases in CATEGORY_TO_CONTEXT_PHRASES.items():
-            self.category_to_recognizer[category] = TermsRecognizer(context_phrases)
+            self.context_indexer.add_vocabulary(category, context_phrases)
 
     def __call__(self, entities_in_conflict: List[RecognizerResult], doc: Doc) -> List[RecognizerResult]:
         """
@@ -64,16 +65,10 @@ class ContextBasedResolver(OverlapResolver):
         :param doc: Doc object
         :return: the entities to be kept according to the context
         """
-        categories = set(map(lambda entity: ENTITY_TYPE_TO_CATEGORY[entity.entity_type], entities_in_conflict))
-        category_to_offsets = {category: self.category_to_recognizer[category](doc.text) for category in categories}
-        category_to_end_offsets = {}
-        for category, offsets in category_to_offsets.items():
-            category_to_end_offsets[category] = list(map(lambda offset: offset[0] + offset[1] - 1, offsets))
-
-        for index, entity in enumerate(entities_in_conflict):
+        context_index = self.context_indexer(doc.text)
+        for entity in entities_in_conflict:
             entity_category = ENTITY_TYPE_TO_CATEGORY[entity.entity_type]
-            preceding = list(filter(lambda offset: offset < entity.start, category_to_end_offsets[entity_category]))
-            if len(preceding) > 0 and any(entity.start - end_offset <= self.window_size for end_offset in preceding):
+            if context_index.has_phrase_before(entity_category, entity.start, self.window_size):
                 return [entity]
 
         # in case that there are no indicators in context, return the longest entity
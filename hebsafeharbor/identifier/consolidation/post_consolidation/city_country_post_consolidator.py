@@ -60,19 +60,23 @@ class CityCountryPostConsolidator(PostConsolidatorRule):
                 # If entity is within [from both sides] longer entity - we prefer longer entity regardless of priority
                 if (consolidated_entities[cur_entity_id].start - consolidated_entities[prev_entity_id].start) > 1 & (
                         consolidated_entities[prev_entity_id].end - consolidated_entities[cur_entity_id].end) >= 1:
-                    consolidated_entities[cur_entity_id].end = consolidated_entities[cur_entity_id].start
+                    consolidated_entities[cur_entity_id] = self.copy_with_offsets(
+                        consolidated_entities[cur_entity_id], end=consolidated_entities[cur_entity_id].start)
                     # prev_entity_id stays the same
                 # if current entity has priority, we'll adjust previous
                 elif cur_entity_id == primary_entity_id:
-                    consolidated_entities[prev_entity_id].end = consolidated_entities[cur_entity_id].start
+                    consolidated_entities[prev_entity_id] = self.copy_with_offsets(
+                        consolidated_entities[prev_entity_id], end=consolidated_entities[cur_entity_id].start)
                     prev_entity_id = cur_entity_id
                 # if previous entity has priority, we'll adjust current
                 else:
                     if consolidated_entities[prev_entity_id].end <= consolidated_entities[cur_entity_id].end:
-                        consolidated_entities[cur_entity_id].start = consolidated_entities[prev_entity_id].end
+                        consolidated_entities[cur_entity_id] = self.copy_with_offsets(
+                            consolidated_entities[cur_entity_id], start=consolidated_entities[prev_entity_id].end)
                         prev_entity_id = cur_entity_id
                     else:
-                        consolidated_entities[cur_entity_id].start = consolidated_entities[cur_entity_id].end
+                        consolidated_entities[cur_entity_id] = self.copy_with_offsets(
+                            consolidated_entities[cur_entity_id], start=consolidated_entities[cur_entity_id].end)
                         # prev_entity_id stays the same
             else:
                 prev_entity_id = cur_entity_id
@@ -1,10 +1,11 @@
-from typing import List, Dict, Set
+from typing import List, Set, Optional
 
 from presidio_analyzer import RecognizerResult
 
 from hebsafeharbor import Doc
 from hebsafeharbor.common.prepositions import DISEASE_PREPOSITIONS, MEDICATION_PREPOSITIONS, MEDICAL_TEST_PREPOSITIONS
-from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+from hebsafeharbor.common.context_index import ContextIndexer
+from hebsafeharbor.common.interval_index import IntervalIndex
 from hebsafeharbor.identifier.consolidation.consolidation_config import CATEGORY_TO_CONTEXT_PHRASES, \
     ENTITY_TYPE_TO_CATEGORY
 from hebsafeharbor.identifier.consolidation.post_consolidation.post_consolidator_rule import PostConsolidatorRule
@@ -19,15 +20,23 @@ class MedicalPostConsolidator(PostConsolidatorRule):
     MEDICAL_PHRASE_WINDOW_SIZE = 15
     HEALTHCATRE_PROFESSIONAL_WINDOW_SIZE = 5
 
-    def __init__(self):
+    def __init__(self, context_indexer: Optional[ContextIndexer] = None):
         """
         Initializes MedicalPostConsolidator
+
+        :param context_indexer: the context indexer shared with the other components (a new one if None)
         """
         super().__init__(supported_entity_types=["DISEASE", "MEDICATION", "MEDICAL_TEST"],
                          lower_preference_entity_types=["PERS", "PER", "ORG", "FAC"],
                          prefer_other_types=False)
 
         self.medical_prepositions = set(DISEASE_PREPOSITIONS + MEDICATION_PREPOSITIONS + MEDICAL_TEST_PREPOSITIONS)
+        # the context phrases may be attached to the medical prepositions
+        self.context_indexer = context_indexer if context_indexer else ContextIndexer()
+        self.context_indexer.add_vocabulary("MEDICAL_WITH_PREPOSITIONS", CATEGORY_TO_CONTEXT_PHRASES["MEDICAL"],
+                                            prefixes=sorted(self.medical_prepositions))
+        self.context_indexer.add_vocabulary("HEALTHCARE_PROFESSIONAL_WITH_PREPOSITIONS", HEALTHCARE_PROFESSIONAL,
+                                            prefixes=sorted(self.medical_prepositions))
 
     def __call__(self, consolidated_entities: List[RecognizerResult], custom_entities: List[RecognizerResult],
                  doc: Doc) -> List[RecognizerResult]:
@@ -103,37 +112,28 @@ class MedicalPostConsolidator(PostConsolidatorRule):
         return entity.start >= medical_entity.start and entity.end <= medical_entity.end
 
     @staticmethod
-    def map_offset_to_entity(entities: List[RecognizerResult]) -> Dict[int, RecognizerResult]:
+    def map_offset_to_entity(entities: List[RecognizerResult]) -> IntervalIndex:
         """
-        Creates a mapping of an offset to the entity in this offset. Note that if an offset is not part of any entity it
-        won't be part of the mapping
+        Creates a mapping of an offset to the entity in this offset, where an offset which is covered by several
+        entities is mapped to the last of them. Note that if an offset is not part of any entity it won't be part of the
+        mapping
 
         :param entities: list of entities to map
-        :return: a mapping of an offset to the entity in this offset, if an offset is not part of any entity it won't be
-        part of the mapping
+        :return: an interval index that maps an offset to the entity in this offset
         """
-        offset_to_entity = {}
-        for entity in entities:
-            for i in range(entity.start, entity.end):
-                offset_to_entity[i] = entity
-        return offset_to_entity
+        return IntervalIndex((entity.start, entity.end, entity) for entity in entities)
 
     @staticmethod
-    def get_entities_in_span(offset_to_entity: Dict[int, RecognizerResult], start: int, end: int) -> Set[
-        RecognizerResult]:
+    def get_entities_in_span(offset_to_entity: IntervalIndex, start: int, end: int) -> Set[RecognizerResult]:
         """
         Based on the given offset to entity mapping, returns the entities exist in the given span boundaries
 
-        :param offset_to_entity: a mapping of an offset to the entity in this offset
+        :param offset_to_entity: an interval index that maps an offset to the entity in this offset
         :param start: span's start offset
         :param end: span's end offset
         :return: entities within the span
         """
-        entities = []
-        for i in range(start, end):
-            if i in offset_to_entity:
-                entities.append(offset_to_entity[i])
-        return set(entities)
+        return set(offset_to_entity.get_values_in_span(start, end))
 
     def infer_by_context(self, doc: Doc, consolidated_entities: List[RecognizerResult]) -> List[RecognizerResult]:
         """
@@ -144,16 +144,12 @@ class MedicalPostConsolidator(PostConsolidatorRule):
         :param consolidated_entities: recognized entities
         :return: updated list of consolidated entities
         """
-        medical_rec = TermsRecognizer(CATEGORY_TO_CONTEXT_PHRASES["MEDICAL"])
-        offsets = medical_rec(doc.text, list(self.medical_prepositions))
-        end_offsets = list(map(lambda offset: offset[0] + offset[1] - 1, offsets))
+        context_index = self.context_indexer(doc.text)
         res = []
         for entity in consolidated_entities:
             if entity.entity_type in self.lower_preference_entity_types:
-                preceding = list(filter(lambda offset: offset < entity.start, end_offsets))
-                if not any(
-                        entity.start - end_offset <= MedicalPostConsolidator.MEDICAL_PHRASE_WINDOW_SIZE for end_offset
-                        in preceding):
+                if not context_index.has_phrase_before("MEDICAL_WITH_PREPOSITIONS", entity.start,
+                                                       MedicalPostConsolidator.MEDICAL_PHRASE_WINDOW_SIZE):
                     res.append(entity)
             else:
                 res.append(entity)
@@ -169,16 +165,13 @@ class MedicalPostConsolidator(PostConsolidatorRule):
         :param consolidated_entities: recognized entities
         :return: updated list of consolidated entities
         """
-        healthcare_professional_rec = TermsRecognizer(HEALTHCARE_PROFESSIONAL)
-        offsets = healthcare_professional_rec(doc.text, list(self.medical_prepositions))
-        end_offsets = list(map(lambda offset: offset[0] + offset[1] - 1, offsets))
+        context_index = self.context_indexer(doc.text)
         res = []
         for entity in consolidated_entities:
             if ENTITY_TYPE_TO_CATEGORY[entity.entity_type] == "NAME":
                 if entity.start >= int(0.2 * len(doc.text)):
-                    preceding = list(filter(lambda offset: offset < entity.start, end_offsets))
-                    if any(entity.start - end_offset <= MedicalPostConsolidator.HEALTHCATRE_PROFESSIONAL_WINDOW_SIZE for
-                           end_offset in preceding):
+                    if context_index.has_phrase_before("HEALTHCARE_PROFESSIONAL_WITH_PREPOSITIONS", entity.start,
+                                                       MedicalPostConsolidator.HEALTHCATRE_PROFESSIONAL_WINDOW_SIZE):
                         res.append(entity)
                 else:
                     res.append(entity)
@@ -1,5 +1,6 @@
+import copy
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 from presidio_analyzer import RecognizerResult
 
@@ -70,4 +71,23 @@ class PostConsolidatorRule(ABC):
         else:
             prioritized_entity_list = prioritized_entity_list + other_entity_types
 
-        return prioritized_entity_list
\ No newline at end of file
+        return prioritized_entity_list
+
+    @staticmethod
+    def copy_with_offsets(entity: RecognizerResult, start: Optional[int] = None,
+                          end: Optional[int] = None) -> RecognizerResult:
+        """
+        Creates a copy of the given entity with updated offsets. The entities are shared with the previous stages of the
+        identification process, so they must not be changed in place.
+
+        :param entity: the entity to adjust
+        :param start: the new start offset (the original start offset is kept if None)
+        :param end: the new end offset (the original end offset is kept if None)
+        :return the adjusted copy of the entity
+        """
+        adjusted_entity = copy.copy(entity)
+        if start is not None:
+            adjusted_entity.start = start
+        if end is not None:
+            adjusted_entity.end = end
+        return adjusted_entity
@@ -1,5 +1,3 @@
-import copy
-
 from hebsafeharbor import Doc
 from hebsafeharbor.identifier.entity_smoother.location_merger_rule import LocationsMergerRule
 
@@ -27,8 +25,9 @@ class EntitySmootherRuleExecutor:
         :return an updated document after performing the rules
         """
 
-        # initialize the entity smoother section in Doc with a deep copy of the recognized entities
-        doc.smoothed_entities = copy.deepcopy(doc.analyzer_results)
+        # initialize the entity smoother section in Doc with a copy of the recognized entities list. The entities
+        # themselves are shared, a rule that changes an entity replaces it with an updated copy
+        doc.smoothed_entities = list(doc.analyzer_results)
 
         # apply first rule - merge two consecutive LOC entities if there is a number between them
         doc = self.locations_merger_rule(doc)
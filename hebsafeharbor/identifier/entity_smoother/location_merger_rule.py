@@ -1,3 +1,4 @@
+import copy
 import re
 from typing import List, Callable
 
@@ -39,8 +40,9 @@ class LocationsMergerRule(EntitySmootherRule):
         i = 0
         while i + 1 < len(heb_spacy_entities):
             if self.requirement([heb_spacy_entities[i], heb_spacy_entities[i + 1]], doc):
-                # merging the entities along with the number between them
-                merged_entity = heb_spacy_entities[i]
+                # merging the entities along with the number between them (on a copy, the entity is shared with the
+                # recognized entities)
+                merged_entity = copy.copy(heb_spacy_entities[i])
                 merged_entity.end = heb_spacy_entities[i + 1].end
                 entities_after_expansion.append(merged_entity)
                 # moving on to the next pair of entities
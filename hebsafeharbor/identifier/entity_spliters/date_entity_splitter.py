@@ -1,5 +1,7 @@
+from typing import Optional
+
 from hebsafeharbor import Doc
-from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+from hebsafeharbor.common.context_index import ContextIndexer
 from hebsafeharbor.identifier.entity_spliters.entity_splitter import EntitySplitter
 
 
@@ -12,13 +14,16 @@ class DateEntitySplitter(EntitySplitter):
     BIRTH_DATE_CONTEXT = ["נולד", "נולדה", "תאריך לידה", "ת.לידה"]
     WINDOW_SIZE = 10
 
-    def __init__(self):
+    def __init__(self, context_indexer: Optional[ContextIndexer] = None):
         """
         Initializes DateEntitySplitter
+
+        :param context_indexer: the context indexer shared with the other components (a new one if None)
         """
         super().__init__(
             supported_entity_types=["DATE", "DATE_TIME", "HEBREW_DATE", "LATIN_DATE", "PREPOSITION_DATE", "NOISY_DATE"])
-        self.birth_date_terms_recognizer = TermsRecognizer(DateEntitySplitter.BIRTH_DATE_CONTEXT)
+        self.context_indexer = context_indexer if context_indexer else ContextIndexer()
+        self.context_indexer.add_vocabulary("BIRTH_DATE", DateEntitySplitter.BIRTH_DATE_CONTEXT)
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -30,17 +35,14 @@ class DateEntitySplitter(EntitySplitter):
         if len(date_entities) == 0:
             return doc
 
-        birth_date_offsets = self.birth_date_terms_recognizer(doc.text)
-        if len(birth_date_offsets) == 0:
-            for entity in date_entities:
-                entity.entity_type = "MEDICAL_DATE"
-        birth_date_end_offsets = list(map(lambda offset: offset[0] + offset[1] - 1, birth_date_offsets))
-
-        for entity in date_entities:
-            preceding = list(filter(lambda offset: offset < entity.start, birth_date_end_offsets))
-            if any(entity.start - end_offset < DateEntitySplitter.WINDOW_SIZE for end_offset in preceding):
-                entity.entity_type = "BIRTH_DATE"
+        context_index = self.context_indexer(doc.text)
+        for index, entity in enumerate(doc.granular_analyzer_results):
+            if entity.entity_type not in self.supported_entity_types:
+                continue
+            # the birth date context must end less than WINDOW_SIZE characters before the date
+            if context_index.has_phrase_before("BIRTH_DATE", entity.start, DateEntitySplitter.WINDOW_SIZE - 1):
+                doc.granular_analyzer_results[index] = self.copy_with_entity_type(entity, "BIRTH_DATE")
             else:
-                entity.entity_type = "MEDICAL_DATE"
+                doc.granular_analyzer_results[index] = self.copy_with_entity_type(entity, "MEDICAL_DATE")
 
         return doc
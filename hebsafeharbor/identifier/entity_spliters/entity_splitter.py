@@ -1,3 +1,4 @@
+import copy
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -40,3 +41,17 @@ class EntitySplitter(ABC):
         """
         return list(
             filter(lambda entity: entity.entity_type in self.supported_entity_types, doc.granular_analyzer_results))
+
+    @staticmethod
+    def copy_with_entity_type(entity: RecognizerResult, entity_type: str) -> RecognizerResult:
+        """
+        Creates a copy of the given entity with a more specific type. The entities are shared with the consolidated
+        entities, so they must not be changed in place.
+
+        :param entity: the entity to split
+        :param entity_type: the new entity type
+        :return the copy of the entity with the new type
+        """
+        granular_entity = copy.copy(entity)
+        granular_entity.entity_type = entity_type
+        return granular_entity
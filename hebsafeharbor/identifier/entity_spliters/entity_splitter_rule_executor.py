@@ -1,6 +1,7 @@
-import copy
+from typing import Optional
 
 from hebsafeharbor import Doc
+from hebsafeharbor.common.context_index import ContextIndexer
 from hebsafeharbor.identifier.entity_spliters.date_entity_splitter import DateEntitySplitter
 
 class EntitySplitterRuleExecutor:
@@ -9,13 +10,15 @@ class EntitySplitterRuleExecutor:
     Note that after calling the executor the entities can possibly changed
     """
 
-    def __init__(self):
+    def __init__(self, context_indexer: Optional[ContextIndexer] = None):
         """
         Initializing the EntitySplitterRuleExecutor
+
+        :param context_indexer: the context indexer shared with the other components (a new one if None)
         """
 
         # rules
-        self.date_entity_splitter = DateEntitySplitter()
+        self.date_entity_splitter = DateEntitySplitter(context_indexer=context_indexer)
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -26,8 +29,9 @@ class EntitySplitterRuleExecutor:
         :return an updated document after triggering the entity splitters
         """
 
-        # initialize the entity splitter section in Doc with a deep copy of the consolidated recognized entities
-        doc.granular_analyzer_results = copy.deepcopy(doc.consolidated_results)
+        # initialize the entity splitter section in Doc with a copy of the consolidated recognized entities list. The
+        # entities themselves are shared, an entity splitter replaces the entities it changes with updated copies
+        doc.granular_analyzer_results = list(doc.consolidated_results)
 
         # trigger the first entity splitter which decides for each DATE entity whether it is BIRTH_DATE or MEDICAL_DATE
         doc = self.date_entity_splitter(doc)
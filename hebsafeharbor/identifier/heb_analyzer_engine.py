@@ -0,0 +1,157 @@
+import json
+import time
+from typing import List, Optional
+
+from presidio_analyzer import AnalyzerEngine, EntityRecognizer, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngine
+
+from hebsafeharbor.common.timings import Timings, add_time, time_stage
+from hebsafeharbor.identifier.recognizer_prescreener import RecognizerPrescreener
+
+
+class HebAnalyzerEngine(AnalyzerEngine):
+    """
+    Wrapper class for AnalyzerEngine (@Presidio) which can accept NLP artifacts that were computed in advance. It allows
+    running the NLP pipeline over a batch of texts at once and then feeding each text's artifacts to the recognizers.
+    Recognizers that can not match a text (according to the character-class profile of the text) are skipped by a
+    RecognizerPrescreener.
+    The time of the NLP pipeline, of each recognizer and of the context enhancement can be recorded into given timings.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes HebAnalyzerEngine, accepts the same arguments as AnalyzerEngine
+        """
+        super().__init__(*args, **kwargs)
+        self.recognizer_prescreener = RecognizerPrescreener()
+
+    def analyze(
+            self,
+            text: str,
+            language: str,
+            entities: Optional[List[str]] = None,
+            correlation_id: Optional[str] = None,
+            score_threshold: Optional[float] = None,
+            return_decision_process: Optional[bool] = False,
+            ad_hoc_recognizers: Optional[List[EntityRecognizer]] = None,
+            context: Optional[List[str]] = None,
+            nlp_artifacts: Optional[NlpArtifacts] = None,
+            timings: Optional[Timings] = None,
+            recognizer_names: Optional[List[str]] = None,
+    ) -> List[RecognizerResult]:
+        """
+        Find PHI entities in text using the registered recognizers. Behaves exactly like AnalyzerEngine.analyze except
+        that the NLP engine is invoked only if no precomputed NLP artifacts were given.
+
+        :param text: the text to analyze
+        :param language: the language of the text
+        :param entities: list of entities to look for (None means all the supported entities)
+        :param correlation_id: cross call ID for this request
+        :param score_threshold: a minimum value for which to return an identified entity
+        :param return_decision_process: whether the analysis decision process steps returned in the response
+        :param ad_hoc_recognizers: list of recognizers which will be used only for this specific request
+        :param context: list of context words to enhance confidence score
+        :param nlp_artifacts: precomputed NLP artifacts of the text (computed by the NLP engine if not given)
+        :param timings: timings to add the time of the analysis stages to (the time is not recorded if None)
+        :param recognizer_names: the names of the recognizers to apply (all the recognizers of the registry if None)
+        :return: list of the recognized entities
+        """
+        all_fields = not entities
+
+        recognizers = self.registry.get_recognizers(
+            language=language,
+            entities=entities,
+            all_fields=all_fields,
+            ad_hoc_recognizers=ad_hoc_recognizers,
+        )
+        if recognizer_names is not None:
+            recognizers = [recognizer for recognizer in recognizers if recognizer.name in recognizer_names]
+
+        if all_fields:
+            entities = self.get_supported_entities(language=language)
+
+        if nlp_artifacts is None:
+            with time_stage(timings, "nlp"):
+                nlp_artifacts = self.nlp_engine.process_text(text, language)
+
+        if self.log_decision_process:
+            self.app_tracer.trace(correlation_id, "nlp artifacts:" + nlp_artifacts.to_json())
+
+        with time_stage(timings, "prescreening"):
+            # skip the recognizers whose required characters are absent from the text
+            text_profile = self.recognizer_prescreener.get_profile(text)
+            relevant_recognizers = self.recognizer_prescreener.filter_recognizers(recognizers, text_profile)
+
+        results = []
+        for recognizer in relevant_recognizers:
+            # lazy loading of the relevant recognizers
+            if not recognizer.is_loaded:
+                recognizer.load()
+                recognizer.is_loaded = True
+
+            with time_stage(timings, "recognizers", recognizer.name):
+                current_results = recognizer.analyze(text=text, entities=entities, nlp_artifacts=nlp_artifacts)
+            if current_results:
+                HebAnalyzerEngine._add_recognizer_name_if_not_exists(current_results, recognizer)
+                results.extend(current_results)
+
+        with time_stage(timings, "context_enhancement"):
+            results = self._enhance_using_context(text, results, nlp_artifacts, recognizers, context)
+
+        if self.log_decision_process:
+            self.app_tracer.trace(correlation_id, json.dumps([str(result.to_dict()) for result in results]))
+
+        # remove duplicates or low score results
+        results = EntityRecognizer.remove_duplicates(results)
+        if score_threshold is None:
+            score_threshold = self.default_score_threshold
+        results = [result for result in results if result.score >= score_threshold]
+
+        if not return_decision_process:
+            for result in results:
+                result.analysis_explanation = None
+
+        return results
+
+    def analyze_batch(self, texts: List[str], language: str, timings: Optional[List[Optional[Timings]]] = None,
+                      nlp_engine: Optional[NlpEngine] = None, **kwargs) -> List[List[RecognizerResult]]:
+        """
+        Find PHI entities in a batch of texts. The NLP engine processes all the texts in one call and the recognizers
+        are then applied on each text using its precomputed NLP artifacts.
+
+        :param texts: the texts to analyze
+        :param language: the language of the texts
+        :param timings: timings to add the time of the analysis stages to, per text (the time is not recorded if None).
+        The time of the NLP pipeline is divided between the texts by their length
+        :param nlp_engine: the NLP engine that processes the texts (the NLP engine of the analyzer if None)
+        :param kwargs: additional arguments passed to analyze (per text)
+        :return: list of the recognized entities per text (in the order of the given texts)
+        """
+        timings = timings if timings is not None else [None] * len(texts)
+        nlp_engine = nlp_engine if nlp_engine is not None else self.nlp_engine
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        batch_nlp_artifacts = nlp_engine.process_batch(texts, language)
+        if any(text_timings is not None for text_timings in timings):
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            total_length = sum(len(text) for text in texts)
+            for text, text_timings in zip(texts, timings):
+                if text_timings is not None:
+                    share = len(text) / total_length if total_length else 1 / len(texts)
+                    add_time(text_timings, wall * share, cpu * share, "nlp")
+        return [self.analyze(text=text, language=language, nlp_artifacts=nlp_artifacts, timings=text_timings, **kwargs)
+                for text, nlp_artifacts, text_timings in zip(texts, batch_nlp_artifacts, timings)]
+
+    @staticmethod
+    def _add_recognizer_name_if_not_exists(results: List[RecognizerResult], recognizer: EntityRecognizer) -> None:
+        """
+        Ensures that the recognizer name exists in the recognition metadata of each result (it is required for the
+        context aware enhancement)
+
+        :param results: list of recognized entities
+        :param recognizer: the recognizer that recognized the entities
+        """
+        for result in results:
+            if not result.recognition_metadata:
+                result.recognition_metadata = dict()
+            if RecognizerResult.RECOGNIZER_NAME_KEY not in result.recognition_metadata:
+                result.recognition_metadata[RecognizerResult.RECOGNIZER_NAME_KEY] = recognizer.name
@@ -1,19 +1,214 @@
-from typing import Optional, Dict
+import os
+import threading
+from typing import Optional, Dict, List
 
+import spacy
 from presidio_analyzer.nlp_engine import SpacyNlpEngine, NlpArtifacts
-from spacy.tokens import Doc
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+
+from hebsafeharbor.common.text_windows import TextWindow, split_to_windows
+from hebsafeharbor.common.token_batching import estimate_num_tokens, plan_token_batches
+
+# the window size and stride (in characters) of long texts, chunking is disabled if the window size is 0 (the default)
+WINDOW_SIZE_ENV_VAR = "HSH_NLP_WINDOW_SIZE"
+WINDOW_STRIDE_ENV_VAR = "HSH_NLP_WINDOW_STRIDE"
+DEFAULT_WINDOW_SIZE = 0
+DEFAULT_WINDOW_STRIDE = 2000
+# the maximal padded size (in estimated tokens) of a batch of texts, batching by a token budget is disabled if it is 0
+BATCH_MAX_TOKENS_ENV_VAR = "HSH_NLP_BATCH_MAX_TOKENS"
+DEFAULT_BATCH_MAX_TOKENS = 4096
+# the span extension that holds the confidence score of the entities (see SpacyRecognizerWithConfidence)
+CONFIDENCE_SCORE_EXTENSION = "confidence_score"
+
+
+def create_tokenizer_pipeline() -> Language:
+    """
+    Creates a spaCy pipeline for Hebrew that only tokenizes the text and splits it into sentences (by punctuation), for
+    running the rule based signals without the NER model
+
+    :return: the spaCy pipeline
+    """
+    nlp = spacy.blank("he")
+    nlp.add_pipe("sentencizer")
+    return nlp
 
 
 class HebSpacyNlpEngine(SpacyNlpEngine):
     """
     Wrapper class for SpacyNlpEngine, for cases where lemmas are not provided by the spaCy pipeline.
     Replaces lemmas with the original token text.
+    Calls to the spaCy pipeline are serialized, so the engine can be shared between threads.
+    Texts that are longer than the window size are processed in overlapping windows, and the entities and sentences of
+    the windows are merged into a single spaCy Doc of the entire text.
+    The texts (and windows) of a batch are sorted by their length and grouped into batches of similar lengths, whose
+    padded size is capped by a token budget, and the results are returned in the order of the input texts.
     """
 
-    def __init__(self, models: Optional[Dict[str, str]] = None):
-        if not models:
-            models = {"he": "he_ner_news_trf"}
-        super().__init__(models=models)
+    def __init__(self, models: Optional[Dict[str, str]] = None, batch_size: Optional[int] = None,
+                 window_size: Optional[int] = None, window_stride: Optional[int] = None,
+                 max_batch_tokens: Optional[int] = None, nlp: Optional[Dict[str, Language]] = None):
+        """
+        Initializes HebSpacyNlpEngine
+
+        :param models: dictionary with the name of the spaCy model per language
+        :param batch_size: the maximal number of texts that the spaCy pipeline processes at once (the batch size of the
+        spaCy pipeline if None)
+        :param window_size: the maximal length (in characters) of a text or a window that the spaCy pipeline processes
+        at once, 0 disables the chunking (HSH_NLP_WINDOW_SIZE or DEFAULT_WINDOW_SIZE if None)
+        :param window_stride: the length (in characters) of the part of each window whose entities are kept, the rest
+        of the window is context that overlaps the adjacent windows (HSH_NLP_WINDOW_STRIDE or DEFAULT_WINDOW_STRIDE if
+        None)
+        :param max_batch_tokens: the maximal padded size (the number of texts times the estimated number of tokens of
+        the longest text) of a batch that the spaCy pipeline processes at once, 0 disables the length bucketing and the
+        texts are processed in their original order (HSH_NLP_BATCH_MAX_TOKENS or DEFAULT_BATCH_MAX_TOKENS if None)
+        :param nlp: dictionary with a spaCy pipeline per language, to use pipelines that were already created instead of
+        loading the models
+        """
+        if nlp is not None:
+            self.nlp = nlp
+        else:
+            if not models:
+                models = {"he": "he_ner_news_trf"}
+            super().__init__(models=models)
+        self.batch_size = batch_size
+        self.window_size = window_size if window_size is not None else int(
+            os.environ.get(WINDOW_SIZE_ENV_VAR, DEFAULT_WINDOW_SIZE))
+        self.window_stride = window_stride if window_stride is not None else int(
+            os.environ.get(WINDOW_STRIDE_ENV_VAR, DEFAULT_WINDOW_STRIDE))
+        if self.window_size and not 0 < self.window_stride <= self.window_size:
+            raise ValueError(f"The window stride must be positive and not greater than the window size, got stride "
+                             f"{self.window_stride} and size {self.window_size}")
+        self.max_batch_tokens = max_batch_tokens if max_batch_tokens is not None else int(
+            os.environ.get(BATCH_MAX_TOKENS_ENV_VAR, DEFAULT_BATCH_MAX_TOKENS))
+        self.batch_stats = {"batches": 0, "texts": 0, "tokens": 0, "padded_tokens": 0, "max_batch_texts": 0}
+        self._lock = threading.Lock()
+
+    def process_text(self, text: str, language: str) -> NlpArtifacts:
+        """
+        Executes the spaCy NLP pipeline on the given text
+
+        :param text: the text to process
+        :param language: the language of the text
+        :return: the NLP artifacts of the text
+        """
+        if self.window_size and len(text) > self.window_size:
+            return self.process_batch([text], language)[0]
+        with self._lock:
+            doc = self.nlp[language](text)
+        return self._doc_to_nlp_artifact(doc, language)
+
+    def process_batch(self, texts: List[str], language: str) -> List[NlpArtifacts]:
+        """
+        Executes the spaCy NLP pipeline on a batch of texts at once (using nlp.pipe). The windows of the long texts are
+        processed in the same batch.
+
+        :param texts: the texts to process
+        :param language: the language of the texts
+        :return: list of NLP artifacts, one per text (in the order of the given texts)
+        """
+        if self.window_size:
+            batch_windows = [split_to_windows(text, self.window_size, self.window_stride) for text in texts]
+        else:
+            batch_windows = [[TextWindow(0, len(text), 0, len(text))] for text in texts]
+        window_texts = [text[window.start:window.end] for text, windows in zip(texts, batch_windows) for window in
+                        windows]
+
+        docs = []
+        with self._lock:
+            window_docs = iter(self._pipe(window_texts, language))
+            for text, windows in zip(texts, batch_windows):
+                if len(windows) == 1:
+                    docs.append(next(window_docs))
+                else:
+                    docs.append(self._merge_windows(text, windows, [next(window_docs) for _ in windows], language))
+        return [self._doc_to_nlp_artifact(doc, language) for doc in docs]
+
+    def _pipe(self, texts: List[str], language: str) -> List[Doc]:
+        """
+        Runs the spaCy pipeline on the texts in batches of similar lengths (see plan_token_batches) and updates the
+        batch statistics. Must be called while holding the lock.
+
+        :param texts: the texts to process
+        :param language: the language of the texts
+        :return: list of spaCy Docs, one per text (in the order of the given texts)
+        """
+        nlp = self.nlp[language]
+        lengths = [estimate_num_tokens(text) for text in texts]
+        docs = [None] * len(texts)
+        for batch in plan_token_batches(lengths, self.max_batch_tokens, self.batch_size or nlp.batch_size):
+            batch_docs = nlp.pipe([texts[index] for index in batch], batch_size=len(batch))
+            for index, doc in zip(batch, batch_docs):
+                docs[index] = doc
+            self.batch_stats["batches"] += 1
+            self.batch_stats["texts"] += len(batch)
+            self.batch_stats["tokens"] += sum(lengths[index] for index in batch)
+            self.batch_stats["padded_tokens"] += len(batch) * max(lengths[index] for index in batch)
+            self.batch_stats["max_batch_texts"] = max(self.batch_stats["max_batch_texts"], len(batch))
+        return docs
+
+    def get_batch_stats(self) -> Dict:
+        """
+        Returns the batching settings and statistics of the spaCy pipeline. The padding efficiency is the ratio of the
+        (estimated) tokens of the texts to the padded size of the batches.
+
+        :return: dictionary of the batching settings and statistics
+        """
+        with self._lock:
+            stats = dict(self.batch_stats)
+        batches = max(stats["batches"], 1)
+        return {
+            "settings": {
+                "max_batch_tokens": self.max_batch_tokens,
+                "batch_size": self.batch_size,
+            },
+            **stats,
+            "avg_texts_per_batch": stats["texts"] / batches,
+            "avg_padded_tokens_per_batch": stats["padded_tokens"] / batches,
+            "padding_efficiency": stats["tokens"] / stats["padded_tokens"] if stats["padded_tokens"] else 1.0,
+        }
+
+    def _merge_windows(self, text: str, windows: List[TextWindow], window_docs: List[Doc], language: str) -> Doc:
+        """
+        Merges the spaCy Docs of the windows of a text into a single Doc of the text. The text is tokenized again as a
+        whole, and each window contributes the entities and the sentence boundaries of its core (an entity belongs to
+        the window whose core contains its start). Entities that overlap a previous entity are dropped.
+
+        :param text: the text
+        :param windows: the windows of the text
+        :param window_docs: the spaCy Docs of the windows (in the order of the windows)
+        :param language: the language of the text
+        :return: spaCy Doc of the text
+        """
+        doc = self.nlp[language].make_doc(text)
+        offset_to_token_index = {token.idx: token.i for token in doc}
+        copy_sentences = all(window_doc.has_annotation("SENT_START") for window_doc in window_docs)
+        # the confidence scores are copied if they are stored by the entities (rather than computed by a getter)
+        copy_confidence_score = Span.has_extension(CONFIDENCE_SCORE_EXTENSION) and \
+            Span.get_extension(CONFIDENCE_SCORE_EXTENSION)[2] is None
+
+        entities = []
+        for window, window_doc in zip(windows, window_docs):
+            if copy_sentences:
+                # the first token of a window is always a sentence start in the window Doc, so it is not copied
+                for token in window_doc[1:]:
+                    token_index = offset_to_token_index.get(window.start + token.idx)
+                    if token_index is not None and window.core_start <= window.start + token.idx < window.core_end:
+                        doc[token_index].is_sent_start = token.is_sent_start
+            for window_entity in window_doc.ents:
+                start = window.start + window_entity.start_char
+                if not window.core_start <= start < window.core_end:
+                    continue
+                entity = doc.char_span(start, window.start + window_entity.end_char, label=window_entity.label_,
+                                       alignment_mode="expand")
+                if entity is None or (entities and entity.start < entities[-1].end):
+                    continue
+                if copy_confidence_score:
+                    entity._.set(CONFIDENCE_SCORE_EXTENSION, window_entity._.get(CONFIDENCE_SCORE_EXTENSION))
+                entities.append(entity)
+
+        doc.ents = entities
+        return doc
 
     def _doc_to_nlp_artifact(self, doc: Doc, language: str) -> NlpArtifacts:
         tokens_indices = [token.idx for token in doc]
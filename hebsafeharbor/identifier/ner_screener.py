@@ -0,0 +1,92 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from presidio_analyzer import RecognizerResult
+from spacy.lang.he.stop_words import STOP_WORDS
+
+from hebsafeharbor.common.interval_index import IntervalIndex
+from hebsafeharbor.lexicons.body_parts import BODY_PARTS
+from hebsafeharbor.lexicons.disease import DISEASES
+from hebsafeharbor.lexicons.healthcare_professional import HEALTHCARE_PROFESSIONAL
+from hebsafeharbor.lexicons.lab_tests import LAB_TESTS
+from hebsafeharbor.lexicons.medical_device import MEDICAL_DEVICE
+from hebsafeharbor.lexicons.medical_tests import MEDICAL_TESTS
+from hebsafeharbor.lexicons.medications import MEDICATIONS
+
+HEBREW_WORD_PATTERN = re.compile(r"[א-ת]+(?:['\"׳״][א-ת]+)*")
+# the letters that can be attached to the beginning of a Hebrew word (and, the, in, to, from, that, as)
+HEBREW_PREFIX_LETTERS = "והבלמשכ"
+MAX_PREFIX_LENGTH = 2
+
+
+class NerScreener:
+    """
+    Decides which sentences the NER model should process, after the rule based signals were applied. A sentence is sent
+    to the NER model if it contains a Hebrew content word that is neither covered by an entity of the rule based signals
+    nor a known word - a stop word or a word of the medical lexicons (which hold no names of people, places or
+    organizations). The rest of the sentences hold only numbers, codes, known terms, etc., so their entities are found
+    by the rule based signals.
+    """
+
+    def __init__(self, known_words: Iterable[str] = ()):
+        """
+        Initializes NerScreener
+
+        :param known_words: words in addition to the stop words and the words of the medical lexicons that don't require
+        the NER model
+        """
+        self.known_words = set(STOP_WORDS).union(known_words)
+        for lexicon in [BODY_PARTS, DISEASES, HEALTHCARE_PROFESSIONAL, LAB_TESTS, MEDICAL_DEVICE, MEDICAL_TESTS,
+                        MEDICATIONS]:
+            for phrase in lexicon:
+                self.known_words.update(HEBREW_WORD_PATTERN.findall(phrase))
+        self._lock = threading.Lock()
+        self.stats = {"sentences": 0, "screened_sentences": 0}
+
+    def is_known_word(self, word: str) -> bool:
+        """
+        Checks whether the word (or the word without its prefix letters) is a known word
+
+        :param word: a Hebrew word
+        :return: whether the word is known
+        """
+        for prefix_length in range(min(MAX_PREFIX_LENGTH, len(word) - 2) + 1):
+            if prefix_length > 0 and word[prefix_length - 1] not in HEBREW_PREFIX_LETTERS:
+                break
+            if word[prefix_length:] in self.known_words:
+                return True
+        return False
+
+    def screen(self, text: str, sentences: List[Tuple[int, int]], rule_results: List[RecognizerResult]) -> List[
+            Tuple[int, int]]:
+        """
+        Returns the sentences of the text that should be processed by the NER model
+
+        :param text: the text
+        :param sentences: the (start, end) offsets of the sentences of the text
+        :param rule_results: the entities recognized by the rule based signals in the text
+        :return: the (start, end) offsets of the sentences that should be processed by the NER model
+        """
+        covered = IntervalIndex((result.start, result.end, None) for result in rule_results)
+        screened_sentences = []
+        for start, end in sentences:
+            for match in HEBREW_WORD_PATTERN.finditer(text, start, end):
+                if len(match.group()) > 1 and covered.get_overlap_length(match.start(), match.end()) == 0 and \
+                        not self.is_known_word(match.group()):
+                    screened_sentences.append((start, end))
+                    break
+        with self._lock:
+            self.stats["sentences"] += len(sentences)
+            self.stats["screened_sentences"] += len(screened_sentences)
+        return screened_sentences
+
+    def get_stats(self) -> Dict:
+        """
+        Returns the number of sentences that were screened and the number of sentences that were sent to the NER model
+
+        :return: dictionary of the screening statistics
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        return {**stats, "ner_rate": stats["screened_sentences"] / max(stats["sentences"], 1)}
@@ -1,4 +1,8 @@
-from typing import List
+import copy
+import os
+import threading
+from bisect import bisect_right
+from typing import List, Optional
 
 from hebsafeharbor.common.city_utils import (
     BELOW_THRESHOLD_CITIES_LIST,
@@ -8,20 +12,32 @@ from hebsafeharbor.common.city_utils import (
     AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST,
     AMBIGUOUS_CITIES_CONTEXT
 )
+from hebsafeharbor.common.context_index import ContextIndexer
 from hebsafeharbor.common.country_utils import COUNTRY_DICT
 from hebsafeharbor.common.document import Doc
+from hebsafeharbor.common.terms_recognizer import SharedTermsRecognizer
+from hebsafeharbor.common.text_windows import split_to_sentences
+from hebsafeharbor.common.timings import time_stage
 from hebsafeharbor.common.prepositions import LOCATION_PREPOSITIONS, DISEASE_PREPOSITIONS, MEDICATION_PREPOSITIONS, \
     MEDICAL_TEST_PREPOSITIONS
 from hebsafeharbor.identifier import HebSpacyNlpEngine
+from hebsafeharbor.identifier.heb_analyzer_engine import HebAnalyzerEngine
+from hebsafeharbor.identifier.heb_nlp_engine import create_tokenizer_pipeline
+from hebsafeharbor.identifier.ner_screener import NerScreener
+from hebsafeharbor.identifier.recognizer_prescreener import RecognizerPrescreener, DIGIT, AT_SIGN, COLON, \
+    LATIN_LETTER, HEBREW_MONTH_NAME
+from hebsafeharbor.identifier.sentence_memo import SentenceMemo
 from hebsafeharbor.identifier.consolidation.consolidator import NerConsolidator
 from hebsafeharbor.identifier.entity_smoother.entity_smoother_rule_executor import EntitySmootherRuleExecutor
 from hebsafeharbor.identifier.entity_spliters.entity_splitter_rule_executor import EntitySplitterRuleExecutor
 
 from hebsafeharbor.identifier.signals import *
-from presidio_analyzer import AnalyzerEngine, LocalRecognizer, RecognizerRegistry
-from presidio_analyzer.predefined_recognizers import CreditCardRecognizer, DateRecognizer, EmailRecognizer, \
-    IpRecognizer, PhoneRecognizer, UrlRecognizer
+from presidio_analyzer import EntityRecognizer, LocalRecognizer, RecognizerRegistry, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpEngine
+from presidio_analyzer.predefined_recognizers import PhoneRecognizer
 
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CreditCardRecognizer, DateRecognizer, \
+    EmailRecognizer, IpRecognizer, UrlRecognizer
 from hebsafeharbor.identifier.signals.noisy_date_recognizer import NoisyDateRecognizer
 from hebsafeharbor.lexicons.disease import DISEASES
 from hebsafeharbor.lexicons.lab_tests import LAB_TESTS
@@ -29,6 +45,22 @@ from hebsafeharbor.lexicons.medical_device import MEDICAL_DEVICE
 from hebsafeharbor.lexicons.medical_tests import MEDICAL_TESTS
 from hebsafeharbor.lexicons.medications import MEDICATIONS
 
+# the maximal number of sentences whose recognizer results are memoized, sentence memoization is disabled if it is 0
+SENTENCE_MEMO_SIZE_ENV_VAR = "HSH_SENTENCE_MEMO_SIZE"
+DEFAULT_SENTENCE_MEMO_SIZE = 0
+# the processing modes: "full" runs the NER model over the whole texts, "rule_only" runs only the rule based signals
+# (lexicons and patterns) and "fast_screen" runs the rule based signals first and the NER model only over the sentences
+# that hold Hebrew words which the rule based signals and the lexicons don't cover
+FULL_MODE = "full"
+RULE_ONLY_MODE = "rule_only"
+FAST_SCREEN_MODE = "fast_screen"
+PROCESSING_MODES = [FULL_MODE, RULE_ONLY_MODE, FAST_SCREEN_MODE]
+MODE_ENV_VAR = "HSH_MODE"
+DEFAULT_MODE = FULL_MODE
+# the recognizers whose results depend on the entities of the NER model, the only ones that the fast screen mode applies
+# again over the sentences that the NER model processes
+NER_RECOGNIZER_NAMES = ["SpacyRecognizerWithConfidence", "AmbiguousHebrewCityRecognizer"]
+
 
 class PhiIdentifier:
     """
@@ -36,49 +68,250 @@ class PhiIdentifier:
     consolidate them using NERConsolidator.
     """
 
-    def __init__(self):
+    def __init__(self, sentence_memo_size: Optional[int] = None, nlp_engine: Optional[NlpEngine] = None,
+                 mode: Optional[str] = None):
         """
         Initializes the PhiIdentifier which is composed of Presidio analyzer and NerConsolidator
+
+        :param sentence_memo_size: the maximal number of sentences whose recognizer results are memoized, 0 disables the
+        memoization and each document is analyzed as a whole (HSH_SENTENCE_MEMO_SIZE or DEFAULT_SENTENCE_MEMO_SIZE if
+        None)
+        :param nlp_engine: the NLP engine of the analyzer (HebSpacyNlpEngine with the he_ner_news_trf model if None)
+        :param mode: the default processing mode, one of PROCESSING_MODES (HSH_MODE or DEFAULT_MODE if None). The NER
+        model is loaded only once a mode that uses it is requested
         """
 
-        self.analyzer = self._init_presidio_analyzer()
+        mode = mode if mode is not None else os.environ.get(MODE_ENV_VAR, DEFAULT_MODE)
+        self.mode = PhiIdentifier.validate_mode(mode)
+        # the rule based signals run over texts that are only tokenized when the NER model is not used. The tokenizer
+        # pipeline has no model whose input length is limited, so the texts are never split into windows
+        self.rule_nlp_engine = HebSpacyNlpEngine(nlp={"he": create_tokenizer_pipeline()}, window_size=0)
+        self._ner_nlp_engine = nlp_engine
+        self._ner_nlp_engine_lock = threading.Lock()
+        if self._ner_nlp_engine is None and self.mode != RULE_ONLY_MODE:
+            self._ner_nlp_engine = HebSpacyNlpEngine(models={"he": "he_ner_news_trf"})
+        self.analyzer = self._init_presidio_analyzer(self._ner_nlp_engine or self.rule_nlp_engine)
+        self.ner_screener = NerScreener()
+        sentence_memo_size = sentence_memo_size if sentence_memo_size is not None else int(
+            os.environ.get(SENTENCE_MEMO_SIZE_ENV_VAR, DEFAULT_SENTENCE_MEMO_SIZE))
+        # when the memoization is enabled, the documents are analyzed sentence by sentence and the results of previously
+        # seen sentences are reused
+        self.sentence_memo = SentenceMemo(sentence_memo_size) if sentence_memo_size > 0 else None
         self.entity_smoother = EntitySmootherRuleExecutor()
-        self.entity_splitter = EntitySplitterRuleExecutor()
-        self.consolidator = NerConsolidator()
+        # the consolidation and the entity splitting share one context indexer, so the context phrases of each document
+        # are found in a single pass
+        self.context_indexer = ContextIndexer()
+        self.entity_splitter = EntitySplitterRuleExecutor(context_indexer=self.context_indexer)
+        self.consolidator = NerConsolidator(context_indexer=self.context_indexer)
+
+    @staticmethod
+    def validate_mode(mode: str) -> str:
+        """
+        Validates the name of a processing mode
+
+        :param mode: the name of the processing mode
+        :return: the name of the processing mode
+        """
+        if mode not in PROCESSING_MODES:
+            raise ValueError(f"Unknown processing mode {mode}, expected one of {PROCESSING_MODES}")
+        return mode
+
+    def get_ner_nlp_engine(self) -> NlpEngine:
+        """
+        Returns the NLP engine of the NER model, and loads the model if it wasn't loaded yet
+
+        :return: the NLP engine of the NER model
+        """
+        if self._ner_nlp_engine is None:
+            with self._ner_nlp_engine_lock:
+                if self._ner_nlp_engine is None:
+                    self._ner_nlp_engine = HebSpacyNlpEngine(models={"he": "he_ner_news_trf"})
+                    self.analyzer.nlp_engine = self._ner_nlp_engine
+        return self._ner_nlp_engine
 
-    def __call__(self, doc: Doc) -> Doc:
+    def __call__(self, doc: Doc, mode: Optional[str] = None) -> Doc:
         """
         This method identifies the PHI entities
 
         :param doc: Doc object which holds the input text for PHI reduction
+        :param mode: the processing mode, one of PROCESSING_MODES (the default mode if None)
         :return: an updated Doc object that contains the the set of entities that were recognized by the different
         signals and the consolidated set of entities
         """
+        mode = PhiIdentifier.validate_mode(mode) if mode is not None else self.mode
+        if mode != FULL_MODE or self.sentence_memo is not None:
+            return self.identify_batch([doc], mode)[0]
 
         # recognition
-        analyzer_results = self.analyzer.analyze(text=doc.text, language="he", return_decision_process=True)
+        self.get_ner_nlp_engine()
+        analyzer_results = self.analyzer.analyze(text=doc.text, language="he", return_decision_process=True,
+                                                 timings=doc.timings)
+        return self._resolve_entities(doc, analyzer_results)
+
+    def identify_batch(self, docs: List[Doc], mode: Optional[str] = None) -> List[Doc]:
+        """
+        This method identifies the PHI entities in a batch of documents. The NLP pipeline runs over all the texts at
+        once and its artifacts are then used by the signals of each document.
+
+        :param docs: list of Doc objects which hold the input texts for PHI reduction
+        :param mode: the processing mode, one of PROCESSING_MODES (the default mode if None)
+        :return: the updated Doc objects (in the same order) that contain the set of entities that were recognized by
+        the different signals and the consolidated set of entities
+        """
+        mode = PhiIdentifier.validate_mode(mode) if mode is not None else self.mode
+        if len(docs) == 0:
+            return docs
+
+        # recognition
+        if mode == RULE_ONLY_MODE:
+            batch_analyzer_results = self.analyzer.analyze_batch([doc.text for doc in docs], language="he",
+                                                                 timings=[doc.timings for doc in docs],
+                                                                 nlp_engine=self.rule_nlp_engine,
+                                                                 return_decision_process=True)
+        elif mode == FAST_SCREEN_MODE:
+            batch_analyzer_results = self._analyze_fast_screen(docs)
+        elif self.sentence_memo is not None:
+            batch_analyzer_results = self._analyze_sentences(docs)
+        else:
+            batch_analyzer_results = self.analyzer.analyze_batch([doc.text for doc in docs], language="he",
+                                                                 timings=[doc.timings for doc in docs],
+                                                                 nlp_engine=self.get_ner_nlp_engine(),
+                                                                 return_decision_process=True)
+        return [self._resolve_entities(doc, analyzer_results) for doc, analyzer_results in
+                zip(docs, batch_analyzer_results)]
+
+    def _analyze_sentences(self, docs: List[Doc]) -> List[List[RecognizerResult]]:
+        """
+        Recognizes the entities of each document sentence by sentence. The results of sentences that are memoized are
+        reused, and only the other sentences are analyzed (in one batch). The results of each sentence are shifted to
+        the offsets of the sentence in the document.
+
+        :param docs: list of Doc objects which hold the input texts for PHI reduction
+        :return: the entities recognized by the different signals in each document (in the order of the documents)
+        """
+        docs_sentences = [[(start, end) for start, end in split_to_sentences(doc.text) if doc.text[start:end].strip()]
+                          for doc in docs]
+        sentence_to_results = {}
+        missed_sentences = []
+        # the time of analyzing a sentence is added to the timings of the first document that contains it
+        missed_sentences_timings = []
+        for doc, sentences in zip(docs, docs_sentences):
+            for start, end in sentences:
+                sentence = doc.text[start:end]
+                if sentence not in sentence_to_results:
+                    sentence_to_results[sentence] = self.sentence_memo.get(sentence)
+                    if sentence_to_results[sentence] is None:
+                        missed_sentences.append(sentence)
+                        missed_sentences_timings.append(doc.timings)
+
+        batch_analyzer_results = self.analyzer.analyze_batch(missed_sentences, language="he",
+                                                             timings=missed_sentences_timings,
+                                                             nlp_engine=self.get_ner_nlp_engine(),
+                                                             return_decision_process=True)
+        for sentence, analyzer_results in zip(missed_sentences, batch_analyzer_results):
+            self.sentence_memo.put(sentence, analyzer_results)
+            sentence_to_results[sentence] = analyzer_results
+        num_sentences = sum(len(sentences) for sentences in docs_sentences)
+        self.sentence_memo.update_stats(num_sentences, num_sentences - len(missed_sentences))
+
+        docs_analyzer_results = []
+        for doc, sentences in zip(docs, docs_sentences):
+            analyzer_results = []
+            for start, end in sentences:
+                for result in copy.deepcopy(sentence_to_results[doc.text[start:end]]):
+                    result.start += start
+                    result.end += start
+                    analyzer_results.append(result)
+            # the duplicates are removed over the whole document as the analyzer does, so the results are in the same
+            # order as if the document was analyzed as a whole
+            docs_analyzer_results.append(EntityRecognizer.remove_duplicates(analyzer_results))
+        return docs_analyzer_results
+
+    def _analyze_fast_screen(self, docs: List[Doc]) -> List[List[RecognizerResult]]:
+        """
+        Recognizes the entities of each document by all the signals without the NER model, and then applies the
+        signals that depend on the NER model (NER_RECOGNIZER_NAMES) with the NER model over the sentences that the
+        NerScreener selects (in one batch). Within the selected sentences, the entities of these signals replace their
+        entities of the first pass, and the entities of the rest of the signals (which were found in the context of the
+        whole document) are kept.
+
+        :param docs: list of Doc objects which hold the input texts for PHI reduction
+        :return: the entities recognized by the different signals in each document (in the order of the documents)
+        """
+        batch_rule_results = self.analyzer.analyze_batch([doc.text for doc in docs], language="he",
+                                                         timings=[doc.timings for doc in docs],
+                                                         nlp_engine=self.rule_nlp_engine, return_decision_process=True)
+        # (document index, start, end) of the sentences that the NER model processes
+        screened_sentences = []
+        for doc_index, (doc, rule_results) in enumerate(zip(docs, batch_rule_results)):
+            sentences = [(start, end) for start, end in split_to_sentences(doc.text) if doc.text[start:end].strip()]
+            screened_sentences += [(doc_index, start, end) for start, end in
+                                   self.ner_screener.screen(doc.text, sentences, rule_results)]
+        if not screened_sentences:
+            return batch_rule_results
+
+        batch_sentence_results = self.analyzer.analyze_batch(
+            [docs[doc_index].text[start:end] for doc_index, start, end in screened_sentences], language="he",
+            timings=[docs[doc_index].timings for doc_index, _, _ in screened_sentences],
+            nlp_engine=self.get_ner_nlp_engine(), return_decision_process=True, recognizer_names=NER_RECOGNIZER_NAMES)
+        docs_sentences = [[] for _ in docs]
+        docs_sentence_results = [[] for _ in docs]
+        for (doc_index, start, end), sentence_results in zip(screened_sentences, batch_sentence_results):
+            docs_sentences[doc_index].append((start, end))
+            for result in sentence_results:
+                result.start += start
+                result.end += start
+                docs_sentence_results[doc_index].append(result)
+
+        docs_analyzer_results = []
+        for rule_results, sentences, sentence_results in zip(batch_rule_results, docs_sentences,
+                                                             docs_sentence_results):
+            sentence_starts = [start for start, _ in sentences]
+            analyzer_results = list(sentence_results)
+            for result in rule_results:
+                if result.recognition_metadata[RecognizerResult.RECOGNIZER_NAME_KEY] not in NER_RECOGNIZER_NAMES:
+                    analyzer_results.append(result)
+                    continue
+                # the entities of the signals that depend on the NER model are kept if not within a screened sentence
+                sentence_index = bisect_right(sentence_starts, result.start) - 1
+                if sentence_index < 0 or result.start >= sentences[sentence_index][1] or \
+                        result.end > sentences[sentence_index][1]:
+                    analyzer_results.append(result)
+            # the duplicates are removed over the whole document as the analyzer does
+            docs_analyzer_results.append(EntityRecognizer.remove_duplicates(analyzer_results))
+        return docs_analyzer_results
+
+    def _resolve_entities(self, doc: Doc, analyzer_results: List[RecognizerResult]) -> Doc:
+        """
+        Applies the entity smoothing, consolidation and splitting over the entities recognized by the signals
+
+        :param doc: Doc object which holds the input text for PHI reduction
+        :param analyzer_results: the entities recognized by the different signals
+        :return: an updated Doc object that contains the recognized and the consolidated entities
+        """
         doc.analyzer_results = sorted(analyzer_results, key=lambda res: res.start)
 
         # entity smoothing
-        doc = self.entity_smoother(doc)
+        with time_stage(doc.timings, "entity_smoother"):
+            doc = self.entity_smoother(doc)
 
-        # consolidation
-        doc = self.consolidator(doc)
+        # consolidation (including the post consolidators, which are also timed separately)
+        with time_stage(doc.timings, "consolidator"):
+            doc = self.consolidator(doc)
 
         # entity splitter
-        doc = self.entity_splitter(doc)
+        with time_stage(doc.timings, "entity_splitter"):
+            doc = self.entity_splitter(doc)
 
         return doc
 
-    def _init_presidio_analyzer(self) -> AnalyzerEngine:
+    def _init_presidio_analyzer(self, nlp_engine: NlpEngine) -> HebAnalyzerEngine:
         """
         Creates and initializes the Presidio analyzer
+        :param nlp_engine: the NLP engine of the analyzer
         :return: Presidio analyzer
         """
 
-        # create NLP engine based on the nlp configuration
-        nlp_engine = HebSpacyNlpEngine(models={"he": "he_ner_news_trf"})
-
         # initialize the signals
         signals = self._init_analyzer_signals()
         # create the signals registry
@@ -87,15 +320,37 @@ class PhiIdentifier:
         for signal in signals:
             registry.add_recognizer(signal)
 
-        # create the AnalyzerEngine using the created registry, NLP engine and supported_languages
-        analyzer = AnalyzerEngine(
+        # create the HebAnalyzerEngine using the created registry, NLP engine and supported_languages
+        analyzer = HebAnalyzerEngine(
             registry=registry,
             nlp_engine=nlp_engine,
             supported_languages=["he"],
         )
+        self._init_recognizer_requirements(analyzer.recognizer_prescreener)
 
         return analyzer
 
+    @staticmethod
+    def _init_recognizer_requirements(prescreener: RecognizerPrescreener) -> None:
+        """
+        Declares the characters that each pattern based signal requires in order to match, so the signal is skipped on
+        texts that don't contain them (the lexicon based and the NER signals always run)
+
+        :param prescreener: the recognizer prescreener of the analyzer
+        """
+        for recognizer_name in ["CreditCardRecognizer", "PhoneRecognizer", "DateRecognizer",
+                                "PrepositionDateRecognizer", "NoisyDateRecognizer", "IsraeliIdNumberRecognizer",
+                                "GeneralIdRecognizer"]:
+            prescreener.add_requirement(recognizer_name, [DIGIT])
+        prescreener.add_requirement("EmailRecognizer", [AT_SIGN])
+        # IPv4 addresses contain digits and IPv6 addresses contain colons
+        prescreener.add_requirement("IpRecognizer", [DIGIT], [COLON])
+        # the top level domain is made of Latin letters
+        prescreener.add_requirement("UrlRecognizer", [LATIN_LETTER])
+        prescreener.add_requirement("HebDateRecognizer", [HEBREW_MONTH_NAME])
+        # month names in Hebrew, or English month names followed by a numeric day
+        prescreener.add_requirement("HebLatinDateRecognizer", [HEBREW_MONTH_NAME], [LATIN_LETTER, DIGIT])
+
     def _init_analyzer_signals(self) -> List[LocalRecognizer]:
         """
         Creates and initializes the analyzer's NER signals
@@ -130,9 +385,12 @@ class PhiIdentifier:
         ner_signals.append(HebLatinDateRecognizer())
         # init noisy dates
         ner_signals.append(NoisyDateRecognizer())
+        # the lexicon based signals share one terms recognizer, so each text is scanned once for all the lexicons
+        lexicons_terms_recognizer = SharedTermsRecognizer()
         # init Hebrew country recognizer
         ner_signals.append(LexiconBasedRecognizer("CountryRecognizer", "COUNTRY", COUNTRY_DICT.keys(),
-                                                  allowed_prepositions=LOCATION_PREPOSITIONS))
+                                                  allowed_prepositions=LOCATION_PREPOSITIONS,
+                                                  shared_terms_recognizer=lexicons_terms_recognizer))
         # init Hebrew city recognizers
         cities_set = set(BELOW_THRESHOLD_CITIES_LIST).union(
             set(ABOVE_THRESHOLD_CITIES_LIST)).union(set(ABBREVIATIONS_LIST))
@@ -142,27 +400,32 @@ class PhiIdentifier:
         disambiguated_cities_set = cities_set - ambiguous_cities_set
         ner_signals.append(LexiconBasedRecognizer("IsraeliCityRecognizer", "CITY",
                                                   disambiguated_cities_set,
-                                                  allowed_prepositions=LOCATION_PREPOSITIONS))
+                                                  allowed_prepositions=LOCATION_PREPOSITIONS,
+                                                  shared_terms_recognizer=lexicons_terms_recognizer))
 
         ner_signals.append(AmbiguousHebrewCityRecognizer("AmbiguousHebrewCityRecognizer", "CITY",
                                                          ambiguous_cities_set,
                                                          allowed_prepositions=LOCATION_PREPOSITIONS,
                                                          endorsing_entities=['LOC', 'GPE'],
                                                          context=AMBIGUOUS_CITIES_CONTEXT,
+                                                         shared_terms_recognizer=lexicons_terms_recognizer,
                                                          ),
                            )
 
         # init disease recognizer
         ner_signals.append(
-            LexiconBasedRecognizer("DiseaseRecognizer", "DISEASE", DISEASES, allowed_prepositions=DISEASE_PREPOSITIONS))
+            LexiconBasedRecognizer("DiseaseRecognizer", "DISEASE", DISEASES, allowed_prepositions=DISEASE_PREPOSITIONS,
+                                   shared_terms_recognizer=lexicons_terms_recognizer))
         # init medication recognizer
         ner_signals.append(
             LexiconBasedRecognizer("MedicationRecognizer", "MEDICATION", MEDICATIONS,
-                                   allowed_prepositions=MEDICATION_PREPOSITIONS))
+                                   allowed_prepositions=MEDICATION_PREPOSITIONS,
+                                   shared_terms_recognizer=lexicons_terms_recognizer))
         # init medical tests recognizer
         ner_signals.append(
             LexiconBasedRecognizer("MedicalTestRecognizer", "MEDICAL_TEST", MEDICAL_TESTS + MEDICAL_DEVICE + LAB_TESTS,
-                                   allowed_prepositions=MEDICAL_TEST_PREPOSITIONS))
+                                   allowed_prepositions=MEDICAL_TEST_PREPOSITIONS,
+                                   shared_terms_recognizer=lexicons_terms_recognizer))
         return ner_signals
 
     def init_hebspacy_recognizer(self):
@@ -0,0 +1,101 @@
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, List
+
+import regex as re
+from presidio_analyzer import EntityRecognizer
+
+from hebsafeharbor.common.date_regex import heb_months_re, latin_months_re
+
+# character classes (and cheap textual features) of the text profile
+DIGIT = "DIGIT"
+AT_SIGN = "AT_SIGN"
+COLON = "COLON"
+LATIN_LETTER = "LATIN_LETTER"
+HEBREW_MONTH_NAME = "HEBREW_MONTH_NAME"
+
+# the features are searched with the regex module and the same case folding as the recognizers patterns, so a feature
+# is absent only if no pattern that requires it can match
+FEATURE_TO_PATTERN = {
+    DIGIT: re.compile(r"\d"),
+    AT_SIGN: re.compile(r"@"),
+    COLON: re.compile(r":"),
+    LATIN_LETTER: re.compile(r"[a-z]", re.IGNORECASE),
+    HEBREW_MONTH_NAME: re.compile(f"{heb_months_re}|{latin_months_re}"),
+}
+
+
+class RecognizerPrescreener:
+    """
+    Skips recognizers that cannot recognize anything in a text. The profile of the text (which of the cheap features
+    above it contains) is computed once, and each recognizer declares the features it requires - a recognizer whose
+    requirement is not met by the profile is skipped. The requirements must be necessary conditions for a match (e.g.
+    the IP recognizer can not match a text that contains neither digits nor a colon), so skipping a recognizer never
+    changes the results. Recognizers with no declared requirement always run.
+    """
+
+    def __init__(self):
+        """
+        Initializes RecognizerPrescreener (with no requirements)
+        """
+        self._recognizer_to_requirement: Dict[str, List[FrozenSet[str]]] = {}
+        self._skip_counts = Counter()
+        self._screened_texts = 0
+        self._stats_lock = threading.Lock()
+
+    def add_requirement(self, recognizer_name: str, *alternatives: List[str]) -> None:
+        """
+        Declares the features that a recognizer requires. The recognizer runs if the text contains all the features of
+        at least one of the alternatives
+
+        :param recognizer_name: the name of the recognizer
+        :param alternatives: lists of features (e.g. [DIGIT], [COLON] - the text contains a digit or a colon)
+        """
+        for features in alternatives:
+            unknown_features = set(features) - FEATURE_TO_PATTERN.keys()
+            if unknown_features:
+                raise ValueError(f"Unknown text features {sorted(unknown_features)} for {recognizer_name}")
+        self._recognizer_to_requirement[recognizer_name] = [frozenset(features) for features in alternatives]
+
+    @staticmethod
+    def get_profile(text: str) -> FrozenSet[str]:
+        """
+        Computes the profile of the text
+
+        :param text: the text
+        :return: the features that the text contains
+        """
+        return frozenset(feature for feature, pattern in FEATURE_TO_PATTERN.items() if pattern.search(text))
+
+    def filter_recognizers(self, recognizers: List[EntityRecognizer],
+                           profile: FrozenSet[str]) -> List[EntityRecognizer]:
+        """
+        Filters out the recognizers whose requirement is not met by the profile of the text and counts them
+
+        :param recognizers: the recognizers
+        :param profile: the profile of the text (the output of get_profile)
+        :return: the recognizers that should run on the text (in the given order)
+        """
+        relevant_recognizers = []
+        skipped_recognizers = []
+        for recognizer in recognizers:
+            requirement = self._recognizer_to_requirement.get(recognizer.name)
+            if requirement is None or any(features <= profile for features in requirement):
+                relevant_recognizers.append(recognizer)
+            else:
+                skipped_recognizers.append(recognizer.name)
+
+        with self._stats_lock:
+            self._screened_texts += 1
+            self._skip_counts.update(skipped_recognizers)
+        return relevant_recognizers
+
+    def get_skip_counts(self) -> Dict:
+        """
+        :return: the number of screened texts and the number of texts each recognizer was skipped on
+        """
+        with self._stats_lock:
+            return {
+                "screened_texts": self._screened_texts,
+                "skipped": {name: self._skip_counts[name] for name in sorted(self._recognizer_to_requirement)},
+            }
@@ -0,0 +1,85 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from presidio_analyzer import RecognizerResult
+
+
+class SentenceMemo:
+    """
+    A bounded (LRU) memo of the raw recognizer results of sentences, whose offsets are relative to the sentence. It
+    counts the lookups of the last batch of documents and of all the batches, so the hit rate can be reported.
+    """
+
+    def __init__(self, max_sentences: int):
+        """
+        Initializes SentenceMemo
+
+        :param max_sentences: the maximal number of memoized sentences
+        """
+        self.max_sentences = max_sentences
+        self._sentence_to_results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "sentences": 0, "hits": 0}
+        self.last_batch_stats = {"sentences": 0, "hits": 0}
+
+    def get(self, sentence: str) -> Optional[List[RecognizerResult]]:
+        """
+        Returns the memoized results of the given sentence
+
+        :param sentence: the text of the sentence
+        :return: the memoized results of the sentence (relative to the sentence), or None if it is not memoized. The
+        results are shared with the memo, so they must not be updated (the callers copy them for each occurrence)
+        """
+        with self._lock:
+            results = self._sentence_to_results.get(sentence)
+            if results is not None:
+                self._sentence_to_results.move_to_end(sentence)
+        return results
+
+    def put(self, sentence: str, results: List[RecognizerResult]) -> None:
+        """
+        Memoizes the results of the given sentence, and evicts the least recently used sentences if the memo is full
+
+        :param sentence: the text of the sentence
+        :param results: the results of the sentence (relative to the sentence)
+        """
+        # the results are copied since the consolidation of a document updates its entities
+        results = copy.deepcopy(results)
+        with self._lock:
+            self._sentence_to_results[sentence] = results
+            self._sentence_to_results.move_to_end(sentence)
+            while len(self._sentence_to_results) > self.max_sentences:
+                self._sentence_to_results.popitem(last=False)
+
+    def update_stats(self, sentences: int, hits: int) -> None:
+        """
+        Records the lookups of a batch of documents
+
+        :param sentences: the number of sentences in the batch
+        :param hits: the number of sentences whose results were memoized
+        """
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["sentences"] += sentences
+            self.stats["hits"] += hits
+            self.last_batch_stats = {"sentences": sentences, "hits": hits}
+
+    def get_stats(self) -> Dict:
+        """
+        Returns the statistics of the memo, including the hit rate of the last batch and of all the batches
+
+        :return: dictionary of the memo statistics
+        """
+        with self._lock:
+            stats, last_batch_stats = dict(self.stats), dict(self.last_batch_stats)
+            memoized_sentences = len(self._sentence_to_results)
+        return {
+            "max_sentences": self.max_sentences,
+            "memoized_sentences": memoized_sentences,
+            **stats,
+            "hit_rate": stats["hits"] / max(stats["sentences"], 1),
+            "last_batch": {**last_batch_stats,
+                           "hit_rate": last_batch_stats["hits"] / max(last_batch_stats["sentences"], 1)},
+        }
@@ -0,0 +1,114 @@
+from typing import Dict, List, Tuple
+
+import regex as re
+from presidio_analyzer import AnalysisExplanation, EntityRecognizer, Pattern, PatternRecognizer, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpArtifacts
+from presidio_analyzer.predefined_recognizers import CreditCardRecognizer as PresidioCreditCardRecognizer, \
+    DateRecognizer as PresidioDateRecognizer, EmailRecognizer as PresidioEmailRecognizer, \
+    IpRecognizer as PresidioIpRecognizer, UrlRecognizer as PresidioUrlRecognizer
+
+# the regex flags that PatternRecognizer (@Presidio) uses when no flags are given
+DEFAULT_REGEX_FLAGS = re.DOTALL | re.MULTILINE
+
+
+class CompiledPatternRecognizer(PatternRecognizer):
+    """
+    A class which extends the PatternRecognizer (@Presidio) and compiles each of its patterns once (per regex flags),
+    instead of looking the patterns up by their source in the regex module's cache on every call. The recognized
+    entities are identical to those of PatternRecognizer.
+
+    Recognizers that extend a PatternRecognizer which overrides analyze (for example, DateRecognizer, which adds the
+    IGNORECASE flag) should list CompiledPatternRecognizer after it, so that override runs first.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes CompiledPatternRecognizer, accepts the same arguments as PatternRecognizer
+        """
+        super().__init__(*args, **kwargs)
+        # the patterns and their compiled regexes per regex flags
+        self._compiled_patterns: Dict[int, List[Tuple[Pattern, re.Pattern]]] = {}
+
+    def analyze(self, text: str, entities: List[str], nlp_artifacts: NlpArtifacts = None,
+                regex_flags: int = None) -> List[RecognizerResult]:
+        """
+        Recognizes the entities in the text using the compiled patterns
+
+        :param text: the text to analyze
+        :param entities: the entities this recognizer can detect
+        :param nlp_artifacts: the output values of the NLP engine (unused)
+        :param regex_flags: the regex flags of the patterns (the flags of PatternRecognizer if None)
+        :return: the recognized entities
+        """
+        flags = regex_flags if regex_flags else getattr(self, "global_regex_flags", DEFAULT_REGEX_FLAGS)
+        results = []
+        for pattern, compiled_pattern in self._get_compiled_patterns(flags):
+            for match in compiled_pattern.finditer(text):
+                start, end = match.span()
+                current_match = text[start:end]
+                if current_match == "":
+                    continue
+
+                validation_result = self.validate_result(current_match)
+                explanation = AnalysisExplanation(recognizer=self.name, original_score=pattern.score,
+                                                  pattern_name=pattern.name, pattern=pattern.regex,
+                                                  validation_result=validation_result)
+                result = RecognizerResult(entity_type=self.supported_entities[0], start=start, end=end,
+                                          score=pattern.score, analysis_explanation=explanation,
+                                          recognition_metadata={RecognizerResult.RECOGNIZER_NAME_KEY: self.name})
+                if validation_result is not None:
+                    result.score = EntityRecognizer.MAX_SCORE if validation_result else EntityRecognizer.MIN_SCORE
+                if self.invalidate_result(current_match):
+                    result.score = EntityRecognizer.MIN_SCORE
+                if result.score > EntityRecognizer.MIN_SCORE:
+                    results.append(result)
+                # the explanation holds the score after the validation and the invalidation
+                explanation.score = result.score
+
+        return EntityRecognizer.remove_duplicates(results)
+
+    def _get_compiled_patterns(self, flags: int) -> List[Tuple[Pattern, re.Pattern]]:
+        """
+        Returns the patterns of the recognizer with their compiled regexes, compiles them on first use
+
+        :param flags: the regex flags
+        :return: list of the patterns and their compiled regexes
+        """
+        compiled_patterns = self._compiled_patterns.get(flags)
+        if compiled_patterns is None:
+            compiled_patterns = [(pattern, re.compile(pattern.regex, flags)) for pattern in self.patterns]
+            self._compiled_patterns[flags] = compiled_patterns
+        return compiled_patterns
+
+
+# the predefined pattern recognizers of Presidio with compiled patterns. They keep the names of the classes they extend,
+# since the name of a recognizer is also its default recognizer name
+
+class CreditCardRecognizer(PresidioCreditCardRecognizer, CompiledPatternRecognizer):
+    """
+    CreditCardRecognizer (@Presidio) with compiled patterns
+    """
+
+
+class DateRecognizer(PresidioDateRecognizer, CompiledPatternRecognizer):
+    """
+    DateRecognizer (@Presidio) with compiled patterns
+    """
+
+
+class EmailRecognizer(PresidioEmailRecognizer, CompiledPatternRecognizer):
+    """
+    EmailRecognizer (@Presidio) with compiled patterns
+    """
+
+
+class IpRecognizer(PresidioIpRecognizer, CompiledPatternRecognizer):
+    """
+    IpRecognizer (@Presidio) with compiled patterns
+    """
+
+
+class UrlRecognizer(PresidioUrlRecognizer, CompiledPatternRecognizer):
+    """
+    UrlRecognizer (@Presidio) with compiled patterns
+    """
@@ -1,7 +1,9 @@
-from presidio_analyzer import PatternRecognizer, Pattern
+from presidio_analyzer import Pattern
 
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CompiledPatternRecognizer
 
-class GeneralIdRecognizer(PatternRecognizer):
+
+class GeneralIdRecognizer(CompiledPatternRecognizer):
     """
     A class which extends the PatternRecognizer (@Presidio) and responsible for the recognition of IDs.
     """
@@ -1,9 +1,11 @@
 from typing import Optional
 
-from presidio_analyzer import PatternRecognizer, Pattern
+from presidio_analyzer import Pattern
+
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CompiledPatternRecognizer
 from hebsafeharbor.common.date_regex import HEB_FULL_DATE_REGEX,HEB_MONTH_YEAR_REGEX,HEB_DAY_MONTH_REGEX
 
-class HebDateRecognizer(PatternRecognizer):
+class HebDateRecognizer(CompiledPatternRecognizer):
     """
     A class which extends the PatternRecognizer (@Presidio) and responsible for the recognition of Hebrew dates (א׳ בתשרי תש״ח)
     """
@@ -1,11 +1,13 @@
 from typing import Optional
 
-from presidio_analyzer import PatternRecognizer, Pattern
+from presidio_analyzer import Pattern
+
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CompiledPatternRecognizer
 from hebsafeharbor.common.date_regex import LATIN_DATE_REGEX,EN_DATE_REGEX
 
 
 
-class HebLatinDateRecognizer(PatternRecognizer):
+class HebLatinDateRecognizer(CompiledPatternRecognizer):
     """
     A class which extends the PatternRecognizer (@Presidio) and recognizes dates that contain the name of the month
     (ינואר 1999 9)
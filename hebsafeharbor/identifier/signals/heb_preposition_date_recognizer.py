@@ -1,5 +1,5 @@
 from typing import Optional, List
-from presidio_analyzer.predefined_recognizers import DateRecognizer
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import DateRecognizer
 from presidio_analyzer import Pattern
 from hebsafeharbor.common.date_regex import EN_DMY_REGEX,EN_MDY_REGEX,EN_YMD_REGEX
 
@@ -1,9 +1,10 @@
 import re
-from typing import List, Set, Optional
+from typing import List, Optional
 from presidio_analyzer import RecognizerResult, AnalysisExplanation
 from presidio_analyzer.nlp_engine import NlpArtifacts
 
-from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+from hebsafeharbor.common.interval_index import IntervalIndex
+from hebsafeharbor.common.terms_recognizer import TermsRecognizer, SharedTermsRecognizer
 from hebsafeharbor.identifier.signals.lexicon_based_recognizer import LexiconBasedRecognizer
 
 
@@ -17,6 +18,7 @@ class AmbiguousHebrewCityRecognizer(LexiconBasedRecognizer):
                  endorsing_entities: List[str] = None, allowed_prepositions: List[str] = None, context: List[str] = None,
                  default_confidence_level: float = 0.2,
                  location_overlap_factor: float = 0.4, context_enhancement_factor: float = 0.4,
+                 shared_terms_recognizer: Optional[SharedTermsRecognizer] = None,
                  ):
         """
         Initializes AmbiguousHebrewCityRecognizer
@@ -34,9 +36,11 @@ class AmbiguousHebrewCityRecognizer(LexiconBasedRecognizer):
         :param default_confidence_level: expected confidence level for this recognizer
         :param location_overlap_factor: enhancement factor for this recognizer if overlap with another geo entity found
         :param context_enhancement_factor: enhancement factor for this recognizer if supportive context found
+        :param shared_terms_recognizer: if given, the lexicon is added to this shared terms recognizer
         """
         super().__init__(name=name, supported_entity=supported_entity, phrase_list=phrase_list,
-                         supported_language=supported_language, allowed_prepositions=allowed_prepositions)
+                         supported_language=supported_language, allowed_prepositions=allowed_prepositions,
+                         shared_terms_recognizer=shared_terms_recognizer)
         self.endorsing_entities = endorsing_entities if endorsing_entities else []
         self.context = context if context else []
         self.context_recognizer = TermsRecognizer(context) if context else None
@@ -60,7 +64,7 @@ class AmbiguousHebrewCityRecognizer(LexiconBasedRecognizer):
         """
         results = []
 
-        terms_offsets = self.terms_recognizer(text, prefixes=self.allowed_prepositions)
+        terms_offsets = self.terms_recognizer(text)
 
         if len(terms_offsets) == 0:
             return results
@@ -137,19 +141,15 @@ class AmbiguousHebrewCityRecognizer(LexiconBasedRecognizer):
         return raw_recognizer_results
 
     @staticmethod
-    def _extract_geo_entities(nlp_artifacts: NlpArtifacts, entity_names: List[str]) -> Set[int]:
+    def _extract_geo_entities(nlp_artifacts: NlpArtifacts, entity_names: List[str]) -> IntervalIndex:
         """
         Identify positions of other entities in a text that can provide context for entity
         :param nlp_artifacts: artifacts of the nlp engine
         :param entity_names: list of entity names
-        :return set of positions in a text string corresponding provided entity names
+        :return interval index of the positions in a text string corresponding provided entity names
         """
-        geo_entities_positions = set()
-        for entity in nlp_artifacts.entities:
-            if entity.label_ in entity_names:
-                for char in range(entity.start_char, entity.end_char):
-                    geo_entities_positions.add(char)
-        return geo_entities_positions
+        return IntervalIndex((entity.start_char, entity.end_char, entity.label_) for entity in nlp_artifacts.entities if
+                             entity.label_ in entity_names)
 
     def enhance_using_other_entities(self, nlp_artifacts: NlpArtifacts, results: List[RecognizerResult]):
         """
@@ -163,8 +163,8 @@ class AmbiguousHebrewCityRecognizer(LexiconBasedRecognizer):
             return results
 
         for result in results:
-            overlap_ratio = len(
-                set(range(result.start, result.end)).intersection(geo_entities_positions)) / (result.end - result.start)
+            overlap_ratio = geo_entities_positions.get_overlap_length(result.start, result.end) / (
+                    result.end - result.start)
             adjusted_score = result.score + (overlap_ratio * self.location_overlap_factor )
             if adjusted_score != result.score:
                 result.score = adjusted_score
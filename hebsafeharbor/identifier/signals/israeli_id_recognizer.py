@@ -1,9 +1,11 @@
 from typing import Optional
 
-from presidio_analyzer import PatternRecognizer, Pattern
+from presidio_analyzer import Pattern
 
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CompiledPatternRecognizer
 
-class IsraeliIdNumberRecognizer(PatternRecognizer):
+
+class IsraeliIdNumberRecognizer(CompiledPatternRecognizer):
     """
     A class which extends the PatternRecognizer (@Presidio) and responsible for the recognition of Israeli ID number
     entity and its validation.
@@ -1,8 +1,8 @@
-from typing import List
+from typing import List, Optional
 from presidio_analyzer import EntityRecognizer, RecognizerResult, AnalysisExplanation
 from presidio_analyzer.nlp_engine import NlpArtifacts
 
-from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+from hebsafeharbor.common.terms_recognizer import TermsRecognizer, SharedTermsRecognizer
 
 
 class LexiconBasedRecognizer(EntityRecognizer):
@@ -13,7 +13,8 @@ class LexiconBasedRecognizer(EntityRecognizer):
     DEFAULT_CONFIDENCE_LEVEL = 0.7  # expected confidence level for this recognizer
 
     def __init__(self, name: str, supported_entity: str, phrase_list: List[str], supported_language: str = "he",
-                 allowed_prepositions: List[str] = None):
+                 allowed_prepositions: List[str] = None,
+                 shared_terms_recognizer: Optional[SharedTermsRecognizer] = None):
         """
         Initializes Hebrew LexiconBasedRecognizer
 
@@ -24,10 +25,16 @@ class LexiconBasedRecognizer(EntityRecognizer):
         :param supported_language: the language that the recognizer supports. Hebrew is the default
         :param allowed_prepositions: prepositions that allowed to be recognized as part of the entity (in addition to
         the lexicon phrase itself). Empty list (which means prepositions are not allowed) is the default
+        :param shared_terms_recognizer: if given, the lexicon is added to this shared terms recognizer, so the text is
+        scanned once for all the lexicons that share it (otherwise the recognizer holds its own terms recognizer)
         """
         super().__init__(name=name, supported_entities=[supported_entity], supported_language=supported_language)
-        self.terms_recognizer = TermsRecognizer(phrase_list)
         self.allowed_prepositions = allowed_prepositions if allowed_prepositions else []
+        if shared_terms_recognizer is not None:
+            self.terms_recognizer = shared_terms_recognizer.add_lexicon(name, phrase_list,
+                                                                        prefixes=self.allowed_prepositions)
+        else:
+            self.terms_recognizer = TermsRecognizer(phrase_list, prefixes=self.allowed_prepositions)
 
     def load(self) -> None:
         """No loading is required."""
@@ -45,7 +52,7 @@ class LexiconBasedRecognizer(EntityRecognizer):
         """
         results = []
 
-        terms_offsets = self.terms_recognizer(text, prefixes=self.allowed_prepositions)
+        terms_offsets = self.terms_recognizer(text)
 
         # Iterate over the Automaton offsets and create Recognizer result for each of them
         for start_offset, length in terms_offsets:
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from spacy.language import Language
+from spacy.tokens import Span
+
+from hebsafeharbor.common.city_utils import ABOVE_THRESHOLD_CITIES_LIST
+from hebsafeharbor.identifier.heb_nlp_engine import CONFIDENCE_SCORE_EXTENSION, HebSpacyNlpEngine, \
+    create_tokenizer_pipeline
+
+# the vocabulary of the synthetic entities
+STUB_FIRST_NAMES = ["גדעון", "שרון", "משה", "רחל", "דוד", "יעל", "אבי", "נועה", "שרה", "יוסף", "מרים", "אברהם"]
+STUB_LAST_NAMES = ["לבנה", "לוי", "כהן", "אברהם", "מזרחי", "פרץ", "ביטון", "שפירא", "פרידמן", "אזולאי"]
+STUB_DATE_REGEXES = [r"^\d{1,2}[./-]\d{1,2}[./-]\d{2,4}$", r"^\d{4}-\d{1,2}-\d{1,2}$", r"^(19|20)\d\d$"]
+# the confidence score of the synthetic entities
+STUB_CONFIDENCE_SCORE = 0.85
+
+
+def create_stub_pipeline() -> Language:
+    """
+    Creates a spaCy pipeline for Hebrew that needs no trained model. It splits the text into sentences by punctuation
+    and tags synthetic entities by rules: a known first name (optionally followed by a known last name) as PERS, a city
+    name as LOC and a numeric date or a year as DATE.
+
+    :return: the spaCy pipeline
+    """
+    nlp = create_tokenizer_pipeline()
+    patterns = [{"label": "PERS", "pattern": [{"TEXT": {"IN": STUB_FIRST_NAMES}},
+                                               {"TEXT": {"IN": STUB_LAST_NAMES}, "OP": "?"}]}]
+    patterns += [{"label": "LOC", "pattern": city} for city in ABOVE_THRESHOLD_CITIES_LIST]
+    patterns += [{"label": "DATE", "pattern": [{"TEXT": {"REGEX": date_regex}}]} for date_regex in STUB_DATE_REGEXES]
+    nlp.add_pipe("entity_ruler").add_patterns(patterns)
+    if not Span.has_extension(CONFIDENCE_SCORE_EXTENSION):
+        Span.set_extension(CONFIDENCE_SCORE_EXTENSION, default=STUB_CONFIDENCE_SCORE)
+    return nlp
+
+
+class StubNlpEngine(HebSpacyNlpEngine):
+    """
+    A drop-in replacement of HebSpacyNlpEngine which runs a deterministic rule based pipeline (see create_stub_pipeline)
+    instead of the he_ner_news_trf model. It allows running and benchmarking the rest of the process on any machine,
+    but its entities are synthetic and must not be used for de-identification.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, window_size: Optional[int] = None,
+                 window_stride: Optional[int] = None, max_batch_tokens: Optional[int] = None):
+        """
+        Initializes StubNlpEngine, the arguments are the same as of HebSpacyNlpEngine
+
+        :param batch_size: the maximal number of texts that the spaCy pipeline processes at once
+        :param window_size: the maximal length (in characters) of a text or a window that is processed at once
+        :param window_stride: the length (in characters) of the part of each window whose entities are kept
+        :param max_batch_tokens: the maximal padded size of a batch that is processed at once
+        """
+        super().__init__(batch_size=batch_size, window_size=window_size, window_stride=window_stride,
+                         max_batch_tokens=max_batch_tokens, nlp={"he": create_stub_pipeline()})
@@ -1,7 +1,11 @@
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional
+
+from presidio_analyzer.nlp_engine import NlpEngine
 
 from hebsafeharbor import Doc
 from hebsafeharbor.anonymizer.phi_anonymizer import PhiAnonymizer
+from hebsafeharbor.common.timings import Timings, merge_timings
 from hebsafeharbor.identifier.phi_identifier import PhiIdentifier
 
 class HebSafeHarbor:
@@ -10,32 +14,55 @@ class HebSafeHarbor:
     anonymization process and return an anonymized text.
     """
 
-    def __init__(self):
+    def __init__(self, collect_timings: Optional[bool] = None, nlp_engine: Optional[NlpEngine] = None,
+                 mode: Optional[str] = None):
         """
         Initializes HebSafeHarbor
+
+        :param collect_timings: whether to record the wall and CPU time of each stage (and each recognizer) into the
+        timings of each document and of the batch (true if the HSH_COLLECT_TIMINGS environment variable is "1" or "true"
+        if None)
+        :param nlp_engine: the NLP engine of the identifier (HebSpacyNlpEngine with the he_ner_news_trf model if None)
+        :param mode: the default processing mode - "full", "rule_only" (without the NER model) or "fast_screen" (the NER
+        model processes only the sentences that the rule based signals don't cover), see PhiIdentifier
         """
-        self.identifier = PhiIdentifier()
+        self.identifier = PhiIdentifier(nlp_engine=nlp_engine, mode=mode)
         self.anonymizer = PhiAnonymizer()
+        self.collect_timings = collect_timings if collect_timings is not None else os.environ.get(
+            "HSH_COLLECT_TIMINGS", "").lower() in ["1", "true"]
+        # the sum of the timings of the documents of the last completed batch, if the timings are collected
+        self.batch_timings: Optional[Timings] = None
 
-    def __call__(self, doc_list: List[Dict[str, str]]) -> List[Doc]:
+    def __call__(self, doc_list: List[Dict[str, str]], mode: Optional[str] = None) -> List[Doc]:
         """
         The main method, executes the PHI reduction process on the given text
         :param doc_list: List of dictionary where each dict represents a document.
                         Each dictionary should consist of "id" and "text" columns
+        :param mode: the processing mode of the documents (the default mode if None)
         :return: anonymized text
         """
         docs = [Doc(doc_dict) for doc_dict in doc_list]
-        docs = self.identify(docs)
+        if self.collect_timings:
+            for doc in docs:
+                doc.timings = {}
+        docs = self.identify(docs, mode)
         docs = self.anonymize(docs)
+        if self.collect_timings:
+            # summed locally and assigned at once, since several batches may run concurrently on different threads
+            batch_timings = {}
+            for doc in docs:
+                merge_timings(batch_timings, doc.timings)
+            self.batch_timings = batch_timings
         return docs
 
-    def identify(self, docs: List[Doc]) -> List[Doc]:
+    def identify(self, docs: List[Doc], mode: Optional[str] = None) -> List[Doc]:
         """
         This method identifies the PHI entities in the input text
         :param docs: a list of Doc objects which contains the input text for anonymization
+        :param mode: the processing mode of the documents (the default mode if None)
         :return: a list of the updated Doc objects that contains the recognized PHI entities
         """
-        return [self.identifier(doc) for doc in docs]
+        return self.identifier.identify_batch(docs, mode)
 
     def anonymize(self, docs: List[Doc]) -> List[Doc]:
         """
@@ -43,7 +70,7 @@ class HebSafeHarbor:
         :param doc: a list of Doc objects which contains the consolidated recognized PHI entities
         :return: a list of the updated Doc objects that contains the anonymized text
         """
-        return [self.anonymizer(doc) for doc in docs]
+        return self.anonymizer.anonymize_many(docs)
 
     @staticmethod
     def create_result(doc: Doc) -> Dict[str, str]:
@@ -0,0 +1,162 @@
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from hebsafeharbor.common.compact_results import CompactResults, pack_results, unpack_results
+from hebsafeharbor.common.document import Doc
+from hebsafeharbor.common.timings import Timings, merge_timings
+
+# (index in the input list, document id, text)
+DocTask = Tuple[int, str, str]
+# (index in the input list, compact results, error message, timings)
+DocTaskResult = Tuple[int, Optional[CompactResults], Optional[str], Optional[Timings]]
+
+# the identifier and anonymizer of the current worker process (initialized once per process)
+_worker_identifier = None
+_worker_anonymizer = None
+
+
+def _init_worker(mode: Optional[str] = None) -> None:
+    """
+    Initializes the PhiIdentifier and PhiAnonymizer of a worker process
+
+    :param mode: the default processing mode of the identifier (see PhiIdentifier)
+    """
+    global _worker_identifier, _worker_anonymizer
+    from hebsafeharbor.anonymizer.phi_anonymizer import PhiAnonymizer
+    from hebsafeharbor.identifier.phi_identifier import PhiIdentifier
+    _worker_identifier = PhiIdentifier(mode=mode)
+    _worker_anonymizer = PhiAnonymizer()
+
+
+def _process_chunk(tasks: List[DocTask], mode: Optional[str] = None,
+                   collect_timings: bool = False) -> List[DocTaskResult]:
+    """
+    Executes the identification and anonymization process on a chunk of documents inside a worker process
+
+    :param tasks: the documents to process
+    :param mode: the processing mode of the documents (the default mode of the worker if None)
+    :param collect_timings: whether to record the timings of each document
+    :return: the compact results (or the error message) of each document along with its timings
+    """
+    docs = [Doc({"id": doc_id, "text": text}) for _, doc_id, text in tasks]
+    if collect_timings:
+        for doc in docs:
+            doc.timings = {}
+    try:
+        docs = _worker_identifier.identify_batch(docs, mode)
+        identified = True
+    except Exception:
+        # identify the documents one by one so a single failure won't fail the entire chunk
+        identified = False
+
+    results = []
+    for (index, _, _), doc in zip(tasks, docs):
+        try:
+            if not identified:
+                if collect_timings:
+                    # drop the timings of the failed batch
+                    doc.timings = {}
+                doc = _worker_identifier(doc, mode)
+            doc = _worker_anonymizer(doc)
+            results.append((index, pack_results(doc), None, doc.timings))
+        except Exception as e:
+            results.append((index, None, f"{type(e).__name__}: {e}", doc.timings))
+    return results
+
+
+class ParallelHebSafeHarbor:
+    """
+    A multi-process variant of HebSafeHarbor. It spreads the documents across a pool of worker processes where each
+    worker holds its own PhiIdentifier and PhiAnonymizer. Only the texts and compact span tuples are moved between the
+    processes.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, start_method: str = "spawn",
+                 collect_timings: Optional[bool] = None, mode: Optional[str] = None):
+        """
+        Initializes ParallelHebSafeHarbor. Note that each worker process loads its own models.
+
+        :param num_workers: number of worker processes (the number of CPUs by default)
+        :param start_method: the multiprocessing start method of the workers ("spawn", "fork" or "forkserver")
+        :param collect_timings: whether to record the wall and CPU time of each stage (and each recognizer) into the
+        timings of each document and of the batch (true if the HSH_COLLECT_TIMINGS environment variable is "1" or "true"
+        if None)
+        :param mode: the default processing mode of the workers - "full", "rule_only" or "fast_screen", see
+        PhiIdentifier
+        """
+        self.num_workers = num_workers if num_workers else os.cpu_count()
+        self.collect_timings = collect_timings if collect_timings is not None else os.environ.get(
+            "HSH_COLLECT_TIMINGS", "").lower() in ["1", "true"]
+        # the sum of the timings of the documents of the last completed batch, if the timings are collected
+        self.batch_timings: Optional[Timings] = None
+        self.executor = ProcessPoolExecutor(max_workers=self.num_workers,
+                                            mp_context=multiprocessing.get_context(start_method),
+                                            initializer=_init_worker, initargs=(mode,))
+
+    def __call__(self, doc_list: List[Dict[str, str]], mode: Optional[str] = None) -> List[Doc]:
+        """
+        The main method, executes the PHI reduction process on the given documents using the worker processes. A
+        document that fails is returned with its error message (in Doc.error) instead of failing the entire batch.
+
+        :param doc_list: List of dictionary where each dict represents a document.
+                        Each dictionary should consist of "id" and "text" columns
+        :param mode: the processing mode of the documents (the default mode if None)
+        :return: the processed Doc objects in the order of the input documents
+        """
+        docs = [Doc(doc_dict) for doc_dict in doc_list]
+        chunks = ParallelHebSafeHarbor.split_by_size(docs, self.num_workers)
+        futures = [(chunk, self.executor.submit(_process_chunk, chunk, mode, self.collect_timings)) for chunk in
+                   chunks]
+
+        for chunk, future in futures:
+            try:
+                chunk_results = future.result()
+            except Exception as e:
+                # the worker itself failed (for example, it was killed) - report the error on each of its documents
+                chunk_results = [(index, None, f"{type(e).__name__}: {e}", None) for index, _, _ in chunk]
+            for index, results, error, timings in chunk_results:
+                if error is None:
+                    unpack_results(docs[index], results)
+                else:
+                    docs[index].error = error
+                docs[index].timings = timings
+        if self.collect_timings:
+            batch_timings = {}
+            for doc in docs:
+                if doc.timings is not None:
+                    merge_timings(batch_timings, doc.timings)
+            self.batch_timings = batch_timings
+        return docs
+
+    @staticmethod
+    def split_by_size(docs: List[Doc], num_chunks: int) -> List[List[DocTask]]:
+        """
+        Splits the documents into chunks of similar total text length (longest documents are assigned first, each to
+        the currently lightest chunk)
+
+        :param docs: the documents to split
+        :param num_chunks: the maximal number of chunks
+        :return: list of non-empty chunks
+        """
+        chunks = [[] for _ in range(max(1, min(num_chunks, len(docs))))]
+        chunks_load = [(0, chunk_index) for chunk_index in range(len(chunks))]
+        for index in sorted(range(len(docs)), key=lambda i: len(docs[i].text), reverse=True):
+            load, chunk_index = heapq.heappop(chunks_load)
+            chunks[chunk_index].append((index, docs[index].id, docs[index].text))
+            heapq.heappush(chunks_load, (load + len(docs[index].text), chunk_index))
+        return [chunk for chunk in chunks if len(chunk) > 0]
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes
+        """
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ParallelHebSafeHarbor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
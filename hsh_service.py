@@ -1,8 +1,19 @@
+import asyncio
+import hashlib
+import os
+import pickle
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
 from enum import Enum
-from typing import Dict, List
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from hebsafeharbor import HebSafeHarbor
+import hebsafeharbor
+from hebsafeharbor import Doc, HebSafeHarbor
+from hebsafeharbor.common.compact_results import CompactResults, pack_results, unpack_results
+from hebsafeharbor.identifier.phi_identifier import PhiIdentifier
+from hebsafeharbor.version import VERSION
 
 
 class ServiceStatus(Enum):
@@ -12,21 +23,305 @@ class ServiceStatus(Enum):
     ERROR = 4
 
 
+class PendingQuery:
+    def __init__(self, docs: List[Dict[str, str]], future: asyncio.Future, enqueue_time: float,
+                 mode: Optional[str] = None):
+        self.docs = docs
+        self.mode = mode
+        self.future = future
+        self.enqueue_time = enqueue_time
+        # rough estimation of the number of tokens the query adds to a batch
+        self.tokens = sum(len(doc.get("text", "").split()) for doc in docs)
+
+
+class QueryCoalescer:
+    """
+    Collects the documents of concurrent queries into a single batch, for up to max_wait_ms after the first query
+    arrived or until the batch reaches max_batch_tokens, then runs the batch through the pipeline and routes each
+    query's results back to its caller.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Dict[str, str]], Optional[str]], List[Doc]], executor: Executor,
+                 max_concurrent_batches: int = 1, max_wait_ms: float = 10, max_batch_tokens: int = 20000):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_concurrent_batches = max_concurrent_batches
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_tokens = max_batch_tokens
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._carried_query: Optional[PendingQuery] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats = {"queries": 0, "documents": 0, "batches": 0, "batch_tokens": 0, "batch_wait_ms": 0.0,
+                      "max_batch_documents": 0, "failed_batches": 0}
+
+    async def submit(self, docs: List[Dict[str, str]], mode: Optional[str] = None) -> List[Doc]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # the queue and the dispatcher must be created on the event loop of the server (and recreated if the event
+            # loop was replaced)
+            self._loop = loop
+            self._carried_query = None
+            self._queue = asyncio.Queue()
+            self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._dispatcher = loop.create_task(self._dispatch())
+        future = loop.create_future()
+        await self._queue.put(PendingQuery(docs, future, loop.time(), mode))
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # wait for a free slot first, so queries keep accumulating while all the workers are busy
+            await self._batch_slots.acquire()
+            batch = [await self._next_query()]
+            batch_tokens = batch[0].tokens
+            deadline = batch[0].enqueue_time + self.max_wait_ms / 1000
+            while batch_tokens < self.max_batch_tokens:
+                if not self._queue.empty():
+                    # queries that are already waiting join the batch even if the wait time is over
+                    query = self._queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        query = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if batch_tokens + query.tokens > self.max_batch_tokens or query.mode != batch[0].mode:
+                    # the query opens the next batch (a batch is processed in a single mode)
+                    self._carried_query = query
+                    break
+                batch.append(query)
+                batch_tokens += query.tokens
+            self._update_stats(batch, batch_tokens, loop.time())
+            loop.create_task(self._run(batch))
+
+    async def _next_query(self) -> PendingQuery:
+        if self._carried_query is not None:
+            query, self._carried_query = self._carried_query, None
+            return query
+        return await self._queue.get()
+
+    async def _run(self, batch: List[PendingQuery]):
+        loop = asyncio.get_running_loop()
+        try:
+            # skip queries whose callers are no longer waiting for the results
+            batch = [query for query in batch if not query.future.done()]
+            if len(batch) == 0:
+                return
+            docs = [doc for query in batch for doc in query.docs]
+            try:
+                output_docs = await loop.run_in_executor(self.executor, self.run_batch, docs, batch[0].mode)
+            except Exception as e:
+                if len(batch) == 1:
+                    QueryCoalescer._set_exception(batch[0], e)
+                    return
+                # run the queries separately so a bad query won't fail the queries it was batched with
+                self.stats["failed_batches"] += 1
+                for query in batch:
+                    try:
+                        QueryCoalescer._set_result(
+                            query,
+                            await loop.run_in_executor(self.executor, self.run_batch, query.docs, query.mode))
+                    except Exception as query_exception:
+                        QueryCoalescer._set_exception(query, query_exception)
+                return
+            offset = 0
+            for query in batch:
+                QueryCoalescer._set_result(query, output_docs[offset:offset + len(query.docs)])
+                offset += len(query.docs)
+        finally:
+            self._batch_slots.release()
+
+    @staticmethod
+    def _set_result(query: PendingQuery, output_docs: List[Doc]):
+        # the caller may have gone away (for example, the client disconnected)
+        if not query.future.done():
+            query.future.set_result(output_docs)
+
+    @staticmethod
+    def _set_exception(query: PendingQuery, exception: Exception):
+        if not query.future.done():
+            query.future.set_exception(exception)
+
+    def _update_stats(self, batch: List[PendingQuery], batch_tokens: int, dispatch_time: float):
+        batch_documents = sum(len(query.docs) for query in batch)
+        self.stats["queries"] += len(batch)
+        self.stats["documents"] += batch_documents
+        self.stats["batches"] += 1
+        self.stats["batch_tokens"] += batch_tokens
+        self.stats["batch_wait_ms"] += (dispatch_time - batch[0].enqueue_time) * 1000
+        self.stats["max_batch_documents"] = max(self.stats["max_batch_documents"], batch_documents)
+
+    def metrics(self) -> Dict:
+        batches = max(self.stats["batches"], 1)
+        return {
+            "settings": {
+                "max_wait_ms": self.max_wait_ms,
+                "max_batch_tokens": self.max_batch_tokens,
+                "max_concurrent_batches": self.max_concurrent_batches,
+            },
+            **self.stats,
+            "avg_queries_per_batch": self.stats["queries"] / batches,
+            "avg_documents_per_batch": self.stats["documents"] / batches,
+            "avg_tokens_per_batch": self.stats["batch_tokens"] / batches,
+            "avg_batch_wait_ms": self.stats["batch_wait_ms"] / batches,
+        }
+
+
+class ResultCache:
+    """
+    An LRU cache of the results of documents, keyed by a hash of the pipeline version and the text. It stores only the
+    compact results (the recognized spans and the anonymized text), never the input text. The memory of the cache is
+    bounded by the total size of its (pickled) entries, and entries can expire after a given time.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None, version: str = ""):
+        """
+        Initializes ResultCache
+
+        :param max_bytes: the maximal total size (in bytes) of the cached entries
+        :param ttl_seconds: the time (in seconds) after which an entry expires (entries never expire if None or 0)
+        :param version: the version of the pipeline, the entries of another version are never returned
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _key(self, text: str, mode: Optional[str]) -> bytes:
+        return hashlib.sha256(f"{self.version}\0{mode}\0{text}".encode("utf-8")).digest()
+
+    def get(self, text: str, mode: Optional[str] = None) -> Optional[CompactResults]:
+        """
+        Returns the cached results of the given text
+
+        :param text: the text of a document
+        :param mode: the processing mode the results were created in
+        :return: the compact results of the text, or None if they are not cached
+        """
+        key = self._key(text, mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        # a new copy of the results is created on every hit, so documents never share their results
+        return pickle.loads(entry[1])
+
+    def put(self, text: str, results: CompactResults, mode: Optional[str] = None):
+        """
+        Caches the results of the given text, and evicts the least recently used entries if the cache is full
+
+        :param text: the text of a document
+        :param results: the compact results of the text (as created by pack_results)
+        :param mode: the processing mode the results were created in
+        """
+        key = self._key(text, mode)
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        expiry_time = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expiry_time, data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: bytes):
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            lookups = max(self.stats["hits"] + self.stats["misses"], 1)
+            return {
+                "settings": {
+                    "max_bytes": self.max_bytes,
+                    "ttl_seconds": self.ttl_seconds,
+                },
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self.stats["hits"] / lookups,
+            }
+
+
+def get_pipeline_version(hch: HebSafeHarbor) -> str:
+    """
+    Returns a version string that identifies the pipeline: the package version, a hash of the package sources (which
+    include the lexicons) and the name and version of the NER model
+
+    :param hch: the pipeline
+    :return: the version of the pipeline
+    """
+    package_dir = os.path.dirname(hebsafeharbor.__file__)
+    sources_hash = hashlib.sha256()
+    for root, dir_names, file_names in os.walk(package_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.endswith(".py"):
+                path = os.path.join(root, file_name)
+                sources_hash.update(os.path.relpath(path, package_dir).encode("utf-8"))
+                with open(path, "rb") as source_file:
+                    sources_hash.update(source_file.read())
+    model_meta = hch.identifier.analyzer.nlp_engine.nlp["he"].meta
+    return f"{VERSION}:{sources_hash.hexdigest()}:{model_meta.get('name')}-{model_meta.get('version')}"
+
+
 class HebSafeHarborService:
-    def __init__(self):
+    def __init__(self, inference_workers: int = 1, max_pending_queries: int = 100, batch_max_wait_ms: float = 10,
+                 batch_max_tokens: int = 20000, stream_chunk_size: int = 8, result_cache_max_bytes: int = 0,
+                 result_cache_ttl_seconds: Optional[float] = None):
         self.hch: HebSafeHarbor = None
         self.status = ServiceStatus.UNINITIALIZED
+        self._status_lock = threading.Lock()
+        # the pipeline runs on a dedicated executor so it never blocks the event loop of the server
+        self.inference_workers = inference_workers
+        self.executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="hsh-inference")
+        # bounds the number of queries that are running or waiting for the executor
+        self.max_pending_queries = max_pending_queries
+        self._pending_queries = threading.BoundedSemaphore(max_pending_queries)
+        # documents of concurrent queries are coalesced into batches before they are sent to the executor
+        self.coalescer = QueryCoalescer(self._run_batch, self.executor, max_concurrent_batches=inference_workers,
+                                        max_wait_ms=batch_max_wait_ms, max_batch_tokens=batch_max_tokens)
+        # number of documents processed together when the results are streamed
+        self.stream_chunk_size = stream_chunk_size
+        # results of previously seen texts are served from the cache (created once the pipeline is loaded, disabled if
+        # the maximal size is 0)
+        self.result_cache_max_bytes = result_cache_max_bytes
+        self.result_cache_ttl_seconds = result_cache_ttl_seconds
+        self.result_cache: Optional[ResultCache] = None
 
     def _initialize(self):
-        self.status = ServiceStatus.LOADING
         try:
             hch = HebSafeHarbor()
 
             doc = hch(
                 [{"id": "id", "text": "גדעון לבנה הגיע ב16.1.2022 לבית החולים שערי צדק עם תלונות על כאבים בחזה"}])
 
-            self.status = ServiceStatus.READY
+            if self.result_cache_max_bytes > 0:
+                self.result_cache = ResultCache(self.result_cache_max_bytes, self.result_cache_ttl_seconds,
+                                                get_pipeline_version(hch))
+            # the instance must be set before the status changes, otherwise queries can observe a ready service
+            # without a pipeline
             self.hch = hch
+            self.status = ServiceStatus.READY
             print("Hebrew Safe Harbor Service is up and ready to serve")
 
         except Exception as e:
@@ -34,10 +329,12 @@ class HebSafeHarborService:
             raise e
 
     def load_async(self):
-        if self.status == ServiceStatus.UNINITIALIZED:
-            load_model_thread = threading.Thread(
-                target=hsh_service._initialize)
-            load_model_thread.start()
+        with self._status_lock:
+            if self.status != ServiceStatus.UNINITIALIZED:
+                return
+            self.status = ServiceStatus.LOADING
+        load_model_thread = threading.Thread(target=self._initialize, daemon=True)
+        load_model_thread.start()
 
     def ready(self):
         if self.status == ServiceStatus.READY:
@@ -51,13 +348,134 @@ class HebSafeHarborService:
                    "status": readiness
                }, status_code
 
-    def query(self, docs: List[Dict[str, str]]):
+    def query(self, docs: List[Dict[str, str]], mode: Optional[str] = None):
+        if self.status != ServiceStatus.READY:
+            return "Service is not ready", 503
         # executing the prediction
         try:
-            output_docs = self.hch(docs)
+            # None stands for the default mode of the pipeline
+            if mode is not None:
+                PhiIdentifier.validate_mode(mode)
+            output_docs, missed_indices = self._get_cached(docs, mode)
+            if missed_indices:
+                self._merge_results(output_docs, missed_indices,
+                                    self._run_batch([docs[i] for i in missed_indices], mode))
+            return output_docs, 200
+        except Exception as e:
+            return f"Bad response: {e}", 400
+
+    async def query_async(self, docs: List[Dict[str, str]], mode: Optional[str] = None):
+        if self.status != ServiceStatus.READY:
+            return "Service is not ready", 503
+        # reject immediately instead of queueing without limit when the service is overloaded
+        if not self._pending_queries.acquire(blocking=False):
+            return "Service is busy, too many pending queries", 503
+        try:
+            # None stands for the default mode of the pipeline
+            if mode is not None:
+                PhiIdentifier.validate_mode(mode)
+            if self.result_cache is None:
+                output_docs, missed_indices = self._get_cached(docs, mode)
+            else:
+                # hashing the texts and unpacking the cached results are not done on the event loop
+                output_docs, missed_indices = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._get_cached, docs, mode)
+            if missed_indices:
+                self._merge_results(output_docs, missed_indices,
+                                    await self.coalescer.submit([docs[i] for i in missed_indices], mode))
             return output_docs, 200
         except Exception as e:
             return f"Bad response: {e}", 400
+        finally:
+            self._pending_queries.release()
+
+    async def query_stream(self, docs: List[Dict[str, str]], chunk_size: Optional[int] = None,
+                           mode: Optional[str] = None) -> AsyncIterator[
+            Tuple[List[Dict[str, str]], Union[List[Doc], str], int]]:
+        """
+        Executes the pipeline on consecutive chunks of the given documents and yields the results of each chunk as soon
+        as they are ready, so only a couple of chunks are held in memory at any time. The next chunk is processed while
+        the results of the current one are consumed.
+
+        :param docs: the documents to process
+        :param chunk_size: number of documents in each chunk (stream_chunk_size if None)
+        :param mode: the processing mode (the default mode of the pipeline if None)
+        :return: async iterator of (input documents of the chunk, output documents or error message, status code)
+        """
+        chunk_size = chunk_size if chunk_size else self.stream_chunk_size
+        chunks = [docs[i:i + chunk_size] for i in range(0, len(docs), chunk_size)]
+        loop = asyncio.get_running_loop()
+        next_chunk_result = loop.create_task(self.query_async(chunks[0], mode)) if chunks else None
+        try:
+            for index, chunk in enumerate(chunks):
+                chunk_result = next_chunk_result
+                next_chunk_result = loop.create_task(self.query_async(chunks[index + 1], mode)) \
+                    if index + 1 < len(chunks) else None
+                output_docs, status_code = await chunk_result
+                if status_code == 400 and len(chunk) > 1:
+                    # process the documents one by one so only the failed documents are reported as errors
+                    for doc in chunk:
+                        doc_output, doc_status_code = await self.query_async([doc], mode)
+                        yield [doc], doc_output, doc_status_code
+                else:
+                    yield chunk, output_docs, status_code
+        finally:
+            # the consumer stopped early (for example, the client disconnected)
+            if next_chunk_result is not None:
+                next_chunk_result.cancel()
+
+    def _get_cached(self, docs: List[Dict[str, str]], mode: Optional[str]) -> Tuple[List[Optional[Doc]], List[int]]:
+        """
+        Looks up the results of the given documents in the result cache
+
+        :param docs: the documents to process
+        :param mode: the processing mode (the default mode of the pipeline if None)
+        :return: the output documents (None for the documents whose results are not cached) and the indices of the
+        documents whose results are not cached
+        """
+        if self.result_cache is None:
+            return [None] * len(docs), list(range(len(docs)))
+        output_docs, missed_indices = [], []
+        for index, doc_dict in enumerate(docs):
+            doc = Doc(doc_dict)
+            results = self.result_cache.get(doc.text, mode)
+            if results is None:
+                missed_indices.append(index)
+                output_docs.append(None)
+            else:
+                output_docs.append(unpack_results(doc, results))
+        return output_docs, missed_indices
+
+    @staticmethod
+    def _merge_results(output_docs: List[Optional[Doc]], missed_indices: List[int], missed_docs: List[Doc]):
+        for index, doc in zip(missed_indices, missed_docs):
+            output_docs[index] = doc
+
+    def _run_batch(self, docs: List[Dict[str, str]], mode: Optional[str] = None) -> List[Doc]:
+        output_docs = self.hch(docs, mode)
+        if self.result_cache is not None:
+            for doc in output_docs:
+                if doc.error is None:
+                    self.result_cache.put(doc.text, pack_results(doc), mode)
+        return output_docs
+
+    def metrics(self):
+        metrics = self.coalescer.metrics()
+        if self.hch is not None:
+            metrics["recognizer_prescreening"] = self.hch.identifier.analyzer.recognizer_prescreener.get_skip_counts()
+            metrics["nlp_batching"] = self.hch.identifier.analyzer.nlp_engine.get_batch_stats()
+            if self.hch.identifier.sentence_memo is not None:
+                metrics["sentence_memo"] = self.hch.identifier.sentence_memo.get_stats()
+            metrics["ner_screening"] = self.hch.identifier.ner_screener.get_stats()
+        if self.result_cache is not None:
+            metrics["result_cache"] = self.result_cache.metrics()
+        return metrics
 
 
-hsh_service = HebSafeHarborService()
+hsh_service = HebSafeHarborService(inference_workers=int(os.environ.get("HSH_INFERENCE_WORKERS", 1)),
+                                   max_pending_queries=int(os.environ.get("HSH_MAX_PENDING_QUERIES", 100)),
+                                   batch_max_wait_ms=float(os.environ.get("HSH_BATCH_MAX_WAIT_MS", 10)),
+                                   batch_max_tokens=int(os.environ.get("HSH_BATCH_MAX_TOKENS", 20000)),
+                                   stream_chunk_size=int(os.environ.get("HSH_STREAM_CHUNK_SIZE", 8)),
+                                   result_cache_max_bytes=int(os.environ.get("HSH_RESULT_CACHE_MAX_BYTES", 0)),
+                                   result_cache_ttl_seconds=float(os.environ.get("HSH_RESULT_CACHE_TTL_SECONDS", 0)))
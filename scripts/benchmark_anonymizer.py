@@ -0,0 +1,132 @@
+"""
+A micro-benchmark of the anonymization of short documents. It compares the PhiAnonymizer backends against the previous
+implementation (which built the operator configurations of all the entity types for every document and let Presidio's
+AnonymizerEngine look up and validate the operator of every entity), verifies that all of them produce the same
+anonymized texts and items and reports the anonymization time per document.
+
+Usage example:
+python benchmark_anonymizer.py --num_docs 20000 --repeat 3
+"""
+
+import argparse
+import gc
+import random
+import time
+from typing import List, Tuple
+
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import EngineResult, OperatorConfig
+
+from hebsafeharbor import Doc
+from hebsafeharbor.anonymizer.phi_anonymizer import ANONYMIZER_BACKENDS, PhiAnonymizer
+
+# (entity type, surface forms) of the synthetic entities
+ENTITIES = [
+    ("PERS", ["גדעון לבנה", "שרה כהן", "משה"]),
+    ("CITY", ["חיפה", "בחיפה", "אביאל", "ב”ש"]),
+    ("COUNTRY", ["צרפת", "ארגנטינה", "ארץ לא מוכרת"]),
+    ("ORG", ["שערי צדק", "מכבי"]),
+    ("BIRTH_DATE", ["12.03.1985", "1.1.1930", "ט״ו בשבט תשמ״ה"]),
+    ("MEDICAL_DATE", ["16.1.2022", "2020-05-17", "מרץ 2021"]),
+    ("ID", ["123456782", "0521234567"]),
+    ("EMAIL_ADDRESS", ["a@b.co.il"]),
+    ("DISEASE", ["סוכרת"]),
+]
+FILLERS = ["הגיע", "לבית החולים", "עם תלונות על", "כאבים בחזה", "ונשלח", "לבדיקה", "של", "ב-"]
+
+
+def create_docs(num_docs: int) -> List[Doc]:
+    """
+    Creates short synthetic documents with their (granular) recognized entities
+    """
+    rand = random.Random(0)
+    docs = []
+    for index in range(num_docs):
+        parts, entities, offset = [], [], 0
+        for _ in range(rand.randint(1, 6)):
+            filler = " ".join(rand.sample(FILLERS, 2)) + " "
+            entity_type, forms = rand.choice(ENTITIES)
+            form = rand.choice(forms)
+            start = offset + len(filler)
+            entities.append(RecognizerResult(entity_type, start, start + len(form), 0.85))
+            parts.append(filler + form + " ")
+            offset = start + len(form) + 1
+        doc = Doc({"id": str(index), "text": "".join(parts)})
+        doc.granular_analyzer_results = entities
+        docs.append(doc)
+    return docs
+
+
+def legacy_anonymize(anonymizer_engine: AnonymizerEngine, phi_anonymizer: PhiAnonymizer, doc: Doc) -> EngineResult:
+    """
+    The previous implementation of PhiAnonymizer.__call__
+    """
+    operators = phi_anonymizer.operators
+    replace_in_hebrew_config = {
+        entity_type: OperatorConfig(operators[0].operator_name(), {"lambda": lambda x, y: operators[0].operate(x, y)})
+        for entity_type in ["PERS", "PER", "LOC", "GPE", "ORG", "FAC", "CREDIT_CARD", "ISRAELI_ID_NUMBER", "ID",
+                            "EMAIL_ADDRESS", "IP_ADDRESS", "URL", "PHONE_NUMBER", "DATE"]}
+    anonymized_results = anonymizer_engine.anonymize(
+        text=doc.text,
+        analyzer_results=doc.granular_analyzer_results,
+        operators={
+            **replace_in_hebrew_config,
+            "BIRTH_DATE": OperatorConfig(operators[1].operator_name(), {"lambda": lambda x: operators[1].operate(x)}),
+            "MEDICAL_DATE": OperatorConfig(operators[2].operator_name(),
+                                           {"lambda": lambda x: operators[2].operate(x)}),
+            "COUNTRY": OperatorConfig(operators[3].operator_name(), {"lambda": lambda x: operators[3].operate(x)}),
+            "CITY": OperatorConfig(operators[4].operator_name(), {"lambda": lambda x: operators[4].operate(x)}),
+        },
+    )
+    anonymized_results.items.sort(key=lambda res: res.start)
+    return anonymized_results
+
+
+def describe(engine_result: EngineResult) -> Tuple:
+    return engine_result.text, tuple(
+        (item.start, item.end, item.entity_type, item.text, item.operator) for item in engine_result.items)
+
+
+def measure(anonymize, docs: List[Doc], repeat: int) -> Tuple[float, List[EngineResult]]:
+    results = []
+    best = float("inf")
+    for _ in range(repeat):
+        # like timeit, the garbage collection is disabled so that the collection of the previous results is not measured
+        gc.disable()
+        start_time = time.perf_counter()
+        results = anonymize(docs)
+        best = min(best, time.perf_counter() - start_time)
+        gc.enable()
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anonymization of short documents micro-benchmark")
+    parser.add_argument("--num_docs", type=int, default=20000, help="number of synthetic documents")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions (the best time is reported)")
+    args = parser.parse_args()
+
+    docs = create_docs(args.num_docs)
+    legacy_anonymizer = PhiAnonymizer()
+    anonymizer_engine = AnonymizerEngine()
+
+    timings = [("legacy", lambda batch: [legacy_anonymize(anonymizer_engine, legacy_anonymizer, doc) for doc in batch])]
+    for backend in ANONYMIZER_BACKENDS:
+        phi_anonymizer = PhiAnonymizer(backend=backend)
+        timings.append((f"{backend}, per document",
+                        lambda batch, anonymizer=phi_anonymizer: [anonymizer(doc).anonymized_text for doc in batch]))
+        timings.append((f"{backend}, anonymize_many",
+                        lambda batch, anonymizer=phi_anonymizer: [doc.anonymized_text for doc in
+                                                                  anonymizer.anonymize_many(batch)]))
+    legacy_results = None
+    for name, anonymize in timings:
+        elapsed, results = measure(anonymize, docs, args.repeat)
+        if legacy_results is None:
+            legacy_results = [describe(result) for result in results]
+        identical = legacy_results == [describe(result) for result in results]
+        print(f"{name}: {elapsed / len(docs) * 1e6:.1f} µs per document, identical to legacy: {identical}")
+
+
+if __name__ == "__main__":
+    main()
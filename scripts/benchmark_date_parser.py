@@ -0,0 +1,118 @@
+"""
+A micro-benchmark of the date components parser (used by the date anonymizer operators) against its previous
+implementation (which searched all the uncompiled date patterns one by one). It generates synthetic date mentions in
+the formats that appear in lab results timelines, verifies that both implementations extract the same date components
+and reports the parsing time of each of them.
+
+Usage example:
+python benchmark_date_parser.py --num_dates 300000 --repeat 3
+"""
+
+import argparse
+import gc
+import random
+import re
+import time
+from typing import List, Optional, Tuple
+
+from hebsafeharbor.common.date_regex import HEB_FULL_DATE_REGEX, HEB_MONTH_YEAR_REGEX, HEB_DAY_MONTH_REGEX, \
+    LATIN_DATE_REGEX, EN_DMY_REGEX, EN_MDY_REGEX, EN_YMD_REGEX, EN_DATE_REGEX, SPLIT_BY_SPACE_REGEX
+from hebsafeharbor.common.date_utils import DateMention, MIN_DATE_LENGTH, extract_date_components, \
+    extract_numerical_date_components, set_date_mention_from_pattern_group_names
+
+LATIN_MONTHS = ["ינואר", "פברואר", "מרץ", "אפריל", "מאי", "יוני", "יולי", "אוגוסט", "ספטמבר", "אוקטובר", "נובמבר",
+                "דצמבר"]
+ENGLISH_MONTHS = ["jan", "Feb", "MAR", "april", "May", "june", "Jul", "aug", "sep", "Oct", "november", "dec"]
+HEBREW_MONTHS = ["תשרי", "חשוון", "כסלו", "טבת", "שבט", "אדר", "ניסן", "אייר", "סיון", "תמוז", "אב", "אלול"]
+HEBREW_DAYS = ["א׳", "ה׳", "י״ב", "ט״ו", "כ״ג", "ל״א"]
+HEBREW_YEARS = ["תשפ״א", "התשפ״ב", "תש״ן"]
+PREFIXES = ["", "", "", "ב", "ב-", "מ-", "ה"]
+
+
+def legacy_extract_date_components(text: str) -> DateMention:
+    """
+    The previous implementation of extract_date_components
+    """
+    if len(text) < MIN_DATE_LENGTH:
+        return DateMention()
+    for pattern in [HEB_FULL_DATE_REGEX, HEB_MONTH_YEAR_REGEX, HEB_DAY_MONTH_REGEX, LATIN_DATE_REGEX, EN_DMY_REGEX,
+                    EN_MDY_REGEX, EN_YMD_REGEX, EN_DATE_REGEX, SPLIT_BY_SPACE_REGEX]:
+        matched = re.search(pattern, text, re.IGNORECASE)
+        if matched:
+            return set_date_mention_from_pattern_group_names(matched)
+    num_date = extract_numerical_date_components(text)
+    if num_date:
+        return num_date
+    return DateMention()
+
+
+def create_dates(num_dates: int) -> List[str]:
+    """
+    Creates synthetic date mentions in the different formats
+    """
+    rand = random.Random(0)
+    dates = []
+    for _ in range(num_dates):
+        day, month, year = rand.randint(1, 31), rand.randint(1, 12), rand.randint(1930, 2024)
+        separator = rand.choice(["/", ".", "-", " / "])
+        date_format = rand.randrange(10)
+        if date_format == 0:
+            date = f"{day:02d}{separator}{month:02d}{separator}{year}"
+        elif date_format == 1:
+            date = f"{day}{separator}{month}{separator}{year % 100:02d}"
+        elif date_format == 2:
+            date = f"{year}{separator}{month:02d}{separator}{day:02d}"
+        elif date_format == 3:
+            date = f"{month:02d}{separator}{year}"
+        elif date_format == 4:
+            date = f"{day:02d}{month:02d}{year}"
+        elif date_format == 5:
+            date = f"{day} {rand.choice(['', 'ב'])}{LATIN_MONTHS[month - 1]} {year}"
+        elif date_format == 6:
+            date = f"{LATIN_MONTHS[month - 1]} {year}"
+        elif date_format == 7:
+            date = f"{ENGLISH_MONTHS[month - 1]} {day}{rand.choice(['', 'th'])}, {year}"
+        elif date_format == 8:
+            date = f"{rand.choice(HEBREW_DAYS)} {rand.choice(['', 'ב'])}{rand.choice(HEBREW_MONTHS)} " \
+                   f"{rand.choice(HEBREW_YEARS)}"
+        else:
+            date = f"{rand.choice(HEBREW_MONTHS)} {rand.choice(HEBREW_YEARS)}"
+        dates.append(rand.choice(PREFIXES) + date)
+    return dates
+
+
+def describe(date_mention: DateMention) -> Tuple[Optional[Tuple], ...]:
+    return tuple(None if component is None else (component.text, component.start, component.end) for component in
+                 [date_mention.day, date_mention.month, date_mention.year]) + (date_mention.text,)
+
+
+def measure(parser, dates: List[str], repeat: int) -> Tuple[float, List[DateMention]]:
+    results = []
+    best = float("inf")
+    for _ in range(repeat):
+        # like timeit, the garbage collection is disabled so that the collection of the previous results is not measured
+        gc.disable()
+        start_time = time.perf_counter()
+        results = [parser(date) for date in dates]
+        best = min(best, time.perf_counter() - start_time)
+        gc.enable()
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Date components parser micro-benchmark")
+    parser.add_argument("--num_dates", type=int, default=300000, help="number of synthetic date mentions")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions (the best time is reported)")
+    args = parser.parse_args()
+
+    dates = create_dates(args.num_dates)
+    legacy_time, legacy_results = measure(legacy_extract_date_components, dates, args.repeat)
+    new_time, new_results = measure(extract_date_components, dates, args.repeat)
+    identical = all(describe(legacy) == describe(new) for legacy, new in zip(legacy_results, new_results))
+    print(f"{len(dates)} date mentions, identical components: {identical}")
+    print(f"legacy: {legacy_time * 1000:.1f} ms, current: {new_time * 1000:.1f} ms, "
+          f"speedup: {legacy_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+An end-to-end throughput benchmark of HebSafeHarbor over synthetic clinical documents of several size tiers. In the
+"stub" mode the he_ner_news_trf model is replaced by StubNlpEngine (a deterministic rule based pipeline which tags
+synthetic PERS/LOC/DATE entities), so the rule based stages can be benchmarked on any machine. In the "model" mode the
+real model is used (it must be installed). For each tier it reports the documents and characters processed per second
+and the time per document of each stage (and of the slowest recognizers). The results can be saved as a JSON baseline
+and compared against a saved baseline, in which case the exit code is 1 if the throughput of a tier regressed by more
+than the tolerance.
+
+Usage example:
+python benchmark_pipeline.py --mode stub --num_docs 200 --repeat 3 --save_baseline baseline.json
+python benchmark_pipeline.py --mode stub --num_docs 200 --repeat 3 --baseline baseline.json --tolerance 0.1
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from typing import Dict, List
+
+import spacy
+
+from hebsafeharbor import HebSafeHarbor
+from hebsafeharbor.common.city_utils import ABOVE_THRESHOLD_CITIES_LIST, BELOW_THRESHOLD_CITIES_LIST
+from hebsafeharbor.common.country_utils import COUNTRY_DICT
+from hebsafeharbor.identifier.stub_nlp_engine import StubNlpEngine, STUB_FIRST_NAMES, STUB_LAST_NAMES
+from hebsafeharbor.lexicons.disease import DISEASES
+from hebsafeharbor.lexicons.medications import MEDICATIONS
+
+# the approximate length (in characters) of the documents of each tier
+TIERS = {"short": 300, "medium": 3000, "long": 15000}
+TEMPLATES = [
+    "{name} הגיע ב-{date} לבית החולים שערי צדק עם תלונות על כאבים בחזה.",
+    "המטופל {name}, ת.ז {id}, נולד ב{date}. טלפון: {phone}",
+    "המטופלת גרה ב{city} וסובלת מ{disease}, מטופלת ב{medication}.",
+    "תאריך לידה: {date} כתובת מייל user{number}@mail.co.il",
+    "עלה מ{country} בשנת {year} ומתגורר ב{city}.",
+    "ב-{date} החל טיפול ב{medication}, הטיפול הופסק לאחר שבועיים.",
+    "נשלח לבדיקה נוספת. ללא ממצאים חריגים בבדיקה הגופנית.",
+    "סיכום אשפוז {date}: {name} שוחרר לביתה ב{city} במצב טוב.",
+]
+# the number of slowest recognizers that are reported
+NUM_REPORTED_RECOGNIZERS = 5
+
+
+def create_docs(num_docs: int, length: int, seed: int = 0) -> List[Dict[str, str]]:
+    """
+    Creates synthetic documents of about the given length out of the sentence templates
+    """
+    rand = random.Random(seed)
+    cities = ABOVE_THRESHOLD_CITIES_LIST + BELOW_THRESHOLD_CITIES_LIST
+    countries, diseases, medications = list(COUNTRY_DICT), list(DISEASES), list(MEDICATIONS)
+    docs = []
+    for index in range(num_docs):
+        sentences, doc_length = [], 0
+        while doc_length < length:
+            sentence = rand.choice(TEMPLATES).format(
+                name=f"{rand.choice(STUB_FIRST_NAMES)} {rand.choice(STUB_LAST_NAMES)}",
+                date=f"{rand.randint(1, 28)}.{rand.randint(1, 12)}.{rand.randint(1930, 2022)}",
+                id="".join(str(rand.randint(0, 9)) for _ in range(9)),
+                phone=f"05{rand.randint(0, 9)}-{rand.randint(1000000, 9999999)}",
+                city=rand.choice(cities), country=rand.choice(countries), disease=rand.choice(diseases),
+                medication=rand.choice(medications), year=rand.randint(1950, 2020), number=rand.randint(1, 100))
+            sentences.append(sentence)
+            doc_length += len(sentence) + 1
+        docs.append({"id": str(index), "text": " ".join(sentences)})
+    return docs
+
+
+def measure(hsh: HebSafeHarbor, docs: List[Dict[str, str]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # like timeit, the garbage collection is disabled so that the collection of the previous results is not measured
+        gc.disable()
+        start_time = time.perf_counter()
+        hsh(docs)
+        best = min(best, time.perf_counter() - start_time)
+        gc.enable()
+    return best
+
+
+def get_stage_breakdown(hsh: HebSafeHarbor, docs: List[Dict[str, str]]) -> Dict[str, float]:
+    """
+    Processes the documents with timings and returns the wall time per document (in milliseconds) of each stage and of
+    the slowest recognizers
+    """
+    hsh.collect_timings = True
+    try:
+        hsh(docs)
+    finally:
+        hsh.collect_timings = False
+    breakdown = {}
+    for stage, entry in hsh.batch_timings.items():
+        if "wall" in entry:
+            breakdown[stage] = entry["wall"] / len(docs) * 1000
+        else:
+            items = sorted(entry, key=lambda item: entry[item]["wall"], reverse=True)
+            limit = NUM_REPORTED_RECOGNIZERS if stage == "recognizers" else len(items)
+            for item in items[:limit]:
+                breakdown[f"{stage}.{item}"] = entry[item]["wall"] / len(docs) * 1000
+    return breakdown
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """
+    Prints the throughput of each tier relative to the baseline
+
+    :return: whether the throughput of all the tiers is within the tolerance of the baseline
+    """
+    if baseline.get("mode") != results["mode"]:
+        print(f"Warning: the baseline was measured in the {baseline.get('mode')} mode")
+    passed = True
+    for tier, tier_results in results["tiers"].items():
+        baseline_tier = baseline.get("tiers", {}).get(tier)
+        if baseline_tier is None:
+            print(f"{tier}: not in the baseline")
+            continue
+        ratio = tier_results["docs_per_sec"] / baseline_tier["docs_per_sec"]
+        regressed = ratio < 1 - tolerance
+        passed = passed and not regressed
+        print(f"{tier}: {ratio:.2f}x the baseline throughput{' - REGRESSION' if regressed else ''}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput benchmark of HebSafeHarbor")
+    parser.add_argument("--mode", choices=["stub", "model"], default="stub",
+                        help="stub - a rule based NLP engine instead of the NER model, model - the he_ner_news_trf model")
+    parser.add_argument("--num_docs", type=int, default=200, help="number of documents per tier")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS), help="document size tiers")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions (the best time is reported)")
+    parser.add_argument("--baseline", help="path of a JSON baseline to compare the results to")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="maximal relative throughput regression compared to the baseline")
+    parser.add_argument("--save_baseline", help="path to save the results to as a JSON baseline")
+    args = parser.parse_args()
+
+    if args.mode == "model" and not spacy.util.is_package("he_ner_news_trf"):
+        parser.error("the model mode requires the he_ner_news_trf model to be installed")
+    hsh = HebSafeHarbor(collect_timings=False, nlp_engine=StubNlpEngine() if args.mode == "stub" else None)
+
+    results = {"mode": args.mode, "num_docs": args.num_docs, "tiers": {}}
+    for tier in args.tiers:
+        # fewer documents of the longer tiers, so all the tiers hold about the same number of characters
+        num_docs = max(args.num_docs * TIERS["short"] // TIERS[tier], 1)
+        docs = create_docs(num_docs, TIERS[tier])
+        num_chars = sum(len(doc["text"]) for doc in docs)
+        # warm up (lazy loading of the recognizers, etc.)
+        hsh(docs[:10])
+        elapsed = measure(hsh, docs, args.repeat)
+        results["tiers"][tier] = {
+            "num_docs": num_docs,
+            "docs_per_sec": num_docs / elapsed,
+            "chars_per_sec": num_chars / elapsed,
+            "stage_ms_per_doc": get_stage_breakdown(hsh, docs),
+        }
+        tier_results = results["tiers"][tier]
+        print(f"{tier} ({num_docs} documents of ~{TIERS[tier]} characters): {tier_results['docs_per_sec']:.1f} "
+              f"docs/sec, {tier_results['chars_per_sec']:.0f} chars/sec")
+        for stage, stage_time in tier_results["stage_ms_per_doc"].items():
+            print(f"    {stage}: {stage_time:.3f} ms per document")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare_to_baseline(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
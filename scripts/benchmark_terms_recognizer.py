@@ -0,0 +1,112 @@
+"""
+A micro-benchmark of TermsRecognizer against its previous implementation (which validated the boundaries of every
+Aho-Corasick hit using regular expressions). It uses the combined city lexicon and synthetic texts, verifies that both
+implementations return the same offsets and reports the matching time of each of them.
+
+Usage example:
+python benchmark_terms_recognizer.py --num_texts 2000 --repeat 3
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import List, Optional, Tuple
+
+import ahocorasick
+
+from hebsafeharbor.common.city_utils import ABOVE_THRESHOLD_CITIES_LIST, BELOW_THRESHOLD_CITIES_LIST, \
+    ABBREVIATIONS_LIST
+from hebsafeharbor.common.prepositions import LOCATION_PREPOSITIONS
+from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+
+FILLER_WORDS = ["המטופל", "הגיע", "עם", "תלונות", "על", "כאבים", "בחזה", "גר", "עבר", "תושב", "ברחוב", "12", "2020",
+                "-", ",", ".", "(", ")", "abc", "x_y"]
+
+
+class LegacyTermsRecognizer:
+    """
+    The previous implementation of TermsRecognizer
+    """
+
+    def __init__(self, phrase_list: List[str]):
+        self._automaton = ahocorasick.Automaton(ahocorasick.STORE_LENGTH)
+        for phrase in phrase_list:
+            self._automaton.add_word(phrase)
+        self._automaton.make_automaton()
+
+    def __call__(self, text: str, prefixes: Optional[List[str]] = None) -> List[Tuple[int, int]]:
+        offsets = []
+        for end_index_short, length in self._automaton.iter(text):
+            offset = end_index_short - length + 1
+            if length == 1 or offset < 0 or offset >= len(text):
+                pass
+            else:
+                if prefixes:
+                    prefixes_pattern_raw = "|".join(prefixes)
+                    prefixes_pattern = r"\W(" + prefixes_pattern_raw + ")"
+                    start_cond = offset == 0 or re.match(r"\W", text[offset - 1]) or re.match(
+                        prefixes_pattern, text[offset - 2:offset]) or (
+                                         offset == 1 and re.match(prefixes_pattern_raw, text[offset - 1]))
+                else:
+                    start_cond = offset == 0 or re.match(r"\W", text[offset - 1])
+                is_phrase = start_cond and (offset + length == len(text) or re.match(r"\W", text[offset + length]))
+                if is_phrase:
+                    offsets.append((offset, length))
+        return list(set(offsets))
+
+
+def create_texts(phrases: List[str], num_texts: int, words_per_text: int) -> List[str]:
+    """
+    Creates synthetic texts which mix lexicon phrases (with and without prepositions or glued to other words) and
+    filler words
+    """
+    rand = random.Random(0)
+    texts = []
+    for _ in range(num_texts):
+        words = []
+        for _ in range(words_per_text):
+            if rand.random() < 0.3:
+                phrase = rand.choice(phrases)
+                glue = rand.choice(["", "", rand.choice(LOCATION_PREPOSITIONS), "וה", "_"])
+                words.append(glue + phrase + rand.choice(["", "", "ים", ","]))
+            else:
+                words.append(rand.choice(FILLER_WORDS))
+        texts.append(" ".join(words))
+    return texts
+
+
+def measure(recognizer, texts: List[str], prefixes: List[str], repeat: int) -> Tuple[float, List]:
+    results = []
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        results = [recognizer(text, prefixes) for text in texts]
+        best = min(best, time.perf_counter() - start_time)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TermsRecognizer micro-benchmark")
+    parser.add_argument("--num_texts", type=int, default=2000, help="number of synthetic texts")
+    parser.add_argument("--words_per_text", type=int, default=100, help="number of words in each text")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions (the best time is reported)")
+    args = parser.parse_args()
+
+    phrases = list(set(ABOVE_THRESHOLD_CITIES_LIST).union(BELOW_THRESHOLD_CITIES_LIST).union(ABBREVIATIONS_LIST))
+    texts = create_texts(phrases, args.num_texts, args.words_per_text)
+    legacy_recognizer = LegacyTermsRecognizer(phrases)
+    recognizer = TermsRecognizer(phrases)
+
+    for prefixes in [None, LOCATION_PREPOSITIONS]:
+        legacy_time, legacy_results = measure(legacy_recognizer, texts, prefixes, args.repeat)
+        new_time, new_results = measure(recognizer, texts, prefixes, args.repeat)
+        identical = all(sorted(legacy) == sorted(new) for legacy, new in zip(legacy_results, new_results))
+        num_matches = sum(len(result) for result in new_results)
+        print(f"prefixes={prefixes}: {num_matches} matches in {len(texts)} texts, identical offsets: {identical}")
+        print(f"  legacy: {legacy_time * 1000:.1f} ms, current: {new_time * 1000:.1f} ms, "
+              f"speedup: {legacy_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
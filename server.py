@@ -1,7 +1,9 @@
-from typing import List, Dict, Union
+import json
+from typing import List, Dict, Optional, Union
 
 import uvicorn
 from fastapi import FastAPI, Response, status, Body
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from hebsafeharbor import Doc
@@ -17,6 +19,8 @@ class ReadyResponse(BaseModel):
 
 class DocsRequest(BaseModel):
     docs: List[Dict[str, str]]
+    # the processing mode - "full", "rule_only" or "fast_screen" (the default mode of the service if None)
+    mode: Optional[str] = None
 
 
 class DocItem(BaseModel):
@@ -124,7 +128,8 @@ async def query(request: DocsRequest = Body(
         ]
     }), response: Response = status.HTTP_200_OK):
     print(request)
-    docs_result, response.status_code = hsh_service.query(request.docs)
+    # the pipeline runs on the service's inference executor, so the event loop stays free to serve other requests
+    docs_result, response.status_code = await hsh_service.query_async(request.docs, request.mode)
     if response.status_code == status.HTTP_200_OK:
         results = []
         for doc in docs_result:
@@ -135,12 +140,46 @@ async def query(request: DocsRequest = Body(
     return docs_result
 
 
+@app.post(path="/query/stream")
+async def query_stream(request: DocsRequest = Body(
+    {
+        "docs": [
+            {
+                "id": "doc_1",
+                "text": "גדעון לבנה הגיע ב-16.1.2022 לבית החולים שערי צדק עם תלונות על כאבים בחזה"
+            }
+        ]
+    })):
+    """
+    Streams the results as newline delimited JSON, one DocResponse line per document in the order of the input
+    documents. A document that failed is reported by a line with its id and an error message.
+    """
+    if hsh_service.ready()[1] != status.HTTP_200_OK:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content="Service is not ready")
+
+    async def stream_results():
+        async for input_docs, docs_result, status_code in hsh_service.query_stream(request.docs, mode=request.mode):
+            for index, doc_dict in enumerate(input_docs):
+                if status_code == status.HTTP_200_OK:
+                    line = convert_to_response(docs_result[index]).json(ensure_ascii=False)
+                else:
+                    line = json.dumps({"id": doc_dict.get("id"), "error": docs_result}, ensure_ascii=False)
+                yield line + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @app.get(path='/ready', response_model=ReadyResponse)
 def ready(response: Response):
     result, response.status_code = hsh_service.ready()
     return result
 
 
+@app.get(path='/metrics')
+def metrics():
+    return hsh_service.metrics()
+
+
 hsh_service.load_async()
 
 if __name__ == '__main__':
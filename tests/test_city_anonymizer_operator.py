@@ -0,0 +1,25 @@
+from hebsafeharbor.anonymizer.custom_operators.country_anonymizer_operator import CountryAnonymizerOperator
+from hebsafeharbor.anonymizer.custom_operators.israeli_city_anonymizer_operator import CITY_MASKING_POLICY, \
+    IsraeliCityAnonymizerOperator
+from hebsafeharbor.common.city_utils import ABOVE_THRESHOLD_CITIES_LIST, ABBREVIATIONS_LIST, \
+    AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST
+from hebsafeharbor.common.country_utils import COUNTRY_DICT
+
+
+def test_city_masking_policy_keeps_the_previous_decisions():
+    operator = IsraeliCityAnonymizerOperator()
+    kept_cities = ABOVE_THRESHOLD_CITIES_LIST + AMBIGOUS_ABOVE_THRESHOLD_CITIES_LIST + ABBREVIATIONS_LIST
+
+    for text in list(CITY_MASKING_POLICY) + ["עיר לא מוכרת", ""]:
+        expected = text if text in kept_cities else "<מיקום_>"
+        assert operator.operate(text) == expected
+
+    assert operator.operate("חיפה") == "חיפה"
+    assert operator.operate("בחיפה") == "<מיקום_>"
+
+
+def test_country_operator():
+    operator = CountryAnonymizerOperator()
+
+    assert all(operator.operate(country) == region for country, region in COUNTRY_DICT.items())
+    assert operator.operate("ארץ לא מוכרת") == "<מדינה_>"
@@ -0,0 +1,42 @@
+import regex as re
+from presidio_analyzer import PatternRecognizer
+from presidio_analyzer.predefined_recognizers import DateRecognizer as PresidioDateRecognizer
+
+from hebsafeharbor.identifier.signals import GeneralIdRecognizer, HebLatinDateRecognizer, IsraeliIdNumberRecognizer, \
+    PrepositionDateRecognizer
+from hebsafeharbor.identifier.signals.compiled_pattern_recognizer import CreditCardRecognizer, DateRecognizer, \
+    EmailRecognizer, IpRecognizer, UrlRecognizer
+from hebsafeharbor.identifier.signals.noisy_date_recognizer import NoisyDateRecognizer
+
+
+def describe(results):
+    return [(result.entity_type, result.start, result.end, result.score, result.recognition_metadata,
+             result.analysis_explanation.recognizer, result.analysis_explanation.pattern_name,
+             result.analysis_explanation.pattern, result.analysis_explanation.original_score,
+             result.analysis_explanation.score, result.analysis_explanation.validation_result) for result in results]
+
+
+def analyze_by_presidio(recognizer, text):
+    # the implementation of PatternRecognizer (@Presidio), with the flags that DateRecognizer adds
+    flags = re.DOTALL | re.MULTILINE | re.IGNORECASE if isinstance(recognizer, PresidioDateRecognizer) else None
+    return PatternRecognizer.analyze(recognizer, text, recognizer.supported_entities, regex_flags=flags)
+
+
+def test_results_are_identical_to_presidio_results():
+    recognizers = [CreditCardRecognizer(supported_language="he"), DateRecognizer(supported_language="he"),
+                   EmailRecognizer(supported_language="he"), IpRecognizer(supported_language="he"),
+                   UrlRecognizer(supported_language="he"), IsraeliIdNumberRecognizer(), GeneralIdRecognizer(),
+                   PrepositionDateRecognizer(), NoisyDateRecognizer(), HebLatinDateRecognizer()]
+    text = "נולד ב12.03.1985, ב-01022020 ו-2020 - 05 - 17. ת.ז 123456782 ו-123456789, MAR 5th 2020. " \
+           "תאריך 12/03/1985 כרטיס 4012888888881881 מייל a@b.co.il אתר www.example.com כתובת 192.168.0.1"
+
+    for recognizer in recognizers:
+        # twice, so the compiled patterns are reused
+        for _ in range(2):
+            assert describe(recognizer.analyze(text, recognizer.supported_entities)) == describe(
+                analyze_by_presidio(recognizer, text))
+
+
+def test_recognizers_keep_the_names_of_the_presidio_recognizers():
+    assert DateRecognizer(supported_language="he").name == "DateRecognizer"
+    assert NoisyDateRecognizer().name == "NoisyDateRecognizer"
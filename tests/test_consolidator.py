@@ -0,0 +1,60 @@
+from presidio_analyzer import RecognizerResult
+
+from hebsafeharbor.identifier.consolidation.consolidator import NerConsolidator
+
+
+def create_entities(num_entities):
+    # pairs of overlapping entities followed by a gap
+    entities = []
+    for index in range(num_entities // 2):
+        entities.append(RecognizerResult("PERS", index * 10, index * 10 + 5, 0.85))
+        entities.append(RecognizerResult("PERS", index * 10 + 2, index * 10 + 7, 0.85))
+    return entities
+
+
+class CountingList(list):
+    """
+    A list that counts how many times its items are read
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+
+def group_entities(entities, entities_starts):
+    groups = []
+    group_start_index, group_end_index = NerConsolidator.find_next_overlapped_entities_group(entities_starts, entities,
+                                                                                            0)
+    while group_start_index < group_end_index:
+        groups.append(entities[group_start_index:group_end_index])
+        group_start_index, group_end_index = NerConsolidator.find_next_overlapped_entities_group(
+            entities_starts, entities, groups[-1][-1].end, group_start_index)
+    return groups
+
+
+def test_get_next_overlapped_entities_group():
+    entities = [RecognizerResult("PERS", 0, 5, 0.85), RecognizerResult("PERS", 2, 10, 0.85),
+                RecognizerResult("PERS", 4, 6, 0.85), RecognizerResult("PERS", 5, 8, 0.85),
+                RecognizerResult("PERS", 12, 15, 0.85)]
+
+    assert NerConsolidator.get_next_overlapped_entities_group(entities, 0) == entities[:3]
+    assert NerConsolidator.get_next_overlapped_entities_group(list(reversed(entities)), 0) == entities[:3]
+    assert NerConsolidator.get_next_overlapped_entities_group(entities, 5) == entities[3:4]
+    assert NerConsolidator.get_next_overlapped_entities_group(entities, 11) == entities[4:]
+    assert NerConsolidator.get_next_overlapped_entities_group(entities, 15) == []
+
+
+def test_grouping_scales_linearly():
+    for num_entities in [10000, 100000]:
+        entities = create_entities(num_entities)
+        entities_starts = CountingList(entity.start for entity in entities)
+        groups = group_entities(entities, entities_starts)
+        assert len(groups) == num_entities // 2
+        assert all(len(group) == 2 for group in groups)
+        # the groups are found in a single pass, so each start offset is read a constant number of times
+        assert entities_starts.reads <= 3 * num_entities
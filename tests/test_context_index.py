@@ -0,0 +1,27 @@
+import random
+
+from hebsafeharbor.common.context_index import ContextIndexer
+from hebsafeharbor.common.terms_recognizer import TermsRecognizer
+
+
+def test_context_index_matches_linear_search():
+    vocabularies = {"ID": (["תעודה", "ת.ז", "מספר אישי"], None),
+                    "MEDICAL": (["בדיקה", "טופל"], ["ב", "ל"])}
+    rand = random.Random(0)
+    words = ["תעודה", "ת.ז", "מספר אישי", "בדיקה", "לבדיקה", "טופל", "123", "המטופל", "גר", ",", "-"]
+    text = " ".join(rand.choice(words) for _ in range(300))
+
+    context_indexer = ContextIndexer()
+    for name, (phrase_list, prefixes) in vocabularies.items():
+        context_indexer.add_vocabulary(name, phrase_list, prefixes=prefixes)
+    # adding an identical vocabulary again has no effect
+    context_indexer.add_vocabulary("ID", ["תעודה", "ת.ז", "מספר אישי"])
+    context_index = context_indexer(text)
+    assert context_indexer(text) is context_index
+
+    for name, (phrase_list, prefixes) in vocabularies.items():
+        end_offsets = [offset + length - 1 for offset, length in TermsRecognizer(phrase_list, prefixes=prefixes)(text)]
+        for offset in range(len(text) + 1):
+            for window_size in [0, 5, 15]:
+                expected = any(end_offset < offset and offset - end_offset <= window_size for end_offset in end_offsets)
+                assert context_index.has_phrase_before(name, offset, window_size) == expected
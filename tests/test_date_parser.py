@@ -0,0 +1,41 @@
+import re
+import warnings
+
+from hebsafeharbor.common.date_utils import DATE_PATTERNS, MIN_DATE_LENGTH, DateMention, DateParser, \
+    extract_numerical_date_components, set_date_mention_from_pattern_group_names
+
+
+def describe(date_mention):
+    return date_mention.text, [(component.text, component.start, component.end) if component else None for component in
+                               [date_mention.day, date_mention.month, date_mention.year]]
+
+
+def parse_sequentially(text):
+    # searches all the date patterns one by one, in their order of precedence
+    if len(text) < MIN_DATE_LENGTH:
+        return DateMention()
+    for pattern, _ in DATE_PATTERNS:
+        matched = re.search(pattern, text, re.IGNORECASE)
+        if matched:
+            return set_date_mention_from_pattern_group_names(matched)
+    return extract_numerical_date_components(text) or DateMention()
+
+
+def test_date_patterns_have_no_inline_flags_in_the_middle():
+    with warnings.catch_warnings():
+        # python < 3.11 warns about the inline flags that python 3.11 rejects
+        warnings.simplefilter("error")
+        # the compiled patterns are cached by the re module, so they are compiled again
+        re.purge()
+        for pattern, _ in DATE_PATTERNS:
+            re.compile(pattern, re.IGNORECASE)
+
+
+def test_date_parser_results_are_identical_to_sequential_search():
+    texts = ["ה-כ״ג אלול התשפ״א", "בחודש תמוז, תשפ״ב", "כ״ג בחודש אב", "ב-5 במרץ 2020", "01022020", "12312020",
+             "20201231", "MAR 5th 2020", "december, 31st 99", "2020 - 05 - 17", "12.03.1985", "3/10", "05-2020",
+             "אביב 2020", "ביום שני", "Summer of 1999", "12-13-14-15", "no date here"]
+
+    parser = DateParser()
+    for text in texts:
+        assert describe(parser(text)) == describe(parse_sequentially(text))
@@ -0,0 +1,18 @@
+from presidio_analyzer import RecognizerResult
+
+from hebsafeharbor import Doc
+from hebsafeharbor.identifier.entity_spliters.entity_splitter_rule_executor import EntitySplitterRuleExecutor
+
+
+def test_date_entity_splitter_keeps_consolidated_results():
+    doc = Doc({"id": "1", "text": "נולד ב12.03.1950, אושפז ב02.02.2012"})
+    birth_date = RecognizerResult("DATE", 5, 16, 0.85)
+    medical_date = RecognizerResult("DATE", 24, 35, 0.85)
+    doc.consolidated_results = [birth_date, medical_date]
+
+    doc = EntitySplitterRuleExecutor()(doc)
+
+    assert [entity.entity_type for entity in doc.granular_analyzer_results] == ["BIRTH_DATE", "MEDICAL_DATE"]
+    assert [(entity.start, entity.end) for entity in doc.granular_analyzer_results] == [(5, 16), (24, 35)]
+    assert doc.consolidated_results == [birth_date, medical_date]
+    assert [entity.entity_type for entity in doc.consolidated_results] == ["DATE", "DATE"]
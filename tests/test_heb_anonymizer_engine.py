@@ -0,0 +1,51 @@
+import random
+
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import OperatorConfig
+
+from hebsafeharbor.anonymizer.custom_operators.hebrew_replace_anonymizer_operator import ReplaceInHebrew
+from hebsafeharbor.anonymizer.custom_operators.israeli_city_anonymizer_operator import IsraeliCityAnonymizerOperator
+from hebsafeharbor.anonymizer.heb_anonymizer_engine import HebAnonymizerEngine, OperatorPlan, \
+    SinglePassAnonymizerEngine
+
+
+def describe(engine_result):
+    return engine_result.text, [(item.start, item.end, item.entity_type, item.text, item.operator) for item in
+                                engine_result.items]
+
+
+def test_operator_plan_results_are_identical_to_operator_configs():
+    text = "גדעון לבנה גר באביאל וחולה בסוכרת"
+    # overlapping and conflicting entities are resolved the same way
+    results = [RecognizerResult("PERS", 0, 10, 0.85), RecognizerResult("PERS", 0, 5, 0.85),
+               RecognizerResult("CITY", 14, 20, 0.7), RecognizerResult("CITY", 14, 20, 0.5),
+               RecognizerResult("DISEASE", 27, 33, 0.7)]
+    replace_in_hebrew, city_operator = ReplaceInHebrew(), IsraeliCityAnonymizerOperator()
+    operators = {"PERS": OperatorConfig(replace_in_hebrew.operator_name(), {}),
+                 "CITY": OperatorConfig(city_operator.operator_name(), {})}
+    engine = HebAnonymizerEngine(OperatorPlan({"PERS": replace_in_hebrew, "CITY": city_operator}))
+
+    expected = describe(AnonymizerEngine().anonymize(text, list(results), operators))
+
+    assert describe(engine.anonymize(text, list(results))) == expected
+    assert [describe(result) for result in engine.anonymize_many([text, text], [list(results), list(results)])] == \
+           [expected, expected]
+    assert expected[0] == "<שם_> גר <מיקום_> וחולה <DISEASE>"
+
+
+def test_single_pass_results_are_identical_to_presidio_results():
+    rand = random.Random(0)
+    plan = OperatorPlan({"PERS": ReplaceInHebrew(), "CITY": IsraeliCityAnonymizerOperator()})
+    presidio_engine, single_pass_engine = HebAnonymizerEngine(plan), SinglePassAnonymizerEngine(plan)
+    text = "גדעון לבנה גר באביאל וחולה בסוכרת מאז 2010"
+
+    for _ in range(2000):
+        results = []
+        for _ in range(rand.randint(0, 6)):
+            start = rand.randint(0, len(text))
+            # mostly short and empty entities, so some of the random sets are disjoint
+            end = min(start + rand.choice([0, 0, 1, 3, 6]), len(text))
+            results.append(RecognizerResult(rand.choice(["PERS", "CITY", "ID"]), start, end, rand.choice([0.5, 0.85])))
+        assert describe(single_pass_engine.anonymize(text, list(results))) == describe(
+            presidio_engine.anonymize(text, list(results)))
@@ -0,0 +1,26 @@
+import random
+
+from hebsafeharbor.common.interval_index import IntervalIndex
+
+
+def test_interval_index_matches_offset_mapping():
+    rand = random.Random(0)
+    for _ in range(200):
+        spans = []
+        for value in range(rand.randint(0, 8)):
+            start = rand.randint(0, 40)
+            spans.append((start, start + rand.randint(0, 10), value))
+        # the mapping of each offset to the last span that covers it
+        offset_to_value = {}
+        for start, end, value in spans:
+            for offset in range(start, end):
+                offset_to_value[offset] = value
+
+        interval_index = IntervalIndex(spans)
+        assert bool(interval_index) == bool(offset_to_value)
+        for start in range(-2, 52):
+            for end in range(start - 1, 53):
+                offsets = [offset for offset in range(start, end) if offset in offset_to_value]
+                assert set(interval_index.get_values_in_span(start, end)) == {offset_to_value[offset] for offset in
+                                                                              offsets}
+                assert interval_index.get_overlap_length(start, end) == len(offsets)
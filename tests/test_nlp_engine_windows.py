@@ -0,0 +1,54 @@
+import random
+
+import spacy
+from spacy.tokens import Span
+
+from hebsafeharbor.common.text_windows import split_to_windows
+from hebsafeharbor.identifier import HebSpacyNlpEngine
+
+SENTENCES = ["גדעון לבנה הגיע לשערי צדק עם כאבים בחזה.", "המטופלת גרה בחיפה ליד משה כהן!", "נשלח לבדיקה נוספת",
+             "\n\nסיכום: שרה לוי שוחררה לביתה בחיפה.", "ללא ממצאים חריגים;"]
+
+
+def create_text(num_sentences: int, seed: int = 0) -> str:
+    rand = random.Random(seed)
+    return " ".join(rand.choice(SENTENCES) for _ in range(num_sentences))
+
+
+def test_windows_cover_the_text():
+    text = create_text(200) + " " + "א" * 500
+
+    windows = split_to_windows(text, window_size=300, window_stride=200)
+
+    assert windows[0].core_start == 0 and windows[-1].core_end == len(text)
+    for window, next_window in zip(windows, windows[1:]):
+        assert window.core_end == next_window.core_start
+        assert next_window.start < window.end
+    for window in windows:
+        assert window.start <= window.core_start < window.core_end <= window.end
+        assert window.end - window.start <= 300
+    assert split_to_windows("טקסט קצר", window_size=300, window_stride=200) == [(0, 8, 0, 8)]
+
+
+def test_windows_are_merged_into_a_single_doc(tmp_path):
+    nlp = spacy.blank("he")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("entity_ruler").add_patterns(
+        [{"label": "PERS", "pattern": name} for name in ["גדעון לבנה", "משה כהן", "שרה לוי"]] +
+        [{"label": "LOC", "pattern": "חיפה"}, {"label": "ORG", "pattern": "שערי צדק"}])
+    nlp.to_disk(tmp_path)
+    Span.set_extension("confidence_score", default=0.85, force=True)
+    text = create_text(300)
+
+    try:
+        docs = [HebSpacyNlpEngine(models={"he": str(tmp_path)}, window_size=window_size,
+                                  window_stride=200).process_text(text, "he").tokens for window_size in [0, 400]]
+    finally:
+        Span.remove_extension("confidence_score")
+
+    whole_doc, merged_doc = docs
+    assert merged_doc.text == text
+    assert [(token.idx, token.is_sent_start) for token in merged_doc] == [(token.idx, token.is_sent_start) for token in
+                                                                          whole_doc]
+    assert [(entity.start_char, entity.end_char, entity.label_) for entity in merged_doc.ents] == [
+        (entity.start_char, entity.end_char, entity.label_) for entity in whole_doc.ents]
@@ -0,0 +1,89 @@
+from presidio_analyzer import RecognizerResult, AnalysisExplanation
+from presidio_anonymizer.entities import EngineResult, OperatorResult
+
+from hebsafeharbor import Doc, HebSafeHarbor, ParallelHebSafeHarbor
+from hebsafeharbor.anonymizer.phi_anonymizer import PhiAnonymizer
+from hebsafeharbor.common.compact_results import pack_results, unpack_results
+
+
+def test_split_by_size_balances_text_length():
+    texts = ["א" * length for length in [100, 10, 60, 50, 40, 30, 5]]
+    docs = [Doc({"id": str(index), "text": text}) for index, text in enumerate(texts)]
+
+    chunks = ParallelHebSafeHarbor.split_by_size(docs, 2)
+
+    assert len(chunks) == 2
+    assert sorted(index for chunk in chunks for index, _, _ in chunk) == list(range(len(texts)))
+    loads = [sum(len(text) for _, _, text in chunk) for chunk in chunks]
+    assert abs(loads[0] - loads[1]) <= 5
+
+
+def test_split_by_size_with_fewer_docs_than_chunks():
+    docs = [Doc({"id": "1", "text": "שלום"})]
+
+    chunks = ParallelHebSafeHarbor.split_by_size(docs, 8)
+
+    assert chunks == [[(0, "1", "שלום")]]
+
+
+def describe_explanation(explanation):
+    return explanation.__dict__ if isinstance(explanation, AnalysisExplanation) else explanation
+
+
+def describe_entities(entities):
+    # the conflict handler may set the analysis explanation as the recognition metadata
+    return [(entity.entity_type, entity.start, entity.end, entity.score,
+             describe_explanation(entity.recognition_metadata), describe_explanation(entity.analysis_explanation)) for
+            entity in entities]
+
+
+def test_pack_and_unpack_results():
+    doc = Doc({"id": "1", "text": "גדעון לבנה הגיע"})
+    explanation = AnalysisExplanation("IsraeliIdNumberRecognizer", 0.3, pattern_name="ID", pattern=r"\d{9}",
+                                      validation_result=True)
+    explanation.set_improved_score(0.85)
+    explanation.set_supportive_context_word("ת.ז")
+    entity = RecognizerResult("ID", 0, 10, 0.85, explanation,
+                              {RecognizerResult.RECOGNIZER_NAME_KEY: "IsraeliIdNumberRecognizer"})
+    doc.analyzer_results = doc.smoothed_entities = doc.consolidated_results = [entity]
+    doc.granular_analyzer_results = [RecognizerResult("ID", 0, 10, 0.85)]
+    doc.anonymized_text = EngineResult("<מזהה_> הגיע", [OperatorResult(0, 7, "ID", "<מזהה_>", "replace_in_hebrew")])
+
+    unpacked = unpack_results(Doc({"id": "1", "text": doc.text}), pack_results(doc))
+
+    for entities, expected in [(unpacked.analyzer_results, doc.analyzer_results),
+                               (unpacked.smoothed_entities, doc.smoothed_entities),
+                               (unpacked.consolidated_results, doc.consolidated_results),
+                               (unpacked.granular_analyzer_results, doc.granular_analyzer_results)]:
+        assert describe_entities(entities) == describe_entities(expected)
+    assert unpacked.analyzer_results[0].recognition_metadata is not entity.recognition_metadata
+    assert unpacked.anonymized_text == doc.anonymized_text
+
+
+def fail_on_marked_texts(anonymize):
+    def anonymize_or_fail(self, doc):
+        if "FAIL" in doc.text:
+            raise RuntimeError("anonymization failed")
+        return anonymize(self, doc)
+
+    return anonymize_or_fail
+
+
+def test_parallel_results_are_identical_to_sequential_results(monkeypatch):
+    # the workers are forked, so they inherit the patched anonymizer
+    monkeypatch.setattr(PhiAnonymizer, "__call__", fail_on_marked_texts(PhiAnonymizer.__call__))
+    texts = ["שרון לוי התאשפזה ב02.02.2012 בחיפה", "ת.ז 123456782 טלפון: 050-1234567", "FAIL", "אין ממצאים",
+             "נולד ב-12.03.1985 ברמת גן", "מייל a@b.co.il"]
+    doc_list = [{"id": str(index), "text": text} for index, text in enumerate(texts)]
+
+    def describe(doc):
+        return doc.id, doc.anonymized_text.text, describe_entities(doc.consolidated_results)
+
+    expected = [describe(doc) for doc in HebSafeHarbor(mode="rule_only")([doc_list[i] for i in [0, 1, 3, 4, 5]])]
+    with ParallelHebSafeHarbor(num_workers=2, start_method="fork", collect_timings=True, mode="rule_only") as hsh:
+        docs = hsh(doc_list)
+
+    assert [doc.id for doc in docs] == [doc_dict["id"] for doc_dict in doc_list]
+    assert docs[2].error == "RuntimeError: anonymization failed"
+    assert [describe(doc) for doc in docs if doc.error is None] == expected
+    assert all(doc.timings for doc in docs) and "recognizers" in hsh.batch_timings
@@ -0,0 +1,43 @@
+from presidio_analyzer import RecognizerResult
+
+from hebsafeharbor import HebSafeHarbor
+from hebsafeharbor.common.text_windows import split_to_sentences
+from hebsafeharbor.identifier.ner_screener import NerScreener
+from hebsafeharbor.identifier.stub_nlp_engine import StubNlpEngine
+
+
+def test_screener_skips_sentences_of_covered_and_known_words():
+    text = "גדעון לבנה הגיע. שרון 050-1234567. אין חום ולחץ דם."
+    rule_results = [RecognizerResult("PERS", 17, 21, 0.85), RecognizerResult("PHONE_NUMBER", 22, 33, 0.85)]
+
+    screened = NerScreener().screen(text, split_to_sentences(text), rule_results)
+
+    assert [text[start:end] for start, end in screened] == ["גדעון לבנה הגיע. "]
+
+
+def test_ner_entities_by_mode():
+    hsh = HebSafeHarbor(nlp_engine=StubNlpEngine())
+    text = "שרון לוי התאשפזה ב02.02.2012. טלפון: 050-1234567"
+
+    def get_ner_entities(mode):
+        doc = hsh([{"id": "1", "text": text}], mode)[0]
+        return [text[entity.start:entity.end] for entity in doc.analyzer_results if
+                entity.analysis_explanation.recognizer == "SpacyRecognizerWithConfidence"]
+
+    assert get_ner_entities("full") == ["שרון לוי"]
+    assert get_ner_entities("fast_screen") == ["שרון לוי"]
+    assert get_ner_entities("rule_only") == []
+
+
+def test_fast_screen_applies_only_the_ner_signals_to_the_screened_sentences():
+    hsh = HebSafeHarbor(nlp_engine=StubNlpEngine())
+    # the context word of the date is in the previous sentence
+    text = "נולד. 02.02.2012 שרון לוי הגיע לחיפה"
+
+    def describe(doc):
+        return sorted((entity.entity_type, entity.start, entity.end, entity.score,
+                       entity.analysis_explanation.recognizer) for entity in doc.analyzer_results)
+
+    full_doc, fast_screen_doc = [hsh([{"id": "1", "text": text}], mode)[0] for mode in ["full", "fast_screen"]]
+
+    assert describe(fast_screen_doc) == describe(full_doc)
@@ -0,0 +1,40 @@
+import regex as re
+from presidio_analyzer.predefined_recognizers import CreditCardRecognizer, DateRecognizer, EmailRecognizer, \
+    IpRecognizer, PhoneRecognizer, UrlRecognizer
+
+from hebsafeharbor.identifier.phi_identifier import PhiIdentifier
+from hebsafeharbor.identifier.recognizer_prescreener import RecognizerPrescreener
+from hebsafeharbor.identifier.signals import GeneralIdRecognizer, HebDateRecognizer, HebLatinDateRecognizer, \
+    IsraeliIdNumberRecognizer, PrepositionDateRecognizer
+from hebsafeharbor.identifier.signals.noisy_date_recognizer import NoisyDateRecognizer
+
+
+def test_skipped_recognizers_have_no_results():
+    recognizers = [CreditCardRecognizer(supported_language="he"), DateRecognizer(supported_language="he"),
+                   EmailRecognizer(supported_language="he"), IpRecognizer(supported_language="he"),
+                   PhoneRecognizer(supported_language="he"), UrlRecognizer(supported_language="he"),
+                   IsraeliIdNumberRecognizer(), GeneralIdRecognizer(), HebDateRecognizer(),
+                   PrepositionDateRecognizer(), HebLatinDateRecognizer(), NoisyDateRecognizer()]
+    prescreener = RecognizerPrescreener()
+    PhiIdentifier._init_recognizer_requirements(prescreener)
+    text = "נולד ב12.03.1985 או 12/03/1985 (י״ב אדר תשמ״ה), MAR 5th 2020 ו-5 במאי. " \
+           "ת.ז 123456782, טלפון 052-1234567. כרטיס 4111-1111-1111-1111 מייל a@b.co.il " \
+           "באתר www.example.com מכתובת 10.0.0.1 או fe80::1"
+    # the text without each of the required features
+    texts = [re.sub(r"\d", "", text), text.replace("@", " "), re.sub(r"[\d:]", "", text),
+             re.sub(r"[a-z]", "", text, flags=re.IGNORECASE), re.sub(r"אדר|מאי", "", text),
+             re.sub(r"[\d@:a-z]|אדר|מאי", "", text, flags=re.IGNORECASE)]
+
+    assert len(prescreener.filter_recognizers(recognizers, prescreener.get_profile(text))) == len(recognizers)
+    for screened_text in texts:
+        relevant_recognizers = prescreener.filter_recognizers(recognizers, prescreener.get_profile(screened_text))
+        assert len(relevant_recognizers) < len(recognizers)
+        for recognizer in recognizers:
+            if recognizer not in relevant_recognizers:
+                assert recognizer.analyze(screened_text, recognizer.supported_entities) == []
+
+    skip_counts = prescreener.get_skip_counts()
+    assert skip_counts["screened_texts"] == len(texts) + 1
+    # the last text has none of the features, so every recognizer is skipped on it
+    assert all(count >= 1 for count in skip_counts["skipped"].values())
+    assert skip_counts["skipped"]["CreditCardRecognizer"] == 3
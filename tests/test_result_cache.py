@@ -0,0 +1,73 @@
+import asyncio
+import pickle
+
+from presidio_analyzer import RecognizerResult, AnalysisExplanation
+from presidio_anonymizer.entities import EngineResult, OperatorResult
+
+from hebsafeharbor import Doc
+from hebsafeharbor.common.compact_results import pack_results
+from hsh_service import HebSafeHarborService, ResultCache, ServiceStatus
+
+TEXT = "גדעון לבנה הגיע"
+
+
+def create_results(text: str):
+    doc = Doc({"text": text})
+    entity = RecognizerResult("PERS", 0, 10, 0.85, AnalysisExplanation("SpacyRecognizerWithConfidence", 0.85))
+    doc.analyzer_results = doc.consolidated_results = doc.granular_analyzer_results = [entity]
+    doc.anonymized_text = EngineResult("<שם_> " + text[11:], [OperatorResult(0, 5, "PERS", "<שם_>", "replace")])
+    return pack_results(doc)
+
+
+def test_cache_is_bounded_by_bytes_and_never_stores_the_text():
+    results = create_results(TEXT)
+    entry_size = len(pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(max_bytes=2 * entry_size, version="1")
+
+    cache.put(TEXT, results)
+    cache.put(TEXT + " ", results)
+    assert cache.get(TEXT) == results
+    cache.put(TEXT + "  ", results)
+
+    # the least recently used text is evicted
+    assert cache.get(TEXT + " ") is None and cache.get(TEXT) == results
+    assert ResultCache(max_bytes=2 * entry_size, version="2").get(TEXT) is None
+    assert all(TEXT.encode("utf-8") not in key + data for key, (_, data) in cache._entries.items())
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["evictions"], metrics["entries"]) == (2, 1, 1, 2)
+
+
+def test_entries_expire():
+    cache = ResultCache(max_bytes=10000, ttl_seconds=-1)
+
+    cache.put(TEXT, create_results(TEXT))
+
+    assert cache.get(TEXT) is None and cache.metrics()["expirations"] == 1
+
+
+def test_cached_documents_skip_the_pipeline():
+    processed_texts = []
+
+    def run_pipeline(doc_list, mode=None):
+        processed_texts.extend(doc_dict["text"] for doc_dict in doc_list)
+        docs = []
+        for doc_dict in doc_list:
+            doc = Doc(doc_dict)
+            doc.anonymized_text = EngineResult(doc.text.upper(), [])
+            docs.append(doc)
+        return docs
+
+    service = HebSafeHarborService()
+    service.hch, service.status, service.result_cache = run_pipeline, ServiceStatus.READY, ResultCache(10000)
+
+    service.query([{"id": "1", "text": "a"}, {"id": "2", "text": "b"}])
+    output_docs, status_code = service.query([{"id": "3", "text": "b"}, {"id": "4", "text": "c"}])
+
+    assert status_code == 200 and processed_texts == ["a", "b", "c"]
+    assert [(doc.id, doc.anonymized_text.text) for doc in output_docs] == [("3", "B"), ("4", "C")]
+
+    # the cached results are looked up in the inference executor by the asynchronous queries
+    output_docs, status_code = asyncio.run(service.query_async([{"id": "5", "text": "c"}, {"id": "6", "text": "d"}]))
+
+    assert status_code == 200 and processed_texts == ["a", "b", "c", "d"]
+    assert [(doc.id, doc.anonymized_text.text) for doc in output_docs] == [("5", "C"), ("6", "D")]
@@ -0,0 +1,29 @@
+from presidio_analyzer import RecognizerResult
+
+from hebsafeharbor.common.text_windows import split_to_sentences
+from hebsafeharbor.identifier.sentence_memo import SentenceMemo
+
+
+def test_sentences_cover_the_text():
+    text = "גדעון לבנה הגיע ב-16.1.2022. נשלח לבדיקה!\n\nסיכום: ללא ממצאים"
+
+    sentences = split_to_sentences(text)
+
+    assert [text[start:end] for start, end in sentences] == ["גדעון לבנה הגיע ב-16.1.2022. ", "נשלח לבדיקה!\n\n",
+                                                              "סיכום: ללא ממצאים"]
+
+
+def test_memo_stores_copies_and_evicts_the_least_recently_used_sentence():
+    memo = SentenceMemo(max_sentences=2)
+    results = [RecognizerResult("PERS", 0, 5, 0.85)]
+    memo.put("א", results)
+    memo.put("ב", [])
+
+    results[0].start += 10
+    assert memo.get("א") is memo.get("א")
+    memo.put("ג", [])
+    memo.update_stats(sentences=4, hits=3)
+
+    assert memo.get("א")[0].start == 0 and memo.get("ב") is None and memo.get("ג") == []
+    stats = memo.get_stats()
+    assert stats["memoized_sentences"] == 2 and stats["last_batch"]["hit_rate"] == 0.75
@@ -0,0 +1,14 @@
+from hebsafeharbor import HebSafeHarbor
+from hebsafeharbor.identifier.stub_nlp_engine import StubNlpEngine
+
+
+def test_pipeline_runs_end_to_end_with_the_stub_nlp_engine():
+    hsh = HebSafeHarbor(nlp_engine=StubNlpEngine())
+    text = "שרון לוי התאשפזה ב02.02.2012 וגרה בארלוזרוב 16 רמת גן. גדעון לבנה הגיע לחיפה"
+
+    doc = hsh([{"id": "1", "text": text}])[0]
+
+    ner_entities = [(entity.entity_type, text[entity.start:entity.end]) for entity in doc.analyzer_results if
+                    entity.analysis_explanation.recognizer == "SpacyRecognizerWithConfidence"]
+    assert ner_entities == [("PERS", "שרון לוי"), ("LOC", "רמת גן"), ("PERS", "גדעון לבנה")]
+    assert doc.anonymized_text.text == "<שם_> התאשפזה ב<יום_>.02.2012 וגרה בארלוזרוב 16 רמת גן. <שם_> הגיע לחיפה"
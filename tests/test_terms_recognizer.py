@@ -0,0 +1,39 @@
+import pytest
+
+from hebsafeharbor.common.terms_recognizer import TermsRecognizer, SharedTermsRecognizer
+
+
+def test_terms_boundaries():
+    terms_recognizer = TermsRecognizer(["רמת גן", "חיפה"])
+
+    assert sorted(terms_recognizer("גר ברמת גן, עבר לחיפה")) == []
+    assert sorted(terms_recognizer("רמת גן-חיפה")) == [(0, 6), (7, 4)]
+    assert sorted(terms_recognizer("חיפהx רמת גנים _חיפה")) == []
+
+
+def test_terms_with_prefixes():
+    terms_recognizer = TermsRecognizer(["רמת גן", "חיפה"], prefixes=["ב", "ל"])
+
+    assert sorted(terms_recognizer("גר ברמת גן, עבר לחיפה")) == [(4, 6), (17, 4)]
+    assert sorted(terms_recognizer("לחיפה")) == [(1, 4)]
+    # the prefix must be a separate letter before the term
+    assert sorted(terms_recognizer("גרברמת גן, וחיפה")) == []
+    # prefixes given to the call override the prefixes given on initialization
+    assert sorted(terms_recognizer("וחיפה", prefixes=["ו"])) == [(1, 4)]
+    assert sorted(terms_recognizer("לחיפה", prefixes=[])) == []
+
+
+def test_shared_terms_recognizer_matches_separate_recognizers():
+    lexicons = {"cities": (["רמת גן", "חיפה", "גן"], ["ב", "ל"]),
+                "places": (["גן", "גן יבנה", "חיפה"], None),
+                "letters": (["ג", "ן"], ["ב"])}
+    text = "גר ברמת גן, עבר לחיפה ומשם לגן יבנה. גן חיפה"
+    shared_terms_recognizer = SharedTermsRecognizer()
+    lexicon_recognizers = {name: shared_terms_recognizer.add_lexicon(name, phrase_list, prefixes=prefixes) for
+                           name, (phrase_list, prefixes) in lexicons.items()}
+
+    for name, (phrase_list, prefixes) in lexicons.items():
+        assert lexicon_recognizers[name](text) == TermsRecognizer(phrase_list, prefixes=prefixes)(text)
+    assert shared_terms_recognizer(text, "letters") == []
+    with pytest.raises(ValueError):
+        shared_terms_recognizer.add_lexicon("cities", ["חיפה"])
@@ -0,0 +1,24 @@
+from hebsafeharbor.common.timings import add_time, merge_timings, time_stage
+
+
+def test_stage_and_item_times_are_accumulated():
+    timings = {}
+
+    with time_stage(timings, "consolidator"):
+        with time_stage(timings, "post_consolidators", "MedicalPostConsolidator"):
+            sum(range(1000))
+    add_time(timings, 1.0, 0.5, "consolidator")
+
+    assert timings["consolidator"]["wall"] >= 1.0 and timings["consolidator"]["cpu"] >= 0.5
+    assert set(timings["post_consolidators"]) == {"MedicalPostConsolidator"}
+    batch_timings = merge_timings(merge_timings({}, timings), timings)
+    assert batch_timings["consolidator"]["wall"] == 2 * timings["consolidator"]["wall"]
+    assert batch_timings["post_consolidators"]["MedicalPostConsolidator"]["cpu"] == \
+           2 * timings["post_consolidators"]["MedicalPostConsolidator"]["cpu"]
+
+
+def test_nothing_is_recorded_without_timings():
+    with time_stage(None, "nlp") as timer:
+        pass
+
+    assert timer is time_stage(None, "anonymizer")
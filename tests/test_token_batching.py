@@ -0,0 +1,33 @@
+import random
+
+import spacy
+
+from hebsafeharbor.common.token_batching import plan_token_batches
+from hebsafeharbor.identifier import HebSpacyNlpEngine
+
+
+def test_batches_are_capped_by_the_token_budget():
+    rand = random.Random(0)
+    lengths = [rand.randint(0, 60) for _ in range(500)] + [150]
+
+    batches = plan_token_batches(lengths, max_batch_tokens=100, max_batch_size=8)
+
+    assert sorted(index for batch in batches for index in batch) == list(range(len(lengths)))
+    assert batches[0] == [500]
+    for batch in batches[1:]:
+        assert len(batch) <= 8 and len(batch) * max(lengths[index] for index in batch) <= 100
+    assert plan_token_batches([3, 1, 2], max_batch_tokens=0, max_batch_size=2) == [[0, 1], [2]]
+
+
+def test_results_are_in_the_order_of_the_texts(tmp_path):
+    spacy.blank("he").to_disk(tmp_path)
+    rand = random.Random(0)
+    texts = [" ".join(str(index) for _ in range(rand.randint(0, 30))) for index in range(100)]
+    nlp_engine = HebSpacyNlpEngine(models={"he": str(tmp_path)}, window_size=0, max_batch_tokens=50)
+
+    artifacts = nlp_engine.process_batch(texts, "he")
+
+    assert [artifact.tokens.text for artifact in artifacts] == texts
+    stats = nlp_engine.get_batch_stats()
+    assert stats["texts"] == 100 and stats["tokens"] == sum(len(text.split()) for text in texts)
+    assert stats["padded_tokens"] <= 50 * stats["batches"] and 0.5 < stats["padding_efficiency"] <= 1